@@ -13,6 +13,15 @@ class Config:
     QDRANT_URL: str = environ.get("QDRANT_URL", "http://localhost:6333")
     RECREATE_COLLECTIONS: bool = environ.get("RECREATE_COLLECTIONS", "False")
     LIMIT_ROWS: int = environ.get("LIMIT_ROWS", "100")
+    # Seconds a tool waits for a database lock held by another session, and prepared statements kept per connection
+    SQLITE_BUSY_TIMEOUT: float = float(environ.get("SQLITE_BUSY_TIMEOUT", "5"))
+    SQLITE_CACHED_STATEMENTS: int = int(environ.get("SQLITE_CACHED_STATEMENTS", "128"))
+    # Estimated tokens a tool result may add to the conversation; per tool e.g. SEARCH_FAQ_TOKEN_BUDGET=1500
+    TOOL_RESULT_TOKEN_BUDGET: int = int(environ.get("TOOL_RESULT_TOKEN_BUDGET", "800"))
 
 def get_settings():
-    return Config()
\ No newline at end of file
+    return Config()
+
+def get_tool_token_budget(tool_name: str) -> int:
+    value = environ.get(f"{tool_name.upper()}_TOKEN_BUDGET")
+    return int(value) if value else get_settings().TOOL_RESULT_TOKEN_BUDGET
\ No newline at end of file
@@ -14,7 +14,6 @@ from customer_support_chat.app.services.tools.flights import fetch_user_flight_i
 from customer_support_chat.app.services.assistants.assistant_base import (
   Assistant,
   CompleteOrEscalate,
-  llm,
 )
 from customer_support_chat.app.services.assistants.primary_assistant import (
   primary_assistant,
@@ -5,6 +5,7 @@ import os  # Import os module for file operations
 from customer_support_chat.app.graph import multi_agentic_graph
 from customer_support_chat.app.services.utils import download_and_prepare_db
 from customer_support_chat.app.core.logger import logger
+from vectorizer.app.embeddings.query_cache import get_query_embedding_cache
 from langchain_core.messages import ToolMessage, HumanMessage, AIMessage
 
 def main():
@@ -98,6 +99,14 @@ def main():
     except Exception as e:
         logger.error(f"An error occurred: {e}")
         print("An unexpected error occurred. Please check the logs for more details.")
+    finally:
+        query_cache = get_query_embedding_cache()
+        if query_cache:
+            stats = query_cache.stats()
+            logger.info(
+                f"Query embedding cache: {stats['hits']} memory hits, {stats['disk_hits']} disk hits, "
+                f"{stats['misses']} misses (hit rate {stats['hit_rate']:.1%})"
+            )
 
 if __name__ == "__main__":
     main()
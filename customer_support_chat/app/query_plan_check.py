@@ -0,0 +1,84 @@
+"""Query plan check of the tool queries.
+
+Runs `EXPLAIN QUERY PLAN` on every query the tools send to the travel database and
+fails when one of them scans a table instead of searching an index, e.g. after a new
+tool query or a rewrite of the tables that dropped `TOOL_INDEXES`. Run it with
+`python -m customer_support_chat.app.query_plan_check`.
+"""
+import argparse
+import json
+import sqlite3
+import sys
+from customer_support_chat.app.core.settings import get_settings
+
+
+def is_full_scan(detail):
+    # "SCAN flights" (or "SCAN TABLE flights" before SQLite 3.36) reads every row. A scan of a
+    # covering index also reads the whole index, but only the indexed columns
+    return detail.startswith("SCAN ") and "COVERING INDEX" not in detail
+
+
+def tool_queries():
+    """(name, sql, params) of every query the tools run."""
+    from customer_support_chat.app.services.tools import cars, excursions, flights, hotels
+
+    def schedule(**criteria):
+        return flights.schedule_query(
+            {"departure_airports": [], "arrival_airports": [], "start_time": None, "end_time": None, "flight_no": None, **criteria},
+            5,
+        )
+
+    window = {"start_time": "2024-05-01 00:00:00", "end_time": "2024-05-02 00:00:00"}
+    return [
+        ("fetch_user_flight_information", flights.USER_FLIGHTS_QUERY, ("0000 000000",)),
+        ("search_flights known airports", flights.KNOWN_AIRPORTS_QUERY, ()),
+        ("search_flights schedule timezone", flights.SCHEDULE_SAMPLE_QUERY, ()),
+        ("search_flights route", *schedule(departure_airports=["BSL"], arrival_airports=["ZRH"], **window)),
+        ("search_flights departures", *schedule(departure_airports=["BSL", "MLH"], **window)),
+        ("search_flights arrivals", *schedule(arrival_airports=["ZRH"])),
+        ("search_flights flight number", *schedule(flight_no="LX0112", **window)),
+        ("ticket ownership", flights.TICKET_QUERY, ("0000", "0000 000000")),
+        ("ticket flights", flights.TICKET_FLIGHT_IDS_QUERY, ("0000",)),
+        ("update_ticket_to_new_flight", flights.UPDATE_TICKET_FLIGHT_QUERY, (1, "0000")),
+        ("cancel_ticket ticket_flights", flights.DELETE_TICKET_FLIGHTS_QUERY, ("0000",)),
+        ("cancel_ticket tickets", flights.DELETE_TICKET_QUERY, ("0000",)),
+        ("book_hotel", hotels.BOOK_HOTEL_QUERY, (1,)),
+        ("update_hotel", hotels.hotel_update_query(hotels.HOTEL_UPDATE_COLUMNS), ("2024-05-01", "2024-05-02", 1)),
+        ("cancel_hotel", hotels.CANCEL_HOTEL_QUERY, (1,)),
+        ("book_car_rental", cars.BOOK_CAR_RENTAL_QUERY, (1,)),
+        ("update_car_rental", cars.car_rental_update_query(cars.CAR_RENTAL_UPDATE_COLUMNS), ("2024-05-01", "2024-05-02", 1)),
+        ("cancel_car_rental", cars.CANCEL_CAR_RENTAL_QUERY, (1,)),
+        ("book_excursion", excursions.BOOK_EXCURSION_QUERY, (1,)),
+        ("update_excursion", excursions.UPDATE_EXCURSION_QUERY, ("details", 1)),
+        ("cancel_excursion", excursions.CANCEL_EXCURSION_QUERY, (1,)),
+    ]
+
+
+def check_query_plans(db_file):
+    """The query plan of every tool query, and whether it contains a full table scan."""
+    conn = sqlite3.connect(db_file)
+    try:
+        report = []
+        for name, query, params in tool_queries():
+            plan = [detail for *_, detail in conn.execute(f"EXPLAIN QUERY PLAN {query}", params)]
+            report.append({
+                "query": name,
+                "plan": plan,
+                "full_scans": [detail for detail in plan if is_full_scan(detail)],
+            })
+        return report
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fail when a tool query scans a whole table")
+    parser.add_argument("--db", default=get_settings().SQLITE_DB_PATH, help="SQLite database to check")
+    args = parser.parse_args()
+
+    report = check_query_plans(args.db)
+    print(json.dumps(report, indent=2))
+    failures = [entry["query"] for entry in report if entry["full_scans"]]
+    if failures:
+        print(f"Full table scans in: {', '.join(failures)}", file=sys.stderr)
+        sys.exit(1)
@@ -1,22 +1,51 @@
-from typing import Optional
+import threading
+from typing import Callable, Optional, Union
 from langchain_core.runnables import Runnable, RunnableConfig
 from customer_support_chat.app.core.state import State
 from pydantic import BaseModel
 from customer_support_chat.app.core.settings import get_settings
-from langchain_openai import ChatOpenAI
 
 settings = get_settings()
 
-# Initialize the language model (shared among assistants)
-llm = ChatOpenAI(
-    model="gpt-4",
-    openai_api_key=settings.OPENAI_API_KEY,
-    temperature=1,
-)
+_llm = None
+_llm_lock = threading.Lock()
+
+def get_llm():
+    """The language model shared among assistants, created (and langchain_openai imported) on first use."""
+    global _llm
+    with _llm_lock:
+        if _llm is None:
+            from langchain_openai import ChatOpenAI
+            _llm = ChatOpenAI(
+                model="gpt-4",
+                openai_api_key=settings.OPENAI_API_KEY,
+                temperature=1,
+            )
+    return _llm
+
+def __getattr__(name):
+    # Keeps `from assistant_base import llm` working without building the model at import
+    if name == "llm":
+        return get_llm()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 class Assistant:
-    def __init__(self, runnable: Runnable):
-        self.runnable = runnable
+    """Runs an assistant runnable until it produces a real answer or tool call.
+
+    `runnable` may also be a function that builds it; it is called on the first turn,
+    so binding tools to the model costs nothing until the assistant is needed.
+    """
+
+    def __init__(self, runnable: Union[Runnable, Callable[[], Runnable]]):
+        self._runnable = runnable
+        self._lock = threading.Lock()
+
+    @property
+    def runnable(self) -> Runnable:
+        with self._lock:
+            if not isinstance(self._runnable, Runnable):
+                self._runnable = self._runnable()
+            return self._runnable
 
     def __call__(self, state: State, config: Optional[RunnableConfig] = None):
         while True:
@@ -6,7 +6,7 @@ from customer_support_chat.app.services.tools import (
     update_car_rental,
     cancel_car_rental,
 )
-from customer_support_chat.app.services.assistants.assistant_base import Assistant, CompleteOrEscalate, llm
+from customer_support_chat.app.services.assistants.assistant_base import Assistant, CompleteOrEscalate, get_llm
 
 # Car rental assistant prompt
 car_rental_prompt = ChatPromptTemplate.from_messages(
@@ -16,6 +16,7 @@ car_rental_prompt = ChatPromptTemplate.from_messages(
             "You are a specialized assistant for handling car rental bookings. "
             "The primary assistant delegates work to you whenever the user needs help booking a car rental. "
             "Search for available car rentals based on the user's preferences and confirm the booking details with the customer. "
+            "Pass the location and rental dates you already know as search filters rather than only in the query text. "
             "When searching, be persistent. Expand your query bounds if the first search returns no results. "
             "If you need more information or the customer changes their mind, escalate the task back to the main assistant. "
             "Remember that a booking isn't completed until after the relevant tool has successfully been used."
@@ -39,9 +40,10 @@ book_car_rental_sensitive_tools = [book_car_rental, update_car_rental, cancel_ca
 book_car_rental_tools = book_car_rental_safe_tools + book_car_rental_sensitive_tools
 
 # Create the car rental assistant runnable
-book_car_rental_runnable = car_rental_prompt | llm.bind_tools(
-    book_car_rental_tools + [CompleteOrEscalate]
-)
+def build_book_car_rental_runnable():
+    return car_rental_prompt | get_llm().bind_tools(
+        book_car_rental_tools + [CompleteOrEscalate]
+    )
 
 # Instantiate the car rental assistant
-car_rental_assistant = Assistant(book_car_rental_runnable)
\ No newline at end of file
+car_rental_assistant = Assistant(build_book_car_rental_runnable)
\ No newline at end of file
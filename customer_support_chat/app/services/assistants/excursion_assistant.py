@@ -6,7 +6,7 @@ from customer_support_chat.app.services.tools import (
     update_excursion,
     cancel_excursion,
 )
-from customer_support_chat.app.services.assistants.assistant_base import Assistant, CompleteOrEscalate, llm
+from customer_support_chat.app.services.assistants.assistant_base import Assistant, CompleteOrEscalate, get_llm
 
 # Excursion assistant prompt
 excursion_prompt = ChatPromptTemplate.from_messages(
@@ -17,6 +17,7 @@ excursion_prompt = ChatPromptTemplate.from_messages(
             "The primary assistant delegates work to you whenever the user needs help booking a recommended trip. "
             "Search for available trip recommendations based on the user's preferences and confirm the booking details with the customer. "
             "If you need more information or the customer changes their mind, escalate the task back to the main assistant. "
+            "Pass the location you already know as a search filter rather than only in the query text. "
             "When searching, be persistent. Expand your query bounds if the first search returns no results. "
             "Remember that a booking isn't completed until after the relevant tool has successfully been used."
             "\nCurrent time: {time}."
@@ -37,9 +38,10 @@ book_excursion_sensitive_tools = [book_excursion, update_excursion, cancel_excur
 book_excursion_tools = book_excursion_safe_tools + book_excursion_sensitive_tools
 
 # Create the excursion assistant runnable
-book_excursion_runnable = excursion_prompt | llm.bind_tools(
-    book_excursion_tools + [CompleteOrEscalate]
-)
+def build_book_excursion_runnable():
+    return excursion_prompt | get_llm().bind_tools(
+        book_excursion_tools + [CompleteOrEscalate]
+    )
 
 # Instantiate the excursion assistant
-excursion_assistant = Assistant(book_excursion_runnable)
\ No newline at end of file
+excursion_assistant = Assistant(build_book_excursion_runnable)
\ No newline at end of file
@@ -5,7 +5,7 @@ from customer_support_chat.app.services.tools import (
     update_ticket_to_new_flight,
     cancel_ticket,
 )
-from customer_support_chat.app.services.assistants.assistant_base import Assistant, CompleteOrEscalate, llm
+from customer_support_chat.app.services.assistants.assistant_base import Assistant, CompleteOrEscalate, get_llm
 
 # Flight booking assistant prompt
 flight_booking_prompt = ChatPromptTemplate.from_messages(
@@ -33,9 +33,10 @@ update_flight_sensitive_tools = [update_ticket_to_new_flight, cancel_ticket]
 update_flight_tools = update_flight_safe_tools + update_flight_sensitive_tools
 
 # Create the flight booking assistant runnable
-update_flight_runnable = flight_booking_prompt | llm.bind_tools(
-    update_flight_tools + [CompleteOrEscalate]
-)
+def build_update_flight_runnable():
+    return flight_booking_prompt | get_llm().bind_tools(
+        update_flight_tools + [CompleteOrEscalate]
+    )
 
 # Instantiate the flight booking assistant
-flight_booking_assistant = Assistant(update_flight_runnable)
\ No newline at end of file
+flight_booking_assistant = Assistant(build_update_flight_runnable)
\ No newline at end of file
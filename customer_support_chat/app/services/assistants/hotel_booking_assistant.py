@@ -6,7 +6,7 @@ from customer_support_chat.app.services.tools import (
     update_hotel,
     cancel_hotel,
 )
-from customer_support_chat.app.services.assistants.assistant_base import Assistant, CompleteOrEscalate, llm
+from customer_support_chat.app.services.assistants.assistant_base import Assistant, CompleteOrEscalate, get_llm
 
 # Hotel booking assistant prompt
 hotel_booking_prompt = ChatPromptTemplate.from_messages(
@@ -16,6 +16,7 @@ hotel_booking_prompt = ChatPromptTemplate.from_messages(
             "You are a specialized assistant for handling hotel bookings. "
             "The primary assistant delegates work to you whenever the user needs help booking a hotel. "
             "Search for available hotels based on the user's preferences and confirm the booking details with the customer. "
+            "Pass the location and stay dates you already know as search filters rather than only in the query text. "
             "When searching, be persistent. Expand your query bounds if the first search returns no results. "
             "If you need more information or the customer changes their mind, escalate the task back to the main assistant. "
             "Remember that a booking isn't completed until after the relevant tool has successfully been used."
@@ -39,9 +40,10 @@ book_hotel_sensitive_tools = [book_hotel, update_hotel, cancel_hotel]
 book_hotel_tools = book_hotel_safe_tools + book_hotel_sensitive_tools
 
 # Create the hotel booking assistant runnable
-book_hotel_runnable = hotel_booking_prompt | llm.bind_tools(
-    book_hotel_tools + [CompleteOrEscalate]
-)
+def build_book_hotel_runnable():
+    return hotel_booking_prompt | get_llm().bind_tools(
+        book_hotel_tools + [CompleteOrEscalate]
+    )
 
 # Instantiate the hotel booking assistant
-hotel_booking_assistant = Assistant(book_hotel_runnable)
\ No newline at end of file
+hotel_booking_assistant = Assistant(build_book_hotel_runnable)
\ No newline at end of file
@@ -3,9 +3,9 @@ from langchain_core.prompts import ChatPromptTemplate
 from customer_support_chat.app.services.tools import (
     search_flights,
     lookup_policy,
+    web_search,
 )
-from langchain_community.tools.ddg_search.tool import DuckDuckGoSearchResults
-from customer_support_chat.app.services.assistants.assistant_base import Assistant, llm
+from customer_support_chat.app.services.assistants.assistant_base import Assistant, get_llm
 from customer_support_chat.app.core.state import State
 from pydantic import BaseModel, Field
 
@@ -56,7 +56,7 @@ primary_assistant_prompt = ChatPromptTemplate.from_messages(
 
 # Primary assistant tools
 primary_assistant_tools = [
-    DuckDuckGoSearchResults(max_results=10),
+    web_search,
     search_flights,
     lookup_policy,
     ToFlightBookingAssistant,
@@ -66,7 +66,8 @@ primary_assistant_tools = [
 ]
 
 # Create the primary assistant runnable
-primary_assistant_runnable = primary_assistant_prompt | llm.bind_tools(primary_assistant_tools)
+def build_primary_assistant_runnable():
+    return primary_assistant_prompt | get_llm().bind_tools(primary_assistant_tools)
 
 # Instantiate the primary assistant
-primary_assistant = Assistant(primary_assistant_runnable)
\ No newline at end of file
+primary_assistant = Assistant(build_primary_assistant_runnable)
\ No newline at end of file
@@ -19,6 +19,7 @@ from .hotels import (
     update_hotel,
     cancel_hotel,
 )
+from .web import web_search
 from .excursions import (
     search_trip_recommendations,
     book_excursion,
@@ -45,4 +46,5 @@ __all__ = [
     "book_excursion",
     "update_excursion",
     "cancel_excursion",
+    "web_search",
 ]
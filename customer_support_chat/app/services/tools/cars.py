@@ -1,23 +1,37 @@
-from vectorizer.app.vectordb.vectordb import VectorDB
+from vectorizer.app.vectordb.registry import get_vectordb
+from vectorizer.app.vectordb.query_variants import query_variants
 from customer_support_chat.app.core.settings import get_settings
+from customer_support_chat.app.services.tools.encoding import search_tool
+from customer_support_chat.app.services.tools.database import transaction
 from langchain_core.tools import tool
-import sqlite3
 from typing import List, Dict, Optional, Union
 from datetime import datetime, date
 
 settings = get_settings()
-db = settings.SQLITE_DB_PATH
 
-cars_vectordb = VectorDB(table_name="car_rentals", collection_name="car_rentals_collection")
 
-@tool
-def search_car_rentals(
-    query: str,
-    limit: int = 2,
-) -> List[Dict]:
-    """Search for car rentals based on a natural language query."""
-    search_results = cars_vectordb.search(query, limit=limit)
+def cars_vectordb():
+    return get_vectordb("car_rentals", "car_rentals_collection")
+
+# The tool statements are module constants so query_plan_check can check that the indexes serve them
+BOOK_CAR_RENTAL_QUERY = "UPDATE car_rentals SET booked = 1 WHERE id = ?"
+CANCEL_CAR_RENTAL_QUERY = "UPDATE car_rentals SET booked = 0 WHERE id = ?"
+CAR_RENTAL_UPDATE_COLUMNS = ("start_date", "end_date")
+
+def car_rental_update_query(columns) -> str:
+    """The UPDATE setting the given columns of one car rental by id."""
+    return f"UPDATE car_rentals SET {', '.join(f'{column} = ?' for column in columns)} WHERE id = ?"
+
+def car_rentals_filter(location, price_tier, start_date, end_date, booked):
+    from vectorizer.app.vectordb.filters import build_filter, match_text, match_value, overlaps
+    return build_filter(
+        match_text("location", location),
+        match_value("price_tier", price_tier.title() if price_tier else None),
+        *overlaps("start_date", "end_date", start_date, end_date),
+        match_value("booked", int(booked) if booked is not None else None),
+    )
 
+def car_rentals_from_results(search_results) -> List[Dict]:
     rentals = []
     for result in search_results:
         payload = result.payload
@@ -34,20 +48,59 @@ def search_car_rentals(
         })
     return rentals
 
+def search_car_rentals_sync(
+    query: str,
+    location: Optional[str] = None,
+    price_tier: Optional[str] = None,
+    start_date: Optional[Union[datetime, date]] = None,
+    end_date: Optional[Union[datetime, date]] = None,
+    booked: Optional[bool] = None,
+    alternative_queries: Optional[List[str]] = None,
+    limit: int = 2,
+) -> List[Dict]:
+    """Search for car rentals based on a natural language query.
+
+    Optional filters narrow the results before ranking: location (city name), price_tier
+    (e.g. Economy, Midsize, Premium, Luxury), start_date/end_date (rentals available for
+    part of that period) and booked (False for rentals that are still free).
+
+    alternative_queries are other phrasings of the same question; they are searched
+    together with the query and the results are merged.
+    """
+    query_filter = car_rentals_filter(location, price_tier, start_date, end_date, booked)
+    return car_rentals_from_results(cars_vectordb().search_many(query_variants(query, alternative_queries), limit=limit, query_filter=query_filter))
+
+async def search_car_rentals_async(
+    query: str,
+    location: Optional[str] = None,
+    price_tier: Optional[str] = None,
+    start_date: Optional[Union[datetime, date]] = None,
+    end_date: Optional[Union[datetime, date]] = None,
+    booked: Optional[bool] = None,
+    alternative_queries: Optional[List[str]] = None,
+    limit: int = 2,
+) -> List[Dict]:
+    query_filter = car_rentals_filter(location, price_tier, start_date, end_date, booked)
+    return car_rentals_from_results(await cars_vectordb().asearch_many(query_variants(query, alternative_queries), limit=limit, query_filter=query_filter))
+
+# One tool with sync and async implementations, so ainvoke/astream of the graph never block on search I/O;
+# the model sees a compact table of the results (see encoding.py)
+search_car_rentals = search_tool(
+    search_car_rentals_sync,
+    search_car_rentals_async,
+    "search_car_rentals",
+)
+
 @tool
 def book_car_rental(rental_id: int) -> str:
     """Book a car rental by its ID."""
-    conn = sqlite3.connect(db)
-    cursor = conn.cursor()
-
-    cursor.execute("UPDATE car_rentals SET booked = 1 WHERE id = ?", (rental_id,))
-    conn.commit()
+    with transaction() as conn:
+        cursor = conn.execute(BOOK_CAR_RENTAL_QUERY, (rental_id,))
 
     if cursor.rowcount > 0:
-        conn.close()
+        cars_vectordb().update_row(rental_id, {"booked": 1})
         return f"Car rental {rental_id} successfully booked."
     else:
-        conn.close()
         return f"No car rental found with ID {rental_id}."
 
 @tool
@@ -57,41 +110,28 @@ def update_car_rental(
     end_date: Optional[Union[datetime, date]] = None,
 ) -> str:
     """Update a car rental's start and end dates by its ID."""
-    conn = sqlite3.connect(db)
-    cursor = conn.cursor()
-
-    if start_date:
-        cursor.execute(
-            "UPDATE car_rentals SET start_date = ? WHERE id = ?",
-            (start_date.strftime('%Y-%m-%d'), rental_id),
-        )
-    if end_date:
-        cursor.execute(
-            "UPDATE car_rentals SET end_date = ? WHERE id = ?",
-            (end_date.strftime('%Y-%m-%d'), rental_id),
-        )
-
-    conn.commit()
+    dates = zip(CAR_RENTAL_UPDATE_COLUMNS, (start_date, end_date))
+    updated = {column: value.strftime('%Y-%m-%d') for column, value in dates if value}
+    if not updated:
+        return f"No changes given for car rental {rental_id}."
+
+    with transaction() as conn:
+        cursor = conn.execute(car_rental_update_query(updated), (*updated.values(), rental_id))
 
     if cursor.rowcount > 0:
-        conn.close()
+        cars_vectordb().update_row(rental_id, updated)
         return f"Car rental {rental_id} successfully updated."
     else:
-        conn.close()
         return f"No car rental found with ID {rental_id}."
 
 @tool
 def cancel_car_rental(rental_id: int) -> str:
     """Cancel a car rental by its ID."""
-    conn = sqlite3.connect(db)
-    cursor = conn.cursor()
-
-    cursor.execute("UPDATE car_rentals SET booked = 0 WHERE id = ?", (rental_id,))
-    conn.commit()
+    with transaction() as conn:
+        cursor = conn.execute(CANCEL_CAR_RENTAL_QUERY, (rental_id,))
 
     if cursor.rowcount > 0:
-        conn.close()
+        cars_vectordb().update_row(rental_id, {"booked": 0})
         return f"Car rental {rental_id} successfully cancelled."
     else:
-        conn.close()
         return f"No car rental found with ID {rental_id}."
@@ -0,0 +1,99 @@
+"""SQLite connections shared by the tools.
+
+Each thread keeps one connection to the travel database and reuses it (and its cache
+of prepared statements) across tool calls. Connections run in WAL mode, so sessions
+keep reading while another one writes, and wait up to `SQLITE_BUSY_TIMEOUT` seconds for
+a lock instead of failing with "database is locked". Reads run in autocommit mode;
+writes go through `transaction()`, which takes the write lock up front.
+"""
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, List
+from customer_support_chat.app.core.settings import get_settings
+
+settings = get_settings()
+
+_local = threading.local()
+
+# Indexes behind the tool queries (query_plan_check verifies that they are used). The pandas
+# rewrite in update_dates drops the original keys and indexes, so these are recreated afterwards
+TOOL_INDEXES = {
+    "ix_tickets_passenger_id": ("tickets", ("passenger_id",)),
+    "ix_tickets_ticket_no": ("tickets", ("ticket_no",)),
+    "ix_ticket_flights_ticket_no": ("ticket_flights", ("ticket_no", "flight_id")),
+    "ix_boarding_passes_ticket_no": ("boarding_passes", ("ticket_no", "flight_id")),
+    "ix_flights_flight_id": ("flights", ("flight_id",)),
+    "ix_flights_flight_no": ("flights", ("flight_no", "scheduled_departure")),
+    "ix_flights_departure": ("flights", ("departure_airport", "scheduled_departure")),
+    "ix_flights_arrival": ("flights", ("arrival_airport", "scheduled_departure")),
+    "ix_hotels_id": ("hotels", ("id",)),
+    "ix_car_rentals_id": ("car_rentals", ("id",)),
+    "ix_trip_recommendations_id": ("trip_recommendations", ("id",)),
+}
+
+
+def get_connection() -> sqlite3.Connection:
+    """The calling thread's connection to `SQLITE_DB_PATH`, opened on first use."""
+    conn = getattr(_local, "connection", None)
+    if conn is None:
+        conn = sqlite3.connect(
+            settings.SQLITE_DB_PATH,
+            timeout=settings.SQLITE_BUSY_TIMEOUT,
+            cached_statements=settings.SQLITE_CACHED_STATEMENTS,
+            isolation_level=None,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT * 1000)}")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _local.connection = conn
+    return conn
+
+
+def close_connection():
+    """Close the calling thread's connection, e.g. before the database file is replaced."""
+    conn = getattr(_local, "connection", None)
+    if conn is not None:
+        conn.close()
+        _local.connection = None
+
+
+def ensure_indexes(db_file: str) -> List[str]:
+    """Create the missing `TOOL_INDEXES` of the tables in `db_file` and refresh the planner statistics.
+
+    Returns the names of the indexes that were created.
+    """
+    conn = sqlite3.connect(db_file)
+    try:
+        tables = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        existing = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        created = []
+        for name, (table, columns) in TOOL_INDEXES.items():
+            if table in tables and name not in existing:
+                conn.execute(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})")
+                created.append(name)
+        # Full statistics after new indexes, otherwise only what changed enough to matter
+        conn.execute("ANALYZE" if created else "PRAGMA optimize")
+        conn.commit()
+        return created
+    finally:
+        conn.close()
+
+
+def fetch_all(query: str, params=()) -> List[Dict]:
+    cursor = get_connection().execute(query, params)
+    column_names = [column[0] for column in cursor.description]
+    return [dict(zip(column_names, row)) for row in cursor.fetchall()]
+
+
+@contextmanager
+def transaction():
+    """Run the block's statements as one write transaction, rolled back if the block raises."""
+    conn = get_connection()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
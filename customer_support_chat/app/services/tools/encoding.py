@@ -0,0 +1,95 @@
+import functools
+from typing import Dict, List, Optional, Sequence
+from langchain_core.tools import StructuredTool
+from vectorizer.app.embeddings.batching import estimate_tokens
+from customer_support_chat.app.core.settings import get_tool_token_budget
+
+# Columns left out of the encoded table: the chunk restates the other payload fields
+OMITTED_COLUMNS = ("chunk",)
+
+
+def format_value(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return f"{value:.3f}"
+    # One row per line, and "|" separates the cells
+    return " ".join(str(value).split()).replace("|", "/")
+
+
+def truncate_text(text: str, max_tokens: int) -> str:
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    return text[:max(max_tokens - 1, 0) * 4].rstrip() + "…"
+
+
+def encode_results(
+    rows: List[Dict],
+    tool_name: str,
+    budget: Optional[int] = None,
+    omit: Sequence[str] = OMITTED_COLUMNS,
+) -> str:
+    """Encode search results as a compact table that fits the tool's token budget.
+
+    Values shared by every row are stated once above the table, one `column=value`
+    line each, the `omit` columns are dropped, and rows that do not fit the budget are
+    cut (the first one is truncated instead) with a note of how many were left out.
+    """
+    if not rows:
+        return "No results found."
+    budget = budget or get_tool_token_budget(tool_name)
+
+    columns = [column for column in dict.fromkeys(column for row in rows for column in row) if column not in omit]
+    shared = {}
+    if len(rows) > 1:
+        shared = {
+            column: rows[0].get(column)
+            for column in columns
+            if column != "similarity" and all(row.get(column) == rows[0].get(column) for row in rows)
+        }
+        columns = [column for column in columns if column not in shared]
+
+    lines = []
+    if shared:
+        # One field per line: values may contain commas or semicolons themselves
+        lines.append("All results:")
+        lines.extend(f"{column}={format_value(value)}" for column, value in shared.items())
+    lines.append("|".join(columns))
+    used = sum(estimate_tokens(line) for line in lines)
+
+    for index, row in enumerate(rows):
+        line = "|".join(format_value(row.get(column)) for column in columns)
+        remaining = len(rows) - index - 1
+        # Keep room for the note about the rows that will not fit
+        room = budget - used - (8 if remaining else 0)
+        if estimate_tokens(line) > room:
+            if index == 0:
+                lines.append(truncate_text(line, max(room, 16)))
+                index += 1
+            omitted = len(rows) - index
+            if omitted:
+                lines.append(f"({omitted} more results omitted to fit the token budget; narrow the search to see them)")
+            break
+        lines.append(line)
+        used += estimate_tokens(line)
+    return "\n".join(lines)
+
+
+def search_tool(func, coroutine, name: str, omit: Sequence[str] = OMITTED_COLUMNS) -> StructuredTool:
+    """A tool that sends the compact encoding of `func`'s rows to the model and keeps the rows as the message artifact."""
+    @functools.wraps(func)
+    def encoded(*args, **kwargs):
+        rows = func(*args, **kwargs)
+        return encode_results(rows, name, omit=omit), rows
+
+    @functools.wraps(coroutine)
+    async def aencoded(*args, **kwargs):
+        rows = await coroutine(*args, **kwargs)
+        return encode_results(rows, name, omit=omit), rows
+
+    return StructuredTool.from_function(
+        func=encoded,
+        coroutine=aencoded,
+        name=name,
+        response_format="content_and_artifact",
+    )
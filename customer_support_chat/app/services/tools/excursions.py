@@ -1,21 +1,29 @@
-from vectorizer.app.vectordb.vectordb import VectorDB
+from vectorizer.app.vectordb.registry import get_vectordb
+from vectorizer.app.vectordb.query_variants import query_variants
 from customer_support_chat.app.core.settings import get_settings
+from customer_support_chat.app.services.tools.encoding import search_tool
+from customer_support_chat.app.services.tools.database import transaction
 from langchain_core.tools import tool
-import sqlite3
 from typing import Optional, List, Dict
 
 settings = get_settings()
-db = settings.SQLITE_DB_PATH
-excursions_vectordb = VectorDB(table_name="trip_recommendations", collection_name="excursions_collection")
 
-@tool
-def search_trip_recommendations(
-    query: str,
-    limit: int = 2,
-) -> List[Dict]:
-    """Search for trip recommendations based on a natural language query."""
-    search_results = excursions_vectordb.search(query, limit=limit)
+def excursions_vectordb():
+    return get_vectordb("trip_recommendations", "excursions_collection")
+
+# The tool statements are module constants so query_plan_check can check that the indexes serve them
+BOOK_EXCURSION_QUERY = "UPDATE trip_recommendations SET booked = 1 WHERE id = ?"
+UPDATE_EXCURSION_QUERY = "UPDATE trip_recommendations SET details = ? WHERE id = ?"
+CANCEL_EXCURSION_QUERY = "UPDATE trip_recommendations SET booked = 0 WHERE id = ?"
+
+def trip_recommendations_filter(location, booked):
+    from vectorizer.app.vectordb.filters import build_filter, match_text, match_value
+    return build_filter(
+        match_text("location", location),
+        match_value("booked", int(booked) if booked is not None else None),
+    )
 
+def trip_recommendations_from_results(search_results) -> List[Dict]:
     recommendations = []
     for result in search_results:
         payload = result.payload
@@ -31,57 +39,74 @@ def search_trip_recommendations(
         })
     return recommendations
 
+def search_trip_recommendations_sync(
+    query: str,
+    location: Optional[str] = None,
+    booked: Optional[bool] = None,
+    alternative_queries: Optional[List[str]] = None,
+    limit: int = 2,
+) -> List[Dict]:
+    """Search for trip recommendations based on a natural language query.
+
+    Optional filters narrow the results before ranking: location (city name) and
+    booked (False for trips that are still free).
+
+    alternative_queries are other phrasings of the same question; they are searched
+    together with the query and the results are merged.
+    """
+    query_filter = trip_recommendations_filter(location, booked)
+    return trip_recommendations_from_results(excursions_vectordb().search_many(query_variants(query, alternative_queries), limit=limit, query_filter=query_filter))
+
+async def search_trip_recommendations_async(
+    query: str,
+    location: Optional[str] = None,
+    booked: Optional[bool] = None,
+    alternative_queries: Optional[List[str]] = None,
+    limit: int = 2,
+) -> List[Dict]:
+    query_filter = trip_recommendations_filter(location, booked)
+    return trip_recommendations_from_results(await excursions_vectordb().asearch_many(query_variants(query, alternative_queries), limit=limit, query_filter=query_filter))
+
+# One tool with sync and async implementations, so ainvoke/astream of the graph never block on search I/O;
+# the model sees a compact table of the results (see encoding.py)
+search_trip_recommendations = search_tool(
+    search_trip_recommendations_sync,
+    search_trip_recommendations_async,
+    "search_trip_recommendations",
+)
+
 @tool
 def book_excursion(recommendation_id: int) -> str:
     """Book an excursion by its ID."""
-    conn = sqlite3.connect(db)
-    cursor = conn.cursor()
-
-    cursor.execute(
-        "UPDATE trip_recommendations SET booked = 1 WHERE id = ?", (recommendation_id,)
-    )
-    conn.commit()
+    with transaction() as conn:
+        cursor = conn.execute(BOOK_EXCURSION_QUERY, (recommendation_id,))
 
     if cursor.rowcount > 0:
-        conn.close()
+        excursions_vectordb().update_row(recommendation_id, {"booked": 1})
         return f"Excursion {recommendation_id} successfully booked."
     else:
-        conn.close()
         return f"No excursion found with ID {recommendation_id}."
 
 @tool
 def update_excursion(recommendation_id: int, details: str) -> str:
     """Update an excursion's details by its ID."""
-    conn = sqlite3.connect(db)
-    cursor = conn.cursor()
-
-    cursor.execute(
-        "UPDATE trip_recommendations SET details = ? WHERE id = ?",
-        (details, recommendation_id),
-    )
-    conn.commit()
+    with transaction() as conn:
+        cursor = conn.execute(UPDATE_EXCURSION_QUERY, (details, recommendation_id))
 
     if cursor.rowcount > 0:
-        conn.close()
+        excursions_vectordb().update_row(recommendation_id, {"details": details})
         return f"Excursion {recommendation_id} successfully updated."
     else:
-        conn.close()
         return f"No excursion found with ID {recommendation_id}."
 
 @tool
 def cancel_excursion(recommendation_id: int) -> str:
     """Cancel an excursion by its ID."""
-    conn = sqlite3.connect(db)
-    cursor = conn.cursor()
-
-    cursor.execute(
-        "UPDATE trip_recommendations SET booked = 0 WHERE id = ?", (recommendation_id,)
-    )
-    conn.commit()
+    with transaction() as conn:
+        cursor = conn.execute(CANCEL_EXCURSION_QUERY, (recommendation_id,))
 
     if cursor.rowcount > 0:
-        conn.close()
+        excursions_vectordb().update_row(recommendation_id, {"booked": 0})
         return f"Excursion {recommendation_id} successfully cancelled."
     else:
-        conn.close()
         return f"No excursion found with ID {recommendation_id}."
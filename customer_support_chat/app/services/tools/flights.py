@@ -1,16 +1,43 @@
-from vectorizer.app.vectordb.vectordb import VectorDB
+from vectorizer.app.vectordb.registry import get_vectordb
+from vectorizer.app.vectordb.query_variants import query_variants, AIRPORT_CITIES
 from customer_support_chat.app.core.settings import get_settings
+from customer_support_chat.app.services.tools.encoding import search_tool
+from customer_support_chat.app.services.tools.database import fetch_all, get_connection, transaction
 from langchain_core.tools import tool
 from langchain_core.runnables import RunnableConfig
-import sqlite3
+import asyncio
+import re
+import threading
 from typing import Optional, Union, List, Dict
-from datetime import datetime, date
-import pytz
+from datetime import datetime, date, timedelta, timezone
 
 settings = get_settings()
-db = settings.SQLITE_DB_PATH
-flights_vectordb = VectorDB(table_name="flights", collection_name="flights_collection")
 
+def flights_vectordb():
+    return get_vectordb("flights", "flights_collection")
+
+# The tool queries are module constants so query_plan_check can check that the indexes serve them
+USER_FLIGHTS_QUERY = """
+SELECT 
+    t.ticket_no, t.book_ref,
+    f.flight_id, f.flight_no, f.departure_airport, f.arrival_airport, f.scheduled_departure, f.scheduled_arrival,
+    bp.seat_no, tf.fare_conditions
+FROM 
+    tickets t
+    JOIN ticket_flights tf ON t.ticket_no = tf.ticket_no
+    JOIN flights f ON tf.flight_id = f.flight_id
+    LEFT JOIN boarding_passes bp ON bp.ticket_no = t.ticket_no AND bp.flight_id = f.flight_id
+WHERE 
+    t.passenger_id = ?
+"""
+
+TICKET_QUERY = "SELECT * FROM tickets WHERE ticket_no = ? AND passenger_id = ?"
+TICKET_FLIGHT_IDS_QUERY = "SELECT flight_id FROM ticket_flights WHERE ticket_no = ?"
+KNOWN_AIRPORTS_QUERY = "SELECT departure_airport FROM flights UNION SELECT arrival_airport FROM flights"
+SCHEDULE_SAMPLE_QUERY = "SELECT scheduled_departure FROM flights WHERE flight_id = (SELECT MIN(flight_id) FROM flights)"
+UPDATE_TICKET_FLIGHT_QUERY = "UPDATE ticket_flights SET flight_id = ? WHERE ticket_no = ?"
+DELETE_TICKET_FLIGHTS_QUERY = "DELETE FROM ticket_flights WHERE ticket_no = ?"
+DELETE_TICKET_QUERY = "DELETE FROM tickets WHERE ticket_no = ?"
 
 @tool
 def fetch_user_flight_information(*, config: RunnableConfig) -> List[Dict]:
@@ -20,40 +47,9 @@ def fetch_user_flight_information(*, config: RunnableConfig) -> List[Dict]:
     if not passenger_id:
         raise ValueError("No passenger ID configured.")
 
-    conn = sqlite3.connect(db)
-    cursor = conn.cursor()
-
-    query = """
-    SELECT 
-        t.ticket_no, t.book_ref,
-        f.flight_id, f.flight_no, f.departure_airport, f.arrival_airport, f.scheduled_departure, f.scheduled_arrival,
-        bp.seat_no, tf.fare_conditions
-    FROM 
-        tickets t
-        JOIN ticket_flights tf ON t.ticket_no = tf.ticket_no
-        JOIN flights f ON tf.flight_id = f.flight_id
-        LEFT JOIN boarding_passes bp ON bp.ticket_no = t.ticket_no AND bp.flight_id = f.flight_id
-    WHERE 
-        t.passenger_id = ?
-    """
-    cursor.execute(query, (passenger_id,))
-    rows = cursor.fetchall()
-    column_names = [column[0] for column in cursor.description]
-    results = [dict(zip(column_names, row)) for row in rows]
-
-    cursor.close()
-    conn.close()
-
-    return results
-
-@tool
-def search_flights(
-    query: str,
-    limit: int = 2,
-) -> List[Dict]:
-    """Search for flights based on a natural language query."""
-    search_results = flights_vectordb.search(query, limit=limit)
+    return fetch_all(USER_FLIGHTS_QUERY, (passenger_id,))
 
+def flights_from_results(search_results) -> List[Dict]:
     flights = []
     for result in search_results:
         payload = result.payload
@@ -73,6 +69,215 @@ def search_flights(
         })
     return flights
 
+FLIGHT_COLUMNS = [
+    "flight_id", "flight_no", "departure_airport", "arrival_airport", "scheduled_departure",
+    "scheduled_arrival", "status", "aircraft_code", "actual_departure", "actual_arrival",
+]
+
+_airports = None
+_airports_lock = threading.Lock()
+
+def known_airports() -> set:
+    """Airport codes that appear in the flights table, read once per process."""
+    global _airports
+    with _airports_lock:
+        if _airports is None:
+            _airports = {
+                code for (code,) in get_connection().execute(KNOWN_AIRPORTS_QUERY)
+            }
+    return _airports
+
+_schedule_timezone = None
+_schedule_timezone_read = False
+
+def schedule_timezone() -> Optional[timezone]:
+    """The UTC offset of the times in the flights table (None when they have none), read once per process."""
+    global _schedule_timezone, _schedule_timezone_read
+    with _airports_lock:
+        if not _schedule_timezone_read:
+            row = get_connection().execute(SCHEDULE_SAMPLE_QUERY).fetchone()
+            _schedule_timezone = datetime.fromisoformat(row[0]).tzinfo if row and row[0] else None
+            _schedule_timezone_read = True
+    return _schedule_timezone
+
+def airport_mentions(query: str) -> List[Dict]:
+    """Airports named in the query, by code or city, in order of appearance.
+
+    Consecutive mentions of the same airport, as in "Basel (BSL)", count once.
+    """
+    airports = known_airports()
+    mentions = []
+    for match in re.finditer(r"\b[A-Z]{3}\b", query):
+        if match.group() in airports:
+            mentions.append({"position": match.start(), "codes": [match.group()]})
+    cities = {}
+    for code, city in AIRPORT_CITIES.items():
+        if code in airports:
+            cities.setdefault(city, []).append(code)
+    for city, codes in cities.items():
+        for match in re.finditer(rf"\b{re.escape(city)}\b", query, re.IGNORECASE):
+            mentions.append({"position": match.start(), "codes": codes})
+    merged = []
+    for mention in sorted(mentions, key=lambda mention: mention["position"]):
+        previous = merged[-1] if merged else None
+        shared = [code for code in previous["codes"] if code in mention["codes"]] if previous else []
+        if shared:
+            # "Basel (BSL)" names one airport twice; the more specific of the two wins
+            previous["codes"] = shared
+        else:
+            merged.append(mention)
+    return merged
+
+def as_date_bound(value, end=False) -> Optional[str]:
+    """`value` as text comparable with `scheduled_departure`, in the offset of the flights table.
+
+    The departures are stored with their UTC offset (e.g. "2024-05-01 12:09:03.561731-04:00"),
+    so an aware value is converted to that offset first. Naive values and bare dates are
+    taken to be in it already; a table without offsets is taken to be in UTC.
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = date.fromisoformat(value) if len(value) == 10 else datetime.fromisoformat(value)
+    if not isinstance(value, datetime):
+        # A bare date covers the whole day
+        value = datetime.combine(value, datetime.min.time()) + (timedelta(days=1) if end else timedelta())
+    if value.tzinfo is not None:
+        value = value.astimezone(schedule_timezone() or timezone.utc)
+    # Without the offset, "2024-05-01 12:00:00" sorts before every departure in that second
+    return value.strftime("%Y-%m-%d %H:%M:%S")
+
+def structured_flight_criteria(
+    query: str,
+    departure_airport: Optional[str] = None,
+    arrival_airport: Optional[str] = None,
+    start_time: Optional[Union[datetime, date]] = None,
+    end_time: Optional[Union[datetime, date]] = None,
+    flight_no: Optional[str] = None,
+) -> Optional[Dict]:
+    """Route/date/flight-number criteria from the arguments or the query, or None for a free-text question.
+
+    Explicit arguments win. Otherwise a flight number (e.g. LX0112), the airports
+    mentioned ("from BSL to Zurich"; the first is the departure unless it follows
+    "to") and ISO dates (one date is that day, two are a range) are read from the query.
+    Without a window only flights that have not departed yet match.
+    """
+    criteria = {
+        "departure_airports": [departure_airport.upper()] if departure_airport else [],
+        "arrival_airports": [arrival_airport.upper()] if arrival_airport else [],
+        "start_time": as_date_bound(start_time),
+        "end_time": as_date_bound(end_time, end=True),
+        "flight_no": flight_no.upper() if flight_no else None,
+    }
+    if not any(criteria.values()):
+        match = re.search(r"\b[A-Z]{2}\d{3,4}\b", query.upper())
+        criteria["flight_no"] = match.group() if match else None
+
+        mentions = airport_mentions(query)
+        if len(mentions) >= 2:
+            criteria["departure_airports"] = mentions[0]["codes"]
+            criteria["arrival_airports"] = mentions[1]["codes"]
+        elif mentions:
+            before = query[:mentions[0]["position"]].lower().split()
+            side = "arrival_airports" if before and before[-1] in ("to", "into") else "departure_airports"
+            criteria[side] = mentions[0]["codes"]
+
+        dates = re.findall(r"\b\d{4}-\d{2}-\d{2}\b", query)
+        if dates and (criteria["flight_no"] or criteria["departure_airports"] or criteria["arrival_airports"]):
+            criteria["start_time"] = as_date_bound(date.fromisoformat(dates[0]))
+            criteria["end_time"] = as_date_bound(date.fromisoformat(dates[-1]), end=True)
+
+    if not (criteria["flight_no"] or criteria["departure_airports"] or criteria["arrival_airports"]):
+        return None
+    if not criteria["start_time"] and not criteria["end_time"]:
+        # Without a window, list the flights that have not departed yet
+        criteria["start_time"] = as_date_bound(datetime.now(timezone.utc))
+    return criteria
+
+def schedule_query(criteria: Dict, limit: int):
+    """The SQL and parameters selecting the flights that match the criteria, soonest departure first."""
+    clauses, params = [], []
+    for column, values in (("departure_airport", criteria["departure_airports"]), ("arrival_airport", criteria["arrival_airports"])):
+        if values:
+            clauses.append(f"{column} IN ({','.join('?' * len(values))})")
+            params.extend(values)
+    if criteria["flight_no"]:
+        clauses.append("flight_no = ?")
+        params.append(criteria["flight_no"])
+    if criteria["start_time"]:
+        clauses.append("scheduled_departure >= ?")
+        params.append(criteria["start_time"])
+    if criteria["end_time"]:
+        clauses.append("scheduled_departure < ?")
+        params.append(criteria["end_time"])
+
+    query = (
+        f"SELECT {', '.join(FLIGHT_COLUMNS)} FROM flights WHERE {' AND '.join(clauses)} "
+        f"ORDER BY scheduled_departure LIMIT ?"
+    )
+    return query, (*params, limit)
+
+def search_flights_by_schedule(criteria: Dict, limit: int) -> List[Dict]:
+    """Flights matching the route, flight number and departure window, soonest departure first."""
+    return fetch_all(*schedule_query(criteria, limit))
+
+def search_flights_sync(
+    query: str,
+    departure_airport: Optional[str] = None,
+    arrival_airport: Optional[str] = None,
+    start_time: Optional[Union[datetime, date]] = None,
+    end_time: Optional[Union[datetime, date]] = None,
+    flight_no: Optional[str] = None,
+    alternative_queries: Optional[List[str]] = None,
+    limit: int = 2,
+) -> List[Dict]:
+    """Search for flights based on a natural language query.
+
+    Route, schedule and flight-number questions are answered from the flights table:
+    pass departure_airport/arrival_airport (airport codes), a start_time/end_time
+    window for the scheduled departure or a flight_no, or name them in the query
+    (e.g. "LX0112" or "from BSL to ZRH on 2024-05-01"). Raise limit to list more
+    flights; without a window only upcoming flights are listed. Other questions use
+    semantic search.
+
+    alternative_queries are other phrasings of the same question (e.g. with city names
+    instead of airport codes); they are searched together with the query and the
+    results are merged.
+    """
+    criteria = structured_flight_criteria(query, departure_airport, arrival_airport, start_time, end_time, flight_no)
+    if criteria:
+        flights = search_flights_by_schedule(criteria, limit)
+        if flights:
+            return flights
+    return flights_from_results(flights_vectordb().search_many(query_variants(query, alternative_queries), limit=limit))
+
+async def search_flights_async(
+    query: str,
+    departure_airport: Optional[str] = None,
+    arrival_airport: Optional[str] = None,
+    start_time: Optional[Union[datetime, date]] = None,
+    end_time: Optional[Union[datetime, date]] = None,
+    flight_no: Optional[str] = None,
+    alternative_queries: Optional[List[str]] = None,
+    limit: int = 2,
+) -> List[Dict]:
+    criteria = await asyncio.to_thread(
+        structured_flight_criteria, query, departure_airport, arrival_airport, start_time, end_time, flight_no
+    )
+    if criteria:
+        flights = await asyncio.to_thread(search_flights_by_schedule, criteria, limit)
+        if flights:
+            return flights
+    return flights_from_results(await flights_vectordb().asearch_many(query_variants(query, alternative_queries), limit=limit))
+
+# One tool with sync and async implementations, so ainvoke/astream of the graph never block on search I/O;
+# the model sees a compact table of the results (see encoding.py)
+search_flights = search_tool(
+    search_flights_sync,
+    search_flights_async,
+    "search_flights",
+)
+
 @tool
 def update_ticket_to_new_flight(
     ticket_no: str, new_flight_id: int, *, config: RunnableConfig
@@ -83,31 +288,24 @@ def update_ticket_to_new_flight(
     if not passenger_id:
         raise ValueError("No passenger ID configured.")
 
-    conn = sqlite3.connect(db)
-    cursor = conn.cursor()
+    # The ownership check and the update run in one transaction, so the ticket cannot change in between
+    with transaction() as conn:
+        ticket = conn.execute(TICKET_QUERY, (ticket_no, passenger_id)).fetchone()
+        if not ticket:
+            return f"Ticket {ticket_no} not found for passenger {passenger_id}."
 
-    # Check if the ticket exists and belongs to the passenger
-    cursor.execute(
-        "SELECT * FROM tickets WHERE ticket_no = ? AND passenger_id = ?",
-        (ticket_no, passenger_id),
-    )
-    ticket = cursor.fetchone()
-    if not ticket:
-        conn.close()
-        return f"Ticket {ticket_no} not found for passenger {passenger_id}."
-
-    # Update the flight in ticket_flights
-    cursor.execute(
-        "UPDATE ticket_flights SET flight_id = ? WHERE ticket_no = ?",
-        (new_flight_id, ticket_no),
-    )
-    conn.commit()
+        old_flight_ids = [
+            row[0] for row in conn.execute(TICKET_FLIGHT_IDS_QUERY, (ticket_no,))
+        ]
+
+        # Update the flight in ticket_flights
+        cursor = conn.execute(UPDATE_TICKET_FLIGHT_QUERY, (new_flight_id, ticket_no))
 
     if cursor.rowcount > 0:
-        conn.close()
+        for flight_id in old_flight_ids + [new_flight_id]:
+            flights_vectordb().invalidate_row(flight_id)
         return f"Ticket {ticket_no} successfully updated to flight {new_flight_id}."
     else:
-        conn.close()
         return f"Failed to update ticket {ticket_no}."
 
 @tool
@@ -118,30 +316,20 @@ def cancel_ticket(ticket_no: str, *, config: RunnableConfig) -> str:
     if not passenger_id:
         raise ValueError("No passenger ID configured.")
 
-    conn = sqlite3.connect(db)
-    cursor = conn.cursor()
+    with transaction() as conn:
+        ticket = conn.execute(TICKET_QUERY, (ticket_no, passenger_id)).fetchone()
+        if not ticket:
+            return f"Ticket {ticket_no} not found for passenger {passenger_id}."
 
-    # Check if the ticket exists and belongs to the passenger
-    cursor.execute(
-        "SELECT * FROM tickets WHERE ticket_no = ? AND passenger_id = ?",
-        (ticket_no, passenger_id),
-    )
-    ticket = cursor.fetchone()
-    if not ticket:
-        conn.close()
-        return f"Ticket {ticket_no} not found for passenger {passenger_id}."
-
-    # Delete from ticket_flights
-    cursor.execute(
-        "DELETE FROM ticket_flights WHERE ticket_no = ?",
-        (ticket_no,),
-    )
-    # Delete from tickets
-    cursor.execute(
-        "DELETE FROM tickets WHERE ticket_no = ?",
-        (ticket_no,),
-    )
-    conn.commit()
+        flight_ids = [
+            row[0] for row in conn.execute(TICKET_FLIGHT_IDS_QUERY, (ticket_no,))
+        ]
+
+        # Delete from ticket_flights
+        conn.execute(DELETE_TICKET_FLIGHTS_QUERY, (ticket_no,))
+        # Delete from tickets
+        conn.execute(DELETE_TICKET_QUERY, (ticket_no,))
 
-    conn.close()
+    for flight_id in flight_ids:
+        flights_vectordb().invalidate_row(flight_id)
     return f"Ticket {ticket_no} successfully cancelled."
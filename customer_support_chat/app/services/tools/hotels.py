@@ -1,22 +1,36 @@
-from vectorizer.app.vectordb.vectordb import VectorDB
+from vectorizer.app.vectordb.registry import get_vectordb
+from vectorizer.app.vectordb.query_variants import query_variants
 from customer_support_chat.app.core.settings import get_settings
+from customer_support_chat.app.services.tools.encoding import search_tool
+from customer_support_chat.app.services.tools.database import transaction
 from langchain_core.tools import tool
-import sqlite3
 from typing import Optional, Union, List, Dict
 from datetime import datetime, date
 
 settings = get_settings()
-db = settings.SQLITE_DB_PATH
-hotels_vectordb = VectorDB(table_name="hotels", collection_name="hotels_collection")
 
-@tool
-def search_hotels(
-    query: str,
-    limit: int = 2,
-) -> List[Dict]:
-    """Search for hotels based on a natural language query."""
-    search_results = hotels_vectordb.search(query, limit=limit)
+def hotels_vectordb():
+    return get_vectordb("hotels", "hotels_collection")
+
+# The tool statements are module constants so query_plan_check can check that the indexes serve them
+BOOK_HOTEL_QUERY = "UPDATE hotels SET booked = 1 WHERE id = ?"
+CANCEL_HOTEL_QUERY = "UPDATE hotels SET booked = 0 WHERE id = ?"
+HOTEL_UPDATE_COLUMNS = ("checkin_date", "checkout_date")
+
+def hotel_update_query(columns) -> str:
+    """The UPDATE setting the given columns of one hotel by id."""
+    return f"UPDATE hotels SET {', '.join(f'{column} = ?' for column in columns)} WHERE id = ?"
+
+def hotels_filter(location, price_tier, checkin_date, checkout_date, booked):
+    from vectorizer.app.vectordb.filters import build_filter, match_text, match_value, overlaps
+    return build_filter(
+        match_text("location", location),
+        match_value("price_tier", price_tier.title() if price_tier else None),
+        *overlaps("checkin_date", "checkout_date", checkin_date, checkout_date),
+        match_value("booked", int(booked) if booked is not None else None),
+    )
 
+def hotels_from_results(search_results) -> List[Dict]:
     hotels = []
     for result in search_results:
         payload = result.payload
@@ -33,20 +47,59 @@ def search_hotels(
         })
     return hotels
 
+def search_hotels_sync(
+    query: str,
+    location: Optional[str] = None,
+    price_tier: Optional[str] = None,
+    checkin_date: Optional[Union[datetime, date]] = None,
+    checkout_date: Optional[Union[datetime, date]] = None,
+    booked: Optional[bool] = None,
+    alternative_queries: Optional[List[str]] = None,
+    limit: int = 2,
+) -> List[Dict]:
+    """Search for hotels based on a natural language query.
+
+    Optional filters narrow the results before ranking: location (city name), price_tier
+    (e.g. Midscale, Upper Midscale, Upscale, Luxury), checkin_date/checkout_date (hotels
+    available for part of that stay) and booked (False for hotels that are still free).
+
+    alternative_queries are other phrasings of the same question; they are searched
+    together with the query and the results are merged.
+    """
+    query_filter = hotels_filter(location, price_tier, checkin_date, checkout_date, booked)
+    return hotels_from_results(hotels_vectordb().search_many(query_variants(query, alternative_queries), limit=limit, query_filter=query_filter))
+
+async def search_hotels_async(
+    query: str,
+    location: Optional[str] = None,
+    price_tier: Optional[str] = None,
+    checkin_date: Optional[Union[datetime, date]] = None,
+    checkout_date: Optional[Union[datetime, date]] = None,
+    booked: Optional[bool] = None,
+    alternative_queries: Optional[List[str]] = None,
+    limit: int = 2,
+) -> List[Dict]:
+    query_filter = hotels_filter(location, price_tier, checkin_date, checkout_date, booked)
+    return hotels_from_results(await hotels_vectordb().asearch_many(query_variants(query, alternative_queries), limit=limit, query_filter=query_filter))
+
+# One tool with sync and async implementations, so ainvoke/astream of the graph never block on search I/O;
+# the model sees a compact table of the results (see encoding.py)
+search_hotels = search_tool(
+    search_hotels_sync,
+    search_hotels_async,
+    "search_hotels",
+)
+
 @tool
 def book_hotel(hotel_id: int) -> str:
     """Book a hotel by its ID."""
-    conn = sqlite3.connect(db)
-    cursor = conn.cursor()
-
-    cursor.execute("UPDATE hotels SET booked = 1 WHERE id = ?", (hotel_id,))
-    conn.commit()
+    with transaction() as conn:
+        cursor = conn.execute(BOOK_HOTEL_QUERY, (hotel_id,))
 
     if cursor.rowcount > 0:
-        conn.close()
+        hotels_vectordb().update_row(hotel_id, {"booked": 1})
         return f"Hotel {hotel_id} successfully booked."
     else:
-        conn.close()
         return f"No hotel found with ID {hotel_id}."
 
 @tool
@@ -56,41 +109,28 @@ def update_hotel(
     checkout_date: Optional[Union[datetime, date]] = None,
 ) -> str:
     """Update a hotel's check-in and check-out dates by its ID."""
-    conn = sqlite3.connect(db)
-    cursor = conn.cursor()
-
-    if checkin_date:
-        cursor.execute(
-            "UPDATE hotels SET checkin_date = ? WHERE id = ?",
-            (checkin_date.strftime('%Y-%m-%d'), hotel_id),
-        )
-    if checkout_date:
-        cursor.execute(
-            "UPDATE hotels SET checkout_date = ? WHERE id = ?",
-            (checkout_date.strftime('%Y-%m-%d'), hotel_id),
-        )
-
-    conn.commit()
+    dates = zip(HOTEL_UPDATE_COLUMNS, (checkin_date, checkout_date))
+    updated = {column: value.strftime('%Y-%m-%d') for column, value in dates if value}
+    if not updated:
+        return f"No changes given for hotel {hotel_id}."
+
+    with transaction() as conn:
+        cursor = conn.execute(hotel_update_query(updated), (*updated.values(), hotel_id))
 
     if cursor.rowcount > 0:
-        conn.close()
+        hotels_vectordb().update_row(hotel_id, updated)
         return f"Hotel {hotel_id} successfully updated."
     else:
-        conn.close()
         return f"No hotel found with ID {hotel_id}."
 
 @tool
 def cancel_hotel(hotel_id: int) -> str:
     """Cancel a hotel by its ID."""
-    conn = sqlite3.connect(db)
-    cursor = conn.cursor()
-
-    cursor.execute("UPDATE hotels SET booked = 0 WHERE id = ?", (hotel_id,))
-    conn.commit()
+    with transaction() as conn:
+        cursor = conn.execute(CANCEL_HOTEL_QUERY, (hotel_id,))
 
     if cursor.rowcount > 0:
-        conn.close()
+        hotels_vectordb().update_row(hotel_id, {"booked": 0})
         return f"Hotel {hotel_id} successfully cancelled."
     else:
-        conn.close()
         return f"No hotel found with ID {hotel_id}."
@@ -1,41 +1,75 @@
-from vectorizer.app.vectordb.vectordb import VectorDB
-from customer_support_chat.app.core.settings import get_settings
-from langchain_core.tools import tool
+from vectorizer.app.vectordb.registry import get_vectordb
+from vectorizer.app.vectordb.query_variants import query_variants
+from customer_support_chat.app.core.settings import get_settings, get_tool_token_budget
+from customer_support_chat.app.services.tools.encoding import search_tool, truncate_text
+from langchain_core.tools import StructuredTool
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 logger = logging.getLogger(__name__)
 
 settings = get_settings()
-faq_vectordb = VectorDB(table_name="faq", collection_name="faq_collection")
 
-@tool
-def search_faq(
-    query: str,
-    limit: int = 2,
-) -> List[Dict]:
-    """Search for FAQ entries based on a natural language query."""
-    search_results = faq_vectordb.search(query, limit=limit)
+def faq_vectordb():
+    return get_vectordb("faq", "faq_collection")
 
+def faq_from_results(search_results) -> List[Dict]:
     faq_entries = []
     for result in search_results:
         payload = result.payload
         faq_entries.append({
-            "question": payload["question"],
-            "answer": payload["answer"],
-            "category": payload["category"],
+            "section": payload.get("section"),
             "chunk": payload["content"],
             "similarity": result.score,
         })
     return faq_entries
 
-@tool
-def lookup_policy(query: str) -> str:
-    """Consult the company policies to check whether certain options are permitted.
-    Use this before making any flight changes or performing other 'write' events."""
-    faq_results = search_faq(query, limit=2)
+def search_faq_sync(
+    query: str,
+    alternative_queries: Optional[List[str]] = None,
+    limit: int = 2,
+) -> List[Dict]:
+    """Search for FAQ entries based on a natural language query.
+
+    alternative_queries are other phrasings of the same question; they are searched
+    together with the query and the results are merged.
+    """
+    return faq_from_results(faq_vectordb().search_many(query_variants(query, alternative_queries), limit=limit))
+
+async def search_faq_async(
+    query: str,
+    alternative_queries: Optional[List[str]] = None,
+    limit: int = 2,
+) -> List[Dict]:
+    return faq_from_results(await faq_vectordb().asearch_many(query_variants(query, alternative_queries), limit=limit))
+
+# One tool with sync and async implementations, so ainvoke/astream of the graph never block on search I/O;
+# the model sees a compact table of the results (see encoding.py)
+search_faq = search_tool(
+    search_faq_sync,
+    search_faq_async,
+    "search_faq",
+    omit=(),
+)
+
+def policy_from_entries(faq_results: List[Dict]) -> str:
     if not faq_results:
         return "Sorry, I couldn't find any relevant policy information. Please contact support for assistance."
-    
-    policy_info = "\n\n".join([f"Q: {entry['question']}\nA: {entry['answer']}" for entry in faq_results])
-    return f"Here's the relevant policy information:\n\n{policy_info}"
+
+    # Each FAQ section starts with its own heading, so the chunks read as-is
+    policy_info = "\n\n".join(entry["chunk"] for entry in faq_results)
+    return truncate_text(f"Here's the relevant policy information:\n\n{policy_info}", get_tool_token_budget("lookup_policy"))
+
+def lookup_policy_sync(query: str) -> str:
+    """Consult the company policies to check whether certain options are permitted.
+    Use this before making any flight changes or performing other 'write' events."""
+    return policy_from_entries(search_faq_sync(query, limit=2))
+
+async def lookup_policy_async(query: str) -> str:
+    return policy_from_entries(await search_faq_async(query, limit=2))
+
+lookup_policy = StructuredTool.from_function(
+    func=lookup_policy_sync,
+    coroutine=lookup_policy_async,
+    name="lookup_policy",
+)
@@ -0,0 +1,25 @@
+from langchain_core.tools import StructuredTool
+import threading
+
+_duckduckgo = None
+_duckduckgo_lock = threading.Lock()
+
+def get_duckduckgo():
+    """The DuckDuckGo search tool, created (and langchain_community imported) on first use."""
+    global _duckduckgo
+    with _duckduckgo_lock:
+        if _duckduckgo is None:
+            from langchain_community.tools.ddg_search.tool import DuckDuckGoSearchResults
+            _duckduckgo = DuckDuckGoSearchResults(max_results=10)
+    return _duckduckgo
+
+def duckduckgo_results(query: str) -> str:
+    """A wrapper around Duck Duck Go Search. Useful for when you need to answer questions about current events.
+    Input should be a search query. Output is a JSON array of the query results."""
+    return get_duckduckgo().invoke(query)
+
+# Same name and arguments as DuckDuckGoSearchResults, without importing langchain_community up front
+web_search = StructuredTool.from_function(
+    func=duckduckgo_results,
+    name="duckduckgo_results_json",
+)
@@ -2,11 +2,9 @@ import os
 import shutil
 import sqlite3
 from datetime import datetime
-import pandas as pd
-import requests
 from customer_support_chat.app.core.settings import get_settings
 from customer_support_chat.app.core.logger import logger
-from qdrant_client import QdrantClient
+from vectorizer.app.core.clients import get_qdrant_client as shared_qdrant_client
 from customer_support_chat.app.core.settings import get_settings
 from typing import List, Dict, Callable
 
@@ -45,13 +43,22 @@ def download_and_prepare_db():
         os.makedirs(db_dir)
     db_url = "https://storage.googleapis.com/benchmarks-artifacts/travel-db/travel2.sqlite"
     if not os.path.exists(db_file):
+        import requests
         response = requests.get(db_url)
         response.raise_for_status()
         with open(db_file, "wb") as f:
             f.write(response.content)
         update_dates(db_file)
 
+    # Also on every start, so databases prepared before an index was added get it too
+    from customer_support_chat.app.services.tools.database import ensure_indexes
+    created = ensure_indexes(db_file)
+    if created:
+        logger.info(f"Created indexes {', '.join(created)} in {db_file}")
+
 def update_dates(db_file):
+    import pandas as pd
+
     backup_file = db_file + '.backup'
     if not os.path.exists(backup_file):
         shutil.copy(db_file, backup_file)
@@ -119,7 +126,8 @@ def create_tool_node_with_fallback(tools: list):
 def get_qdrant_client():
     settings = get_settings()
     try:
-        client = QdrantClient(url=settings.QDRANT_URL)
+        # The process-wide client, shared with the search tools
+        client = shared_qdrant_client()
         # Test the connection
         client.get_collections()
         return client
@@ -0,0 +1,83 @@
+"""Cold-start import benchmark of the chat app.
+
+Imports a module (the compiled graph by default) in fresh interpreters with
+`python -X importtime` and reports the wall time and the modules that cost the most,
+so regressions in worker start-up time show up before they reach autoscaling. Run it
+with `python -m customer_support_chat.app.startup_benchmark`.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+
+def import_times(module):
+    """Import `module` in a fresh interpreter; return the wall time and {module: (self_us, cumulative_us)}."""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if self_us.isdigit():
+            times[name] = (int(self_us), int(cumulative_us))
+    return wall, times
+
+
+def run_startup_benchmark(module="customer_support_chat.app.graph", runs=3, top=15):
+    walls = []
+    per_module = defaultdict(list)
+    for _ in range(runs):
+        wall, times = import_times(module)
+        walls.append(wall)
+        for name, (self_us, cumulative_us) in times.items():
+            per_module[name].append((self_us, cumulative_us))
+
+    packages = defaultdict(float)
+    for name, samples in per_module.items():
+        packages[name.split(".")[0]] += statistics.median(self_us for self_us, _ in samples) / 1000
+
+    def ms(samples, index):
+        return round(statistics.median(sample[index] for sample in samples) / 1000, 1)
+
+    slowest = sorted(per_module.items(), key=lambda item: ms(item[1], 1), reverse=True)[:top]
+    return {
+        "module": module,
+        "runs": runs,
+        "wall_seconds": round(statistics.median(walls), 3),
+        "import_ms": ms(per_module[module], 1) if module in per_module else None,
+        "modules": [{"module": name, "cumulative_ms": ms(samples, 1), "self_ms": ms(samples, 0)} for name, samples in slowest],
+        "packages_ms": dict(sorted(((name, round(value, 1)) for name, value in packages.items()), key=lambda item: -item[1])[:top]),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the cold-start import time of the chat app")
+    parser.add_argument("--module", default="customer_support_chat.app.graph", help="Module to import")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters to take the median of")
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules and packages to report")
+    parser.add_argument(
+        "--max-import-ms",
+        type=float,
+        default=0,
+        help="Exit with status 1 when importing the module takes longer than this"
+    )
+    args = parser.parse_args()
+
+    report = run_startup_benchmark(args.module, args.runs, args.top)
+    print(json.dumps(report, indent=2))
+    if args.max_import_ms and (report["import_ms"] or 0) > args.max_import_ms:
+        print(f"Importing {args.module} took {report['import_ms']} ms, above the limit of {args.max_import_ms} ms", file=sys.stderr)
+        sys.exit(1)
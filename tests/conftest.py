@@ -0,0 +1,10 @@
+import os
+import tempfile
+
+# Settings are read at import time: keep every database, cache and index the tests
+# touch out of the data directory, and run without network services
+_data_dir = tempfile.mkdtemp(prefix="customer-support-tests-")
+os.environ.setdefault("SQLITE_DB_PATH", os.path.join(_data_dir, "travel2.sqlite"))
+os.environ.setdefault("EMBEDDING_PROVIDER", "hashing")
+os.environ.setdefault("EMBEDDING_CACHE_ENABLED", "False")
+os.environ.setdefault("QUERY_EMBEDDING_DISK_CACHE", "False")
@@ -0,0 +1,53 @@
+import asyncio
+from vectorizer.app.core.settings import get_collection_tuning
+from vectorizer.app.embeddings.batching import estimate_tokens, pack_batches
+from vectorizer.app.embeddings.providers import HashingEmbeddingProvider
+from vectorizer.app.vectordb.stores import NumpyVectorStore
+from vectorizer.app.vectordb.vectordb import VectorDB
+
+
+def test_batches_are_bounded_by_inputs_and_tokens():
+    texts = ["a" * 40] * 5  # 11 estimated tokens each
+
+    assert [len(batch) for batch in pack_batches(texts, max_inputs=2, max_tokens=1000)] == [2, 2, 1]
+    assert [len(batch) for batch in pack_batches(texts, max_inputs=10, max_tokens=25)] == [2, 2, 1]
+    assert estimate_tokens("a" * 40) == 11
+
+
+def test_an_oversized_item_gets_a_batch_of_its_own():
+    texts = ["short", "x" * 400, "short"]
+
+    assert list(pack_batches(texts, max_inputs=10, max_tokens=20)) == [["short"], ["x" * 400], ["short"]]
+
+
+class BatchRejectingProvider(HashingEmbeddingProvider):
+    """Fails every multi-input request, and single inputs containing "bad"."""
+
+    def __init__(self):
+        super().__init__(16)
+        self.requests = []
+
+    def embed(self, texts):
+        self.requests.append(list(texts))
+        if len(texts) > 1 or "bad" in texts[0]:
+            raise ValueError("rejected")
+        return super().embed(texts)
+
+
+def test_a_failed_batch_is_retried_one_chunk_at_a_time(tmp_path):
+    provider = BatchRejectingProvider()
+    vectordb = VectorDB(
+        table_name="hotels",
+        collection_name="hotels_collection",
+        embedding_provider=provider,
+        store=NumpyVectorStore("hotels_collection", provider.dimensions, get_collection_tuning("hotels_collection"), path=str(tmp_path)),
+        use_embedding_cache=False,
+    )
+
+    embeddings = asyncio.run(vectordb.embed_batch(["good one", "bad one", "good two"], session=None))
+
+    assert provider.requests[0] == ["good one", "bad one", "good two"]
+    assert sorted(map(tuple, provider.requests[1:])) == [("bad one",), ("good one",), ("good two",)]
+    assert embeddings[0] == provider.embed_one("good one")
+    assert embeddings[1] is None
+    assert vectordb.report.counters["embedding_failures"] == 1
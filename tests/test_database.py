@@ -0,0 +1,46 @@
+import threading
+import pytest
+from customer_support_chat.app.services.tools.database import fetch_all, get_connection, transaction
+
+
+@pytest.fixture
+def notes():
+    with transaction() as conn:
+        conn.execute("DROP TABLE IF EXISTS notes")
+        conn.execute("CREATE TABLE notes (id INTEGER, text TEXT)")
+        conn.execute("INSERT INTO notes VALUES (1, 'first')")
+
+
+def test_each_thread_reuses_its_own_wal_connection():
+    conn = get_connection()
+    other = []
+    thread = threading.Thread(target=lambda: other.append(get_connection()))
+    thread.start()
+    thread.join()
+
+    assert get_connection() is conn
+    assert other[0] is not conn
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_a_failed_transaction_is_rolled_back(notes):
+    with pytest.raises(RuntimeError):
+        with transaction() as conn:
+            conn.execute("UPDATE notes SET text = 'changed' WHERE id = 1")
+            raise RuntimeError("tool failed")
+
+    assert fetch_all("SELECT id, text FROM notes") == [{"id": 1, "text": "first"}]
+
+
+def test_writes_from_several_threads_all_commit(notes):
+    def write(i):
+        with transaction() as conn:
+            conn.execute("INSERT INTO notes VALUES (?, ?)", (i, f"note {i}"))
+
+    threads = [threading.Thread(target=write, args=(i,)) for i in range(2, 10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert fetch_all("SELECT COUNT(*) AS notes FROM notes") == [{"notes": 9}]
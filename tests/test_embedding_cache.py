@@ -0,0 +1,107 @@
+import asyncio
+from vectorizer.app.embeddings import embedding_cache
+from vectorizer.app.embeddings.embedding_generator import (
+    generate_query_embedding,
+    generate_query_embeddings,
+    generate_query_embeddings_async,
+)
+from vectorizer.app.embeddings.providers import HashingEmbeddingProvider, OpenAIEmbeddingProvider
+from vectorizer.app.embeddings.embedding_cache import EmbeddingCache
+from vectorizer.app.embeddings.query_cache import QueryEmbeddingCache, normalize_query
+
+
+def test_entries_are_keyed_by_model_and_text(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite"), max_bytes=1 << 20)
+    cache.put("model-a", "hotel in Basel", [1.0, 2.0])
+    cache.put("model-b", "hotel in Basel", [3.0, 4.0])
+
+    assert cache.get("model-a", "hotel in Basel") == [1.0, 2.0]
+    assert cache.get("model-b", "hotel in Basel") == [3.0, 4.0]
+    assert cache.get("model-a", "hotel in Zurich") is None
+    assert cache.get_many("model-a", ["hotel in Basel", "hotel in Zurich"]) == {"hotel in Basel": [1.0, 2.0]}
+
+
+def test_hits_do_not_write_until_a_batch_is_pending(tmp_path, monkeypatch):
+    monkeypatch.setattr(embedding_cache, "TOUCH_BATCH_SIZE", 3)
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite"), max_bytes=1 << 20)
+    cache.put_many("model", [(f"query {i}", [float(i)]) for i in range(3)])
+    changes = cache._conn.total_changes
+
+    cache.get("model", "query 0")
+    cache.get("model", "query 1")
+    assert cache._conn.total_changes == changes
+
+    cache.get("model", "query 2")
+    assert cache._conn.total_changes == changes + 3
+    assert cache.stats()["hits"] == 3
+
+
+def test_pending_touches_survive_closing_and_reopening_the_cache(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = EmbeddingCache(path, max_bytes=1 << 20)
+    cache.put_many("model", [("old", [0.0]), ("new", [1.0])])
+    cache._conn.execute("UPDATE embeddings SET last_used = 0")
+    cache._conn.commit()
+
+    cache.get("model", "old")
+    cache.close()
+
+    reopened = EmbeddingCache(path, max_bytes=1 << 20)
+    last_used = dict(reopened._conn.execute("SELECT text_hash, last_used FROM embeddings"))
+    assert last_used[EmbeddingCache.text_hash("old")] > 0
+    assert last_used[EmbeddingCache.text_hash("new")] == 0
+
+
+def test_query_cache_keys_are_normalized():
+    assert normalize_query("  Flights to  BASEL?? ") == "flights to basel"
+
+    cache = QueryEmbeddingCache(max_entries=2)
+    cache.put("model", normalize_query("Hotels in Zurich!"), [0.5])
+    assert cache.get("model", normalize_query("hotels in zurich")) == [0.5]
+    assert cache.get("other-model", "hotels in zurich") is None
+
+
+def test_a_different_embedding_size_does_not_reuse_cached_vectors():
+    small = OpenAIEmbeddingProvider("text-embedding-3-large", dimensions=256)
+    large = OpenAIEmbeddingProvider("text-embedding-3-large", dimensions=1024)
+    for provider in (small, large):
+        provider.embed = lambda texts, size=provider.dimensions: [[0.0] * size for _ in texts]
+
+    assert len(generate_query_embedding("hotels in Lucerne", provider=small)) == 256
+    assert len(generate_query_embedding("hotels in Lucerne", provider=large)) == 1024
+
+
+class RecordingProvider(HashingEmbeddingProvider):
+    def __init__(self):
+        super().__init__(16)
+        self.embedded = []
+
+    def embed(self, texts):
+        self.embedded.extend(texts)
+        return super().embed(texts)
+
+
+def test_query_variants_share_the_embedding_of_the_original_text():
+    provider = RecordingProvider()
+    first, second = generate_query_embeddings(["Hotels in Lugano?", "hotels  in lugano"], provider=provider)
+
+    assert provider.embedded == ["Hotels in Lugano?"]
+    assert first == second == provider.embed_one("Hotels in Lugano?")
+
+    vectors = asyncio.run(generate_query_embeddings_async(["Cars in Bern!", "cars in bern"], provider=provider))
+    assert provider.embedded[1:] == ["Cars in Bern!"]
+    assert vectors[0] == vectors[1]
+
+
+def test_query_cache_evicts_the_least_recent_query_and_falls_back_to_disk(tmp_path):
+    disk = EmbeddingCache(str(tmp_path / "cache.sqlite"), max_bytes=1 << 20)
+    cache = QueryEmbeddingCache(max_entries=2, disk_cache=disk)
+    cache.put("model", "basel", [1.0])
+    cache.put("model", "zurich", [2.0])
+    cache.get("model", "basel")
+    cache.put("model", "geneva", [3.0])
+
+    assert cache.stats()["entries"] == 2
+    assert cache.get("model", "zurich") == [2.0]
+    assert cache.stats()["disk_hits"] == 1
+    assert QueryEmbeddingCache(max_entries=2).get("model", "zurich") is None
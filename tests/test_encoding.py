@@ -0,0 +1,20 @@
+from customer_support_chat.app.services.tools.encoding import encode_results
+
+
+def test_shared_values_are_one_field_per_line_so_commas_stay_unambiguous():
+    rows = [
+        {"id": 1, "name": "Louvre tour", "keywords": "art, history", "location": "Paris", "similarity": 0.91},
+        {"id": 2, "name": "Orsay tour", "keywords": "art, history", "location": "Paris", "similarity": 0.87},
+    ]
+    lines = encode_results(rows, "search_trip_recommendations", budget=500).splitlines()
+
+    assert lines[:3] == ["All results:", "keywords=art, history", "location=Paris"]
+    assert lines[3] == "id|name|similarity"
+    assert lines[4:] == ["1|Louvre tour|0.910", "2|Orsay tour|0.870"]
+
+
+def test_rows_beyond_the_budget_are_counted():
+    rows = [{"id": i, "details": f"description {i} " * 10} for i in range(20)]
+    text = encode_results(rows, "search_trip_recommendations", budget=150)
+
+    assert "more results omitted" in text
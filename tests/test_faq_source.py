@@ -0,0 +1,71 @@
+import asyncio
+from vectorizer.app.vectordb.faq_source import fetch_faq, split_sections, write_cached
+
+URL = "https://example.com/faq.md"
+
+
+class FakeResponse:
+    def __init__(self, status, body="", headers=None):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise RuntimeError(f"HTTP {self.status}")
+
+    async def text(self):
+        return self.body
+
+
+class FakeSession:
+    def __init__(self, response):
+        self.response = response
+        self.requests = []
+
+    def get(self, url, headers=None):
+        self.requests.append(headers or {})
+        if isinstance(self.response, Exception):
+            raise self.response
+        return self.response
+
+
+def test_sections_are_keyed_by_heading():
+    faq = "# Swiss FAQ\nIntro\n## Booking\nHow to book\n## Refunds\nFirst\n## Booking\nChanges"
+
+    assert split_sections(faq) == [
+        ("Swiss FAQ", "# Swiss FAQ\nIntro"),
+        ("Booking", "## Booking\nHow to book"),
+        ("Refunds", "## Refunds\nFirst"),
+        ("Booking (2)", "## Booking\nChanges"),
+    ]
+
+
+def test_a_cached_faq_is_revalidated_and_reused_when_unchanged(tmp_path):
+    cache_dir = str(tmp_path / "faq_cache")
+    session = FakeSession(FakeResponse(200, "## Booking\nv1", {"ETag": '"v1"'}))
+    assert asyncio.run(fetch_faq(session, URL, cache_dir)) == "## Booking\nv1"
+
+    session = FakeSession(FakeResponse(304))
+    assert asyncio.run(fetch_faq(session, URL, cache_dir)) == "## Booking\nv1"
+    assert session.requests == [{"If-None-Match": '"v1"'}]
+
+
+def test_the_cached_copy_is_used_when_the_source_is_unreachable(tmp_path):
+    cache_dir = str(tmp_path / "faq_cache")
+    write_cached(cache_dir, "## Booking\ncached", {"source": URL})
+
+    assert asyncio.run(fetch_faq(FakeSession(ConnectionError("offline")), URL, cache_dir)) == "## Booking\ncached"
+
+
+def test_a_local_file_is_read_directly(tmp_path):
+    path = tmp_path / "faq.md"
+    path.write_text("## Booking\nlocal", encoding="utf-8")
+
+    assert asyncio.run(fetch_faq(None, f"file://{path}", str(tmp_path / "unused"))) == "## Booking\nlocal"
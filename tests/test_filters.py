@@ -0,0 +1,29 @@
+from datetime import date
+from qdrant_client.models import DatetimeRange, FieldCondition
+from customer_support_chat.app.services.tools.hotels import hotels_filter
+from vectorizer.app.vectordb.filters import build_filter, overlaps, payload_matches
+
+
+def hotel(checkin_date, checkout_date, **payload):
+    return {"location": "Basel", "price_tier": "Luxury", "booked": 0,
+            "checkin_date": checkin_date, "checkout_date": checkout_date, **payload}
+
+
+def test_overlaps_becomes_one_range_condition_per_end_of_the_period():
+    start_condition, end_condition = overlaps("checkin_date", "checkout_date", date(2024, 4, 20), date(2024, 4, 25))
+
+    assert start_condition == FieldCondition(key="checkin_date", range=DatetimeRange(lte=date(2024, 4, 25)))
+    assert end_condition == FieldCondition(key="checkout_date", range=DatetimeRange(gte=date(2024, 4, 20)))
+    assert overlaps("checkin_date", "checkout_date") == [None, None]
+    assert build_filter(*overlaps("checkin_date", "checkout_date")) is None
+
+
+def test_hotel_filter_keeps_stays_that_overlap_the_requested_dates():
+    query_filter = hotels_filter("basel", "luxury", date(2024, 4, 20), date(2024, 4, 25), False)
+
+    assert payload_matches(hotel("2024-04-18", "2024-04-21"), query_filter)
+    assert payload_matches(hotel("2024-04-24", "2024-04-30"), query_filter)
+    assert not payload_matches(hotel("2024-04-10", "2024-04-19"), query_filter)
+    assert not payload_matches(hotel("2024-04-26", "2024-04-28"), query_filter)
+    assert not payload_matches(hotel("2024-04-18", "2024-04-21", booked=1), query_filter)
+    assert not payload_matches(hotel("2024-04-18", "2024-04-21", location="Zurich"), query_filter)
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from customer_support_chat.app.services.tools import flights
+from customer_support_chat.app.services.tools.database import transaction
+
+EDT = timezone(timedelta(hours=-4))
+
+
+@pytest.fixture(autouse=True)
+def known_airports(monkeypatch):
+    monkeypatch.setattr(flights, "_airports", {"BSL", "ZRH", "GVA"})
+    monkeypatch.setattr(flights, "_schedule_timezone", EDT)
+    monkeypatch.setattr(flights, "_schedule_timezone_read", True)
+
+
+def test_city_with_its_code_is_one_airport():
+    criteria = flights.structured_flight_criteria("Flights from Basel (BSL) to Zurich")
+
+    assert criteria["departure_airports"] == ["BSL"]
+    assert criteria["arrival_airports"] == ["ZRH"]
+
+
+def test_route_between_codes():
+    criteria = flights.structured_flight_criteria("Is there a flight BSL to ZRH on 2024-05-01?")
+
+    assert criteria["departure_airports"] == ["BSL"]
+    assert criteria["arrival_airports"] == ["ZRH"]
+    assert (criteria["start_time"], criteria["end_time"]) == ("2024-05-01 00:00:00", "2024-05-02 00:00:00")
+
+
+def test_single_airport_after_to_is_the_arrival():
+    criteria = flights.structured_flight_criteria("What flies to Geneva?")
+
+    assert criteria["departure_airports"] == []
+    assert criteria["arrival_airports"] == ["GVA"]
+
+
+def test_flight_number_without_dates_starts_now():
+    before = datetime.now(EDT).strftime("%Y-%m-%d %H:%M:%S")
+    criteria = flights.structured_flight_criteria("When does lx0112 leave?")
+
+    assert criteria["flight_no"] == "LX0112"
+    assert criteria["start_time"] >= before
+    assert criteria["end_time"] is None
+
+
+def test_explicit_end_time_keeps_past_flights():
+    criteria = flights.structured_flight_criteria("", departure_airport="bsl", end_time="2024-05-01")
+
+    assert criteria["departure_airports"] == ["BSL"]
+    assert criteria["start_time"] is None
+    assert criteria["end_time"] == "2024-05-02 00:00:00"
+
+
+def test_free_text_question_has_no_criteria():
+    assert flights.structured_flight_criteria("Can I bring my bike on board?") is None
+
+
+def test_upcoming_flights_are_cut_off_in_the_offset_of_the_departures(monkeypatch):
+    monkeypatch.setattr(flights, "_schedule_timezone_read", False)
+    now = datetime.now(timezone.utc)
+    departures = {1: now - timedelta(hours=2), 2: now + timedelta(hours=2)}
+    with transaction() as conn:
+        conn.execute("DROP TABLE IF EXISTS flights")
+        conn.execute(f"CREATE TABLE flights ({', '.join(flights.FLIGHT_COLUMNS)})")
+        for flight_id, departure in departures.items():
+            # Stored the way update_dates writes them: local time with fractional seconds and offset
+            scheduled = departure.astimezone(EDT).isoformat(sep=" ", timespec="microseconds")
+            conn.execute(
+                "INSERT INTO flights (flight_id, flight_no, departure_airport, arrival_airport, scheduled_departure) "
+                "VALUES (?, 'LX0112', 'BSL', 'ZRH', ?)",
+                (flight_id, scheduled),
+            )
+
+    criteria = flights.structured_flight_criteria("Flights from BSL to ZRH")
+
+    assert flights.schedule_timezone() == EDT
+    assert [flight["flight_id"] for flight in flights.search_flights_by_schedule(criteria, 5)] == [2]
+
+
+def test_aware_bounds_are_converted_to_the_offset_of_the_departures():
+    bound = flights.as_date_bound(datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc))
+
+    assert bound == "2024-05-01 08:00:00"
@@ -0,0 +1,91 @@
+import logging
+from qdrant_client.models import PointStruct, ScoredPoint
+from vectorizer.app.core.settings import get_collection_tuning, get_hybrid_search
+from vectorizer.app.embeddings.providers import HashingEmbeddingProvider
+from vectorizer.app.vectordb.filters import build_filter, match_value
+from vectorizer.app.vectordb.fusion import fuse_results
+from vectorizer.app.vectordb.lexical import LexicalIndex
+from vectorizer.app.vectordb.stores import HybridVectorStore, NumpyVectorStore
+
+provider = HashingEmbeddingProvider(64)
+
+
+def scored(point_id, score):
+    return ScoredPoint(id=point_id, version=0, score=score)
+
+
+def test_fusion_ranks_points_found_by_several_lists_first_and_keeps_their_best_score():
+    fused = fuse_results([
+        [scored(1, 0.9), scored(2, 0.8), scored(3, 0.7)],
+        [scored(3, 0.95), scored(4, 0.6)],
+    ], limit=3)
+
+    assert [point.id for point in fused] == [3, 1, 2]
+    assert fused[0].score == 0.95
+
+
+def make_store(tmp_path):
+    store = HybridVectorStore(
+        NumpyVectorStore("flights_collection", provider.dimensions, get_collection_tuning("flights_collection"), path=str(tmp_path / "vectors")),
+        LexicalIndex("flights_collection", path=str(tmp_path / "lexical")),
+    )
+    store.create()
+    return store
+
+
+def flight(point_id, flight_no, content, **payload):
+    content = f"Flight {flight_no} {content}"
+    return PointStruct(
+        id=point_id,
+        vector=provider.embed([content])[0],
+        payload={"content": content, "flight_no": flight_no, **payload},
+    )
+
+
+def test_keyword_search_finds_exact_tokens_and_respects_filters(tmp_path):
+    store = make_store(tmp_path)
+    store.upsert([
+        flight("a", "LX0112", "from BSL to ZRH", status="Scheduled"),
+        flight("b", "LX0113", "from ZRH to BSL", status="Scheduled"),
+        flight("c", "LX0112", "from BSL to ZRH on another day", status="Arrived"),
+    ])
+    query = "LX0112"
+    vector = provider.embed([query])[0]
+
+    assert {point.id for point in store.keyword_search(query, vector, limit=5)} == {"a", "c"}
+    arrived = store.keyword_search(query, vector, limit=5, query_filter=build_filter(match_value("status", "Arrived")))
+    assert [point.id for point in arrived] == ["c"]
+    assert -1.0 <= arrived[0].score <= 1.0
+
+
+def test_payload_updates_reach_the_keyword_index(tmp_path):
+    store = make_store(tmp_path)
+    store.upsert([flight("a", "LX0112", "from BSL to ZRH")])
+
+    store.set_payload("flight_no", "LX0112", {"content": "Flight LX0112 from BSL to GVA"})
+    assert [point_id for point_id, _ in store.lexical.search("GVA", 5)] == ["a"]
+
+    store.set_point_payloads({"a": {"content": "Flight LX0112 from BSL to CDG"}})
+    assert store.lexical.search("GVA", 5) == []
+    assert [point_id for point_id, _ in store.lexical.search("CDG", 5)] == ["a"]
+
+
+def test_an_empty_keyword_index_over_a_filled_store_is_reported(tmp_path, caplog):
+    store = make_store(tmp_path)
+    store.dense.upsert([flight("a", "LX0112", "from BSL to ZRH")])
+
+    with caplog.at_level(logging.WARNING):
+        assert store.keyword_search("LX0112", provider.embed(["LX0112"])[0], limit=5) == []
+    assert "keyword index of flights_collection" in caplog.text
+
+
+def test_hybrid_search_defaults_to_the_local_backend_only(monkeypatch):
+    monkeypatch.delenv("HYBRID_SEARCH", raising=False)
+    monkeypatch.setenv("FAQ_COLLECTION_VECTOR_STORE_BACKEND", "numpy")
+    monkeypatch.setenv("HOTELS_COLLECTION_VECTOR_STORE_BACKEND", "qdrant")
+    monkeypatch.setenv("FLIGHTS_COLLECTION_HYBRID_SEARCH", "True")
+    monkeypatch.setenv("FLIGHTS_COLLECTION_VECTOR_STORE_BACKEND", "qdrant")
+
+    assert get_hybrid_search("faq_collection")
+    assert not get_hybrid_search("hotels_collection")
+    assert get_hybrid_search("flights_collection")
@@ -0,0 +1,75 @@
+import sqlite3
+from vectorizer.app.core.settings import get_collection_tuning
+from vectorizer.app.embeddings.providers import HashingEmbeddingProvider
+from vectorizer.app.vectordb.stores import NumpyVectorStore
+from vectorizer.app.vectordb.vectordb import VectorDB
+
+
+class RecordingProvider(HashingEmbeddingProvider):
+    def __init__(self):
+        super().__init__(16)
+        self.embedded = []
+
+    def embed(self, texts):
+        self.embedded.extend(texts)
+        return super().embed(texts)
+
+
+def make_cars_db(path):
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE car_rentals (id INTEGER, name TEXT, location TEXT, price_tier TEXT, "
+        "start_date TEXT, end_date TEXT, booked INTEGER)"
+    )
+    conn.executemany("INSERT INTO car_rentals VALUES (?, ?, ?, ?, ?, ?, ?)", [
+        (1, "Europcar", "Basel", "Economy", "2024-04-14", "2024-04-11", 0),
+        (2, "Avis", "Basel", "Luxury", "2024-04-10", "2024-04-20", 0),
+        (3, "Hertz", "Zurich", "Midsize", "2024-04-10", "2024-04-07", 0),
+    ])
+    conn.commit()
+    conn.close()
+
+
+def index_cars(tmp_path, db_path, provider, incremental):
+    vectordb = VectorDB(
+        table_name="car_rentals",
+        collection_name="car_rentals_collection",
+        create_collection=True,
+        incremental=incremental,
+        embedding_provider=provider,
+        store=NumpyVectorStore(
+            "car_rentals_collection", provider.dimensions,
+            get_collection_tuning("car_rentals_collection"), path=str(tmp_path / "vectors"),
+        ),
+        db_path=db_path,
+        use_embedding_cache=False,
+    )
+    vectordb.create_embeddings()
+    return vectordb
+
+
+def test_point_ids_depend_only_on_the_table_row_and_chunk():
+    vectordb = VectorDB(table_name="car_rentals", collection_name="car_rentals_collection", store=object())
+
+    assert vectordb.point_id(1, 0) == vectordb.point_id(1, 0)
+    assert len({vectordb.point_id(1, 0), vectordb.point_id(1, 1), vectordb.point_id(2, 0)}) == 3
+
+
+def test_incremental_indexing_embeds_only_changed_rows_and_drops_removed_ones(tmp_path):
+    db_path = str(tmp_path / "travel.sqlite")
+    make_cars_db(db_path)
+    first = index_cars(tmp_path, db_path, RecordingProvider(), incremental=False)
+    assert first.store.count() == 3
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE car_rentals SET booked = 1 WHERE id = 1")
+    conn.execute("DELETE FROM car_rentals WHERE id = 3")
+    conn.commit()
+    conn.close()
+
+    provider = RecordingProvider()
+    second = index_cars(tmp_path, db_path, provider, incremental=True)
+
+    assert len(provider.embedded) == 1 and "Europcar" in provider.embedded[0]
+    assert second.index_stats["unchanged"] == 1
+    assert set(second.store.content_hashes()) == {second.point_id(1, 0), second.point_id(2, 0)}
@@ -0,0 +1,38 @@
+from qdrant_client.models import PointStruct
+from vectorizer.app.core.settings import get_collection_tuning
+from vectorizer.app.vectordb.filters import build_filter, match_value
+from vectorizer.app.vectordb.stores import NumpyVectorStore
+
+
+def make_store(tmp_path):
+    store = NumpyVectorStore("test_collection", 2, get_collection_tuning("test_collection"), path=str(tmp_path))
+    store.create()
+    return store
+
+
+def point(point_id, vector, **payload):
+    return PointStruct(id=point_id, vector=vector, payload=payload)
+
+
+def test_upsert_reuses_free_slots(tmp_path):
+    store = make_store(tmp_path)
+    store.upsert([point(str(i), [1.0, float(i)], booked=0) for i in range(100)])
+    store.delete([str(i) for i in range(0, 100, 2)])
+    store.upsert([point(f"new-{i}", [0.0, 1.0], booked=0) for i in range(50)])
+
+    assert store.count() == 100
+    assert len(store._vectors) == 100
+    assert {p.id for p in store.search([0.0, 1.0], limit=50)} == {f"new-{i}" for i in range(50)}
+
+
+def test_filtered_search_sees_payload_updates(tmp_path):
+    store = make_store(tmp_path)
+    store.upsert([point("1", [1.0, 0.0], id=1, booked=0), point("2", [0.9, 0.1], id=2, booked=0)])
+    booked = build_filter(match_value("booked", 1))
+    assert store.search([1.0, 0.0], limit=5, query_filter=booked) == []
+
+    store.set_payload("id", 1, {"booked": 1})
+    assert [p.id for p in store.search([1.0, 0.0], limit=5, query_filter=booked)] == ["1"]
+
+    store.delete(["1"])
+    assert store.search([1.0, 0.0], limit=5, query_filter=booked) == []
@@ -0,0 +1,53 @@
+import sqlite3
+
+from customer_support_chat.app.query_plan_check import check_query_plans
+from customer_support_chat.app.services.tools.database import TOOL_INDEXES, ensure_indexes
+from customer_support_chat.app.services.tools.flights import FLIGHT_COLUMNS
+
+SCHEMA = {
+    "tickets": ("ticket_no", "book_ref", "passenger_id"),
+    "ticket_flights": ("ticket_no", "flight_id", "fare_conditions"),
+    "boarding_passes": ("ticket_no", "flight_id", "seat_no"),
+    "flights": tuple(FLIGHT_COLUMNS),
+    "hotels": ("id", "name", "booked", "checkin_date", "checkout_date"),
+    "car_rentals": ("id", "name", "booked", "start_date", "end_date"),
+    "trip_recommendations": ("id", "name", "booked", "details"),
+}
+
+
+def test_every_tool_statement_uses_an_index(tmp_path):
+    db_file = str(tmp_path / "travel.sqlite")
+    conn = sqlite3.connect(db_file)
+    for table, columns in SCHEMA.items():
+        conn.execute(f"CREATE TABLE {table} ({', '.join(columns)})")
+        # Enough distinct rows that the planner prefers the indexes over a scan
+        conn.executemany(
+            f"INSERT INTO {table} VALUES ({', '.join('?' * len(columns))})",
+            [tuple(f"{column}-{i % (50 + j)}" for j, column in enumerate(columns)) for i in range(2000)],
+        )
+    conn.commit()
+    conn.close()
+    ensure_indexes(db_file)
+
+    report = check_query_plans(db_file)
+
+    assert {"update_hotel", "update_car_rental", "update_excursion"} <= {entry["query"] for entry in report}
+    assert [entry for entry in report if entry["full_scans"]] == []
+
+
+def test_ensure_indexes_creates_the_missing_tool_indexes_once(tmp_path):
+    db_file = str(tmp_path / "travel.sqlite")
+    conn = sqlite3.connect(db_file)
+    for table, columns in SCHEMA.items():
+        conn.execute(f"CREATE TABLE {table} ({', '.join(columns)})")
+    conn.commit()
+    conn.close()
+
+    assert sorted(ensure_indexes(db_file)) == sorted(TOOL_INDEXES)
+    assert ensure_indexes(db_file) == []
+
+    conn = sqlite3.connect(db_file)
+    indexes = {name: table for name, table in conn.execute("SELECT name, tbl_name FROM sqlite_master WHERE type = 'index'")}
+    columns = {name: tuple(row[2] for row in conn.execute(f"PRAGMA index_info({name})")) for name in TOOL_INDEXES}
+    conn.close()
+    assert all(indexes[name] == table and columns[name] == tuple(cols) for name, (table, cols) in TOOL_INDEXES.items())
@@ -0,0 +1,50 @@
+from qdrant_client.models import PointStruct
+from vectorizer.app.core.settings import get_collection_tuning
+from vectorizer.app.embeddings.providers import HashingEmbeddingProvider
+from vectorizer.app.vectordb.query_variants import expand_query, query_variants
+from vectorizer.app.vectordb.stores import NumpyVectorStore
+from vectorizer.app.vectordb.vectordb import VectorDB
+
+
+def test_airport_codes_cities_and_synonyms_are_swapped():
+    assert expand_query("Flights from BSL to ZRH") == ["Flights from Basel to Zurich"]
+    assert expand_query("cheap hotel in Geneva") == [
+        "cheap hotel in GVA",
+        "cheap accommodation in Geneva",
+        "budget hotel in Geneva",
+    ]
+
+
+def test_variants_are_deduplicated_and_capped():
+    variants = query_variants("hotel in Basel", ["Hotel in  basel", "lodging near Basel"], max_variants=3)
+
+    assert variants == ["hotel in Basel", "lodging near Basel", "hotel in BSL"]
+
+
+class CountingProvider(HashingEmbeddingProvider):
+    def __init__(self):
+        super().__init__(32)
+        self.requests = []
+
+    def embed(self, texts):
+        self.requests.append(list(texts))
+        return super().embed(texts)
+
+
+def test_search_many_embeds_all_variants_at_once_and_returns_each_point_once(tmp_path):
+    provider = CountingProvider()
+    store = NumpyVectorStore("hotels_collection", provider.dimensions, get_collection_tuning("hotels_collection"), path=str(tmp_path))
+    store.create()
+    texts = {"1": "Hilton hotel in Basel", "2": "Marriott hotel in Zurich", "3": "Hyatt lodging in Geneva"}
+    store.upsert([
+        PointStruct(id=point_id, vector=provider.embed_one(text), payload={"content": text})
+        for point_id, text in texts.items()
+    ])
+    vectordb = VectorDB(table_name="hotels", collection_name="hotels_collection", embedding_provider=provider, store=store)
+    vectordb.result_cache = None
+
+    results = vectordb.search_many(["hotel in Basel", "lodging in Basel", "Hilton Basel"], limit=2)
+
+    assert provider.requests == [["hotel in Basel", "lodging in Basel", "Hilton Basel"]]
+    assert results[0].id == "1"
+    assert len({point.id for point in results}) == len(results) == 2
@@ -0,0 +1,55 @@
+import asyncio
+import time
+from vectorizer.app.embeddings.rate_limiter import (
+    AdaptiveRateLimiter,
+    TokenBucket,
+    parse_duration,
+    retry_after_seconds,
+)
+
+
+def test_rate_limit_durations_are_parsed_into_seconds():
+    assert parse_duration("20ms") == 0.02
+    assert parse_duration("6m0s") == 360
+    assert parse_duration("1.5") == 1.5
+    assert parse_duration("soon") is None
+    assert retry_after_seconds({"retry-after-ms": "250", "retry-after": "3"}) == 0.25
+    assert retry_after_seconds({"retry-after": "3"}) == 3
+
+
+def test_an_exhausted_bucket_waits_for_the_refill():
+    bucket = TokenBucket(60)  # One unit per second
+    bucket.consume(60)
+
+    assert 9.9 < bucket.delay_for(10) <= 10
+    bucket.sync(limit=120, remaining=0)
+    assert bucket.capacity == 120
+    assert bucket.available <= 0.1
+
+
+def test_throttling_halves_concurrency_and_successes_ramp_it_back_up():
+    limiter = AdaptiveRateLimiter(requests_per_minute=10_000, tokens_per_minute=1_000_000, max_concurrency=8, initial_concurrency=8)
+
+    limiter.on_rate_limited(retry_after=0.5)
+    assert limiter.concurrency == 4
+    assert limiter.paused_until > time.monotonic()
+
+    async def succeed(times):
+        for _ in range(times):
+            await limiter.on_success()
+
+    asyncio.run(succeed(4))
+    assert limiter.concurrency == 5
+
+
+def test_requests_wait_out_a_pause():
+    limiter = AdaptiveRateLimiter(requests_per_minute=10_000, tokens_per_minute=1_000_000, max_concurrency=2)
+    limiter.on_rate_limited(retry_after=0.2)
+
+    async def request():
+        start = time.monotonic()
+        async with limiter.limit(tokens=10):
+            return time.monotonic() - start
+
+    assert asyncio.run(request()) >= 0.15
+    assert limiter.total_requests == 1
@@ -0,0 +1,116 @@
+import sqlite3
+from vectorizer.app.embeddings.providers import HashingEmbeddingProvider
+from vectorizer.app.vectordb.filters import build_filter, match_value
+from vectorizer.app.vectordb.lexical import LexicalIndex
+from vectorizer.app.vectordb.result_cache import SearchResultCache
+from vectorizer.app.vectordb.stores import HybridVectorStore, NumpyVectorStore
+from vectorizer.app.vectordb.vectordb import VectorDB
+from vectorizer.app.core.settings import get_collection_tuning
+
+
+def test_a_row_write_drops_every_cached_search_of_the_collection():
+    cache = SearchResultCache(ttl=60, max_entries=10)
+    unfiltered = cache.key("hotels_collection", "hotel in basel", None, 2)
+    filtered = cache.key("hotels_collection", "hotel", build_filter(match_value("booked", 0)), 2)
+    other = cache.key("car_rentals_collection", "car in basel", None, 2)
+    for key in (unfiltered, filtered, other):
+        cache.put(key, ["result"])
+
+    cache.invalidate("hotels_collection")
+
+    assert cache.get(unfiltered) is None
+    assert cache.get(filtered) is None
+    assert cache.get(other) == ["result"]
+
+
+def test_results_read_before_an_invalidation_are_not_cached():
+    cache = SearchResultCache(ttl=60, max_entries=10)
+    key = cache.key("hotels_collection", "hotel in basel", None, 2)
+    generation = cache.generation("hotels_collection")
+
+    cache.invalidate("hotels_collection")
+    cache.put(key, ["before the write"], generation)
+
+    assert cache.get(key) is None
+
+
+def make_hotels_db(tmp_path):
+    db_path = str(tmp_path / "travel.sqlite")
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE hotels (id INTEGER, name TEXT, location TEXT, price_tier TEXT, "
+        "checkin_date TEXT, checkout_date TEXT, booked INTEGER)"
+    )
+    conn.executemany("INSERT INTO hotels VALUES (?, ?, ?, ?, ?, ?, ?)", [
+        (1, "Hilton Basel", "Basel", "Luxury", "2024-04-22", "2024-04-20", 0),
+        (2, "Marriott Zurich", "Zurich", "Upscale", "2024-04-14", "2024-04-21", 0),
+    ])
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+def make_hotels_vectordb(tmp_path):
+    db_path = make_hotels_db(tmp_path)
+    provider = HashingEmbeddingProvider(64)
+    tuning = get_collection_tuning("hotels_collection")
+    store = HybridVectorStore(
+        NumpyVectorStore("hotels_collection", provider.dimensions, tuning, path=str(tmp_path / "vectors")),
+        LexicalIndex("hotels_collection", path=str(tmp_path / "lexical")),
+    )
+    vectordb = VectorDB(
+        table_name="hotels",
+        collection_name="hotels_collection",
+        create_collection=True,
+        embedding_provider=provider,
+        store=store,
+        db_path=db_path,
+        use_embedding_cache=False,
+    )
+    vectordb.create_embeddings()
+    return vectordb, store, db_path
+
+
+def book_hotel(db_path, vectordb, hotel_id):
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE hotels SET booked = 1 WHERE id = ?", (hotel_id,))
+    conn.commit()
+    conn.close()
+    vectordb.update_row(hotel_id, {"booked": 1})
+
+
+def test_update_row_rebuilds_content_and_refreshes_cached_searches(tmp_path):
+    vectordb, store, db_path = make_hotels_vectordb(tmp_path)
+    vectordb.result_cache = SearchResultCache(ttl=60, max_entries=10)
+
+    before = vectordb.search("Hilton Basel", limit=1)
+    assert "not booked" in before[0].payload["content"]
+    content_hash = before[0].payload["content_hash"]
+
+    book_hotel(db_path, vectordb, 1)
+
+    after = vectordb.search("Hilton Basel", limit=1)[0]
+    assert after.payload["booked"] == 1
+    assert "not booked" not in after.payload["content"]
+    # The vector still embeds the old text, so the next incremental reindex must re-embed it
+    assert after.payload["content_hash"] == content_hash
+    assert [point_id for point_id, _ in store.lexical.search("not", 5)] == [vectordb.point_id(2, 0)]
+
+
+def test_a_search_that_races_a_booking_does_not_cache_the_old_status(tmp_path):
+    vectordb, store, db_path = make_hotels_vectordb(tmp_path)
+    vectordb.result_cache = SearchResultCache(ttl=60, max_entries=10)
+    search = store.search
+
+    def search_then_book(*args, **kwargs):
+        results = search(*args, **kwargs)
+        # The booking commits after the store answered but before the results are cached
+        book_hotel(db_path, vectordb, 1)
+        return results
+
+    store.search = search_then_book
+    raced = vectordb.search("Hilton Basel", limit=1)
+    store.search = search
+
+    assert raced[0].payload["booked"] == 0
+    assert vectordb.search("Hilton Basel", limit=1)[0].payload["booked"] == 1
@@ -0,0 +1,50 @@
+import asyncio
+import pytest
+from qdrant_client.models import PointStruct
+from vectorizer.app.core.settings import Config, get_collection_tuning
+from vectorizer.app.embeddings.providers import HashingEmbeddingProvider
+from vectorizer.app.vectordb.snapshot import export_collection, import_collection_async
+from vectorizer.app.vectordb.stores import NumpyVectorStore
+from vectorizer.app.vectordb.vectordb import VectorDB
+
+provider = HashingEmbeddingProvider(16)
+
+
+@pytest.fixture
+def numpy_backend(monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, "VECTOR_STORE_BACKEND", "numpy")
+    monkeypatch.setattr(Config, "HYBRID_SEARCH", False)
+    monkeypatch.setattr(Config, "LOCAL_VECTOR_STORE_PATH", str(tmp_path / "imported"))
+
+
+def exported_collection(tmp_path):
+    store = NumpyVectorStore("faq_collection", provider.dimensions, get_collection_tuning("faq_collection"), path=str(tmp_path / "built"))
+    store.create()
+    store.upsert([
+        PointStruct(id=f"00000000-0000-0000-0000-00000000000{i}", vector=provider.embed_one(text), payload={"content": text, "content_hash": str(i)})
+        for i, text in enumerate(["Can I change my booking?", "How do refunds work?"], start=1)
+    ])
+    vectordb = VectorDB(table_name="faq", collection_name="faq_collection", embedding_provider=provider, store=store)
+    export_collection(vectordb, path=str(tmp_path / "snapshots"))
+    return store
+
+
+def test_an_imported_snapshot_has_the_same_points_without_embedding_calls(tmp_path, numpy_backend):
+    source = exported_collection(tmp_path)
+
+    result = asyncio.run(import_collection_async("faq_collection", path=str(tmp_path / "snapshots"), embedding_provider=provider))
+
+    imported = NumpyVectorStore("faq_collection", provider.dimensions, get_collection_tuning("faq_collection"), path=str(tmp_path / "imported"))
+    assert result["indexed"] == 2
+    assert imported.content_hashes() == source.content_hashes()
+    query = provider.embed_one("refunds")
+    assert [point.id for point in imported.search(query, limit=1)] == [point.id for point in source.search(query, limit=1)]
+
+
+def test_a_snapshot_of_another_model_is_refused(tmp_path, numpy_backend):
+    exported_collection(tmp_path)
+    other = HashingEmbeddingProvider(16)
+    other.cache_key = "other-model"
+
+    with pytest.raises(ValueError, match="--force"):
+        asyncio.run(import_collection_async("faq_collection", path=str(tmp_path / "snapshots"), embedding_provider=other))
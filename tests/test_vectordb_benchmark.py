@@ -0,0 +1,36 @@
+import dataclasses
+from qdrant_client import QdrantClient
+from qdrant_client.models import PointStruct
+from vectorizer.app.core.settings import Config, get_collection_tuning
+from vectorizer.app.embeddings.providers import HashingEmbeddingProvider
+from vectorizer.app.vectordb import stores
+from vectorizer.app.vectordb.benchmark import copy_collection
+from vectorizer.app.vectordb.stores import QdrantVectorStore
+from vectorizer.app.vectordb.vectordb import VectorDB
+
+
+def test_copies_stay_in_qdrant_when_the_default_backend_is_numpy(monkeypatch):
+    client = QdrantClient(":memory:")
+    monkeypatch.setattr(stores, "get_qdrant_client", lambda: client)
+    monkeypatch.setattr(Config, "VECTOR_STORE_BACKEND", "numpy")
+    monkeypatch.setattr(Config, "HYBRID_SEARCH", False)
+
+    provider = HashingEmbeddingProvider(16)
+    tuning = get_collection_tuning("flights_collection")
+    source = VectorDB(
+        table_name="flights",
+        collection_name="flights_collection",
+        embedding_provider=provider,
+        store=QdrantVectorStore("flights_collection", provider.dimensions, tuning),
+        use_embedding_cache=False,
+    )
+    source.store.create()
+    client.upsert("flights_collection", [
+        PointStruct(id=i, vector=provider.embed_one(f"flight {i}"), payload={"content": f"flight {i}"})
+        for i in range(1, 4)
+    ])
+
+    target = copy_collection(source, dataclasses.replace(tuning, quantization="scalar"), "scalar")
+
+    assert isinstance(target.store, QdrantVectorStore)
+    assert client.count(target.collection_name).count == 3
@@ -0,0 +1,144 @@
+"""Offline throughput benchmark of the ingestion pipeline.
+
+Indexes a synthetic hotels table through the real pipeline (SQLite streaming, formatting,
+splitting, batching, rate limiting, pipelined upserts) with stubbed embedding and
+vector-store backends, so it needs no API key, no Qdrant and no network. Run it through
+`python -m vectorizer.app.main --benchmark`.
+"""
+import asyncio
+import math
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from vectorizer.app.core.settings import get_settings, get_collection_tuning
+from vectorizer.app.embeddings.batching import estimate_tokens
+from vectorizer.app.embeddings.benchmark import CITIES, TIERS
+from vectorizer.app.embeddings.providers import EmbeddingProvider
+from vectorizer.app.embeddings.rate_limiter import AdaptiveRateLimiter
+from vectorizer.app.vectordb.stores import VectorStore
+from vectorizer.app.vectordb.vectordb import VectorDB
+
+settings = get_settings()
+
+
+class StubEmbeddingProvider(EmbeddingProvider):
+    """Returns the same unit vector for every text after a fixed simulated request latency."""
+
+    name = "stub"
+
+    def __init__(self, dimensions=1536, latency=0.0):
+        self.dimensions = dimensions
+        self.cache_key = f"stub-{dimensions}"
+        self.latency = latency
+        self._vector = [1 / math.sqrt(dimensions)] * dimensions
+
+    def embed(self, texts):
+        time.sleep(self.latency)
+        return [self._vector] * len(texts)
+
+    async def embed_async(self, texts, session=None, rate_limiter=None, report=None):
+        async with rate_limiter.limit(sum(estimate_tokens(text) for text in texts)):
+            await asyncio.sleep(self.latency)
+        await rate_limiter.on_success()
+        return [self._vector] * len(texts)
+
+
+class StubVectorStore(VectorStore):
+    """Keeps only point IDs and content hashes in memory, after a fixed simulated upsert latency."""
+
+    def __init__(self, collection_name, dimensions, tuning, latency=0.0):
+        super().__init__(collection_name, dimensions, tuning)
+        self.latency = latency
+        self.points = {}
+
+    def exists(self):
+        return False
+
+    def create(self):
+        self.points = {}
+
+    def delete_collection(self):
+        self.points = {}
+
+    def upsert(self, points):
+        for point in points:
+            self.points[str(point.id)] = (point.payload or {}).get("content_hash")
+
+    async def aupsert(self, points):
+        await asyncio.sleep(self.latency)
+        self.upsert(points)
+
+    def delete(self, point_ids):
+        for point_id in point_ids:
+            self.points.pop(str(point_id), None)
+
+    def content_hashes(self):
+        return dict(self.points)
+
+    def count(self):
+        return len(self.points)
+
+
+def create_synthetic_db(path, rows, seed=0):
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE hotels (id INTEGER PRIMARY KEY, name TEXT, location TEXT, price_tier TEXT, "
+        "checkin_date TEXT, checkout_date TEXT, booked INTEGER)"
+    )
+    conn.executemany(
+        "INSERT INTO hotels VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [
+            (
+                i,
+                f"{rng.choice(['Hilton', 'Marriott', 'Hyatt', 'Radisson'])} {i}",
+                rng.choice(CITIES),
+                rng.choice(TIERS),
+                f"2024-04-{rng.randint(1, 28):02d}",
+                f"2024-05-{rng.randint(1, 28):02d}",
+                rng.randint(0, 1),
+            )
+            for i in range(rows)
+        ]
+    )
+    conn.commit()
+    conn.close()
+
+
+async def run_benchmark_async(rows=5000, embedding_latency=0.0, upsert_latency=0.0, dimensions=1536):
+    """Index `rows` synthetic hotels and return the ingestion report as a dict."""
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "benchmark.sqlite")
+        create_synthetic_db(db_path, rows)
+
+        tuning = get_collection_tuning("hotels_collection")
+        rate_limiter = AdaptiveRateLimiter(
+            requests_per_minute=10 ** 9,
+            tokens_per_minute=10 ** 12,
+            max_concurrency=settings.EMBEDDING_MAX_CONCURRENCY,
+            initial_concurrency=settings.EMBEDDING_MAX_CONCURRENCY,
+        )
+        vectordb = VectorDB(
+            table_name="hotels",
+            collection_name="hotels_collection",
+            create_collection=True,
+            rate_limiter=rate_limiter,
+            embedding_provider=StubEmbeddingProvider(dimensions, embedding_latency),
+            store=StubVectorStore("hotels_collection", dimensions, tuning, upsert_latency),
+            db_path=db_path,
+            # Cached vectors would hide the cost of the embedding stage, and the run must not write the cache
+            use_embedding_cache=False,
+        )
+        await vectordb.create_embeddings_async()
+
+    report = vectordb.report.to_dict()
+    report["rows"] = rows
+    report["indexed"] = vectordb.index_stats.get("indexed", 0)
+    report["chunks_per_second"] = round(report["indexed"] / report["wall_seconds"], 1) if report["wall_seconds"] else None
+    return report
+
+
+def run_benchmark(rows=5000, embedding_latency=0.0, upsert_latency=0.0, dimensions=1536):
+    return asyncio.run(run_benchmark_async(rows, embedding_latency, upsert_latency, dimensions))
@@ -0,0 +1,83 @@
+"""Process-wide Qdrant and OpenAI clients, created on first use.
+
+Every collection, tool and embedding provider in the process shares these clients and
+their keep-alive connection pools instead of opening its own. Nothing connects at
+import time. Async clients are bound to the event loop that created them, so there is
+one per running loop; `aclose_clients` closes the current loop's clients.
+"""
+import asyncio
+import threading
+import weakref
+from vectorizer.app.core.settings import get_settings
+
+settings = get_settings()
+
+_lock = threading.Lock()
+_clients = {}
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def _shared(name, factory):
+    client = _clients.get(name)
+    if client is None:
+        with _lock:
+            client = _clients.get(name)
+            if client is None:
+                client = _clients[name] = factory()
+    return client
+
+
+def _shared_async(name, factory):
+    loop = asyncio.get_running_loop()
+    with _lock:
+        clients = _async_clients.setdefault(loop, {})
+        if name not in clients:
+            clients[name] = factory()
+        return clients[name]
+
+
+def qdrant_client_options():
+    return {
+        "url": settings.QDRANT_URL,
+        "prefer_grpc": settings.QDRANT_PREFER_GRPC,
+        "grpc_port": settings.QDRANT_GRPC_PORT,
+        "timeout": settings.QDRANT_TIMEOUT,
+    }
+
+
+def get_qdrant_client():
+    from qdrant_client import QdrantClient
+    return _shared("qdrant", lambda: QdrantClient(**qdrant_client_options()))
+
+
+def get_async_qdrant_client():
+    from qdrant_client import AsyncQdrantClient
+    return _shared_async("qdrant", lambda: AsyncQdrantClient(**qdrant_client_options()))
+
+
+def get_openai_client():
+    from openai import OpenAI
+    return _shared("openai", lambda: OpenAI(api_key=settings.OPENAI_API_KEY))
+
+
+def get_async_openai_client():
+    from openai import AsyncOpenAI
+    return _shared_async("openai", lambda: AsyncOpenAI(api_key=settings.OPENAI_API_KEY))
+
+
+async def aclose_clients():
+    """Close the async clients of the running event loop, e.g. before `asyncio.run` returns."""
+    with _lock:
+        clients = _async_clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.close()
+
+
+def run(coroutine):
+    """`asyncio.run` that closes the loop's shared async clients before the loop shuts down."""
+    async def main():
+        try:
+            return await coroutine
+        finally:
+            await aclose_clients()
+    return asyncio.run(main())
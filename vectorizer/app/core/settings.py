@@ -1,4 +1,6 @@
-from os import environ
+from os import environ, path
+from dataclasses import dataclass
+from typing import Optional
 from dotenv import load_dotenv
 
 
@@ -8,6 +10,130 @@ class Config:
     OPENAI_API_KEY: str = environ.get("OPENAI_API_KEY")
     SQLITE_DB_PATH: str = environ.get("SQLITE_DB_PATH", "./customer_support_chat/data/travel2.sqlite")
     QDRANT_URL: str = environ.get("QDRANT_URL", "http://localhost:6333")
+    # One shared client per process; gRPC (HTTP/2, port QDRANT_GRPC_PORT) instead of REST when preferred
+    QDRANT_PREFER_GRPC: bool = environ.get("QDRANT_PREFER_GRPC", "False").lower() == "true"
+    QDRANT_GRPC_PORT: int = int(environ.get("QDRANT_GRPC_PORT", "6334"))
+    QDRANT_TIMEOUT: int = int(environ.get("QDRANT_TIMEOUT") or 0) or None
+    # Collection tuning defaults. Each one can be overridden per collection by prefixing
+    # the collection name, e.g. FLIGHTS_COLLECTION_QDRANT_QUANTIZATION=scalar
+    QDRANT_QUANTIZATION: str = environ.get("QDRANT_QUANTIZATION", "none")  # none | scalar | binary
+    QDRANT_QUANTIZATION_RESCORE: bool = environ.get("QDRANT_QUANTIZATION_RESCORE", "True").lower() == "true"
+    QDRANT_QUANTIZATION_OVERSAMPLING: float = float(environ.get("QDRANT_QUANTIZATION_OVERSAMPLING", "2.0"))
+    QDRANT_ON_DISK_VECTORS: bool = environ.get("QDRANT_ON_DISK_VECTORS", "False").lower() == "true"
+    QDRANT_ON_DISK_PAYLOAD: bool = environ.get("QDRANT_ON_DISK_PAYLOAD", "False").lower() == "true"
+    QDRANT_HNSW_M: int = int(environ.get("QDRANT_HNSW_M") or 0) or None
+    QDRANT_HNSW_EF_CONSTRUCT: int = int(environ.get("QDRANT_HNSW_EF_CONSTRUCT") or 0) or None
+    QDRANT_HNSW_EF: int = int(environ.get("QDRANT_HNSW_EF") or 0) or None
+    # Background upsert writers and the size bounds of each upsert request
+    QDRANT_UPSERT_WORKERS: int = int(environ.get("QDRANT_UPSERT_WORKERS", "4"))
+    QDRANT_UPSERT_MAX_POINTS: int = int(environ.get("QDRANT_UPSERT_MAX_POINTS", "512"))
+    QDRANT_UPSERT_MAX_BYTES: int = int(environ.get("QDRANT_UPSERT_MAX_BYTES", str(8 * 1024 ** 2)))
+    # Rows read from SQLite per fetchmany() call while streaming a table into the index
+    SQLITE_FETCH_SIZE: int = int(environ.get("SQLITE_FETCH_SIZE", "500"))
+    # "openai" (remote), "hashing" or "sentence-transformers" (local CPU)
+    EMBEDDING_PROVIDER: str = environ.get("EMBEDDING_PROVIDER", "openai")
+    EMBEDDING_MODEL: str = environ.get("EMBEDDING_MODEL", "text-embedding-ada-002")
+    # Vector size override; each provider falls back to its own default when unset
+    EMBEDDING_DIMENSIONS: int = int(environ.get("EMBEDDING_DIMENSIONS") or 0) or None
+    LOCAL_EMBEDDING_MODEL: str = environ.get("LOCAL_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+    LOCAL_EMBEDDING_BACKEND: str = environ.get("LOCAL_EMBEDDING_BACKEND", "torch")
+    LOCAL_EMBEDDING_BATCH_SIZE: int = int(environ.get("LOCAL_EMBEDDING_BATCH_SIZE", "64"))
+    # Upper bounds for a single multi-input request to the embeddings endpoint
+    EMBEDDING_BATCH_MAX_INPUTS: int = int(environ.get("EMBEDDING_BATCH_MAX_INPUTS", "256"))
+    EMBEDDING_BATCH_MAX_TOKENS: int = int(environ.get("EMBEDDING_BATCH_MAX_TOKENS", "32000"))
+    # Maximum number of packed batches waiting on the embeddings API during ingestion
+    EMBEDDING_CONCURRENT_BATCHES: int = int(environ.get("EMBEDDING_CONCURRENT_BATCHES", "16"))
+    # Account limits for the embeddings API; refined at runtime from the x-ratelimit-* headers
+    EMBEDDING_RPM_LIMIT: int = int(environ.get("EMBEDDING_RPM_LIMIT", "3000"))
+    EMBEDDING_TPM_LIMIT: int = int(environ.get("EMBEDDING_TPM_LIMIT", "1000000"))
+    EMBEDDING_INITIAL_CONCURRENCY: int = int(environ.get("EMBEDDING_INITIAL_CONCURRENCY", "2"))
+    EMBEDDING_MAX_CONCURRENCY: int = int(environ.get("EMBEDDING_MAX_CONCURRENCY", "16"))
+    EMBEDDING_CACHE_ENABLED: bool = environ.get("EMBEDDING_CACHE_ENABLED", "True").lower() == "true"
+    EMBEDDING_CACHE_PATH: str = environ.get(
+        "EMBEDDING_CACHE_PATH", path.join(path.dirname(SQLITE_DB_PATH), "embedding_cache.sqlite")
+    )
+    EMBEDDING_CACHE_MAX_BYTES: int = int(environ.get("EMBEDDING_CACHE_MAX_BYTES", str(1024 ** 3)))
+    # In-process LRU of search query embeddings (0 disables it), optionally backed by the embedding cache
+    QUERY_EMBEDDING_CACHE_SIZE: int = int(environ.get("QUERY_EMBEDDING_CACHE_SIZE", "1024"))
+    QUERY_EMBEDDING_DISK_CACHE: bool = environ.get("QUERY_EMBEDDING_DISK_CACHE", "True").lower() == "true"
+    # Seconds a search result stays cached (0 disables the cache). Writes to a row invalidate it sooner,
+    # but only in the process that made them: other workers see the write once the TTL runs out
+    SEARCH_CACHE_TTL: float = float(environ.get("SEARCH_CACHE_TTL", "10"))
+    SEARCH_CACHE_MAX_ENTRIES: int = int(environ.get("SEARCH_CACHE_MAX_ENTRIES", "1024"))
+    # Most phrasings of one question (the query, caller alternatives, local rewrites) a tool searches with
+    MULTI_QUERY_MAX_VARIANTS: int = int(environ.get("MULTI_QUERY_MAX_VARIANTS", "4"))
+    # Upsert changed rows and delete removed ones instead of rebuilding collections from scratch
+    INCREMENTAL_INDEXING: bool = environ.get("INCREMENTAL_INDEXING", "False").lower() == "true"
+    # "qdrant" or "numpy" (in-process, memory-mapped). Overridable per collection like the tuning,
+    # e.g. FAQ_COLLECTION_VECTOR_STORE_BACKEND=numpy
+    VECTOR_STORE_BACKEND: str = environ.get("VECTOR_STORE_BACKEND", "qdrant")
+    LOCAL_VECTOR_STORE_PATH: str = environ.get(
+        "LOCAL_VECTOR_STORE_PATH", path.join(path.dirname(SQLITE_DB_PATH), "vector_store")
+    )
+    # Keep a BM25 keyword index next to the vectors and fuse it into every search, for exact tokens
+    # such as flight numbers and airport codes. The index is a local SQLite file, so unless set it is
+    # on only for the numpy backend, whose vectors are local files too. Overridable per collection,
+    # e.g. FAQ_COLLECTION_HYBRID_SEARCH=False
+    HYBRID_SEARCH: Optional[bool] = environ["HYBRID_SEARCH"].lower() == "true" if environ.get("HYBRID_SEARCH") else None
+    LEXICAL_INDEX_PATH: str = environ.get("LEXICAL_INDEX_PATH", path.join(path.dirname(SQLITE_DB_PATH), "lexical_index"))
+    # FAQ markdown to index: a URL (cached in FAQ_CACHE_PATH and revalidated) or a local file path
+    FAQ_SOURCE: str = environ.get(
+        "FAQ_SOURCE", "https://storage.googleapis.com/benchmarks-artifacts/travel-db/swiss_faq.md"
+    )
+    FAQ_CACHE_PATH: str = environ.get("FAQ_CACHE_PATH", path.join(path.dirname(SQLITE_DB_PATH), "faq_cache"))
+    # Where collection snapshots are exported to and imported from
+    SNAPSHOT_PATH: str = environ.get("SNAPSHOT_PATH", path.join(path.dirname(SQLITE_DB_PATH), "snapshots"))
+
+@dataclass
+class CollectionTuning:
+    quantization: str
+    quantization_rescore: bool
+    quantization_oversampling: float
+    on_disk_vectors: bool
+    on_disk_payload: bool
+    hnsw_m: Optional[int]
+    hnsw_ef_construct: Optional[int]
+    hnsw_ef: Optional[int]
 
 def get_settings():
     return Config()
+
+def get_collection_tuning(collection_name: str) -> CollectionTuning:
+    config = get_settings()
+    prefix = collection_name.upper()
+
+    def override(name, default, parse=str):
+        value = environ.get(f"{prefix}_{name}")
+        if value is None or value == "":
+            return default
+        return parse(value)
+
+    def parse_bool(value):
+        return value.lower() == "true"
+
+    return CollectionTuning(
+        quantization=override("QDRANT_QUANTIZATION", config.QDRANT_QUANTIZATION).lower(),
+        quantization_rescore=override("QDRANT_QUANTIZATION_RESCORE", config.QDRANT_QUANTIZATION_RESCORE, parse_bool),
+        quantization_oversampling=override("QDRANT_QUANTIZATION_OVERSAMPLING", config.QDRANT_QUANTIZATION_OVERSAMPLING, float),
+        on_disk_vectors=override("QDRANT_ON_DISK_VECTORS", config.QDRANT_ON_DISK_VECTORS, parse_bool),
+        on_disk_payload=override("QDRANT_ON_DISK_PAYLOAD", config.QDRANT_ON_DISK_PAYLOAD, parse_bool),
+        hnsw_m=override("QDRANT_HNSW_M", config.QDRANT_HNSW_M, int),
+        hnsw_ef_construct=override("QDRANT_HNSW_EF_CONSTRUCT", config.QDRANT_HNSW_EF_CONSTRUCT, int),
+        hnsw_ef=override("QDRANT_HNSW_EF", config.QDRANT_HNSW_EF, int),
+    )
+
+def get_vector_store_backend(collection_name: str) -> str:
+    value = environ.get(f"{collection_name.upper()}_VECTOR_STORE_BACKEND")
+    return (value or get_settings().VECTOR_STORE_BACKEND).lower()
+
+def get_hybrid_search(collection_name: str) -> bool:
+    value = environ.get(f"{collection_name.upper()}_HYBRID_SEARCH")
+    if value:
+        return value.lower() == "true"
+    default = get_settings().HYBRID_SEARCH
+    return default if default is not None else get_vector_store_backend(collection_name) == "numpy"
+
+# Per-collection SQL condition on the rows to vectorize, e.g. FLIGHTS_COLLECTION_INDEX_WHERE="status != 'Arrived'"
+# when structured queries over the table answer the rest; unset indexes every row
+def get_index_where(collection_name: str) -> Optional[str]:
+    return environ.get(f"{collection_name.upper()}_INDEX_WHERE") or None
@@ -0,0 +1,32 @@
+from typing import Callable, Iterable, Iterator, List, TypeVar
+
+T = TypeVar("T")
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for the OpenAI tokenizers)."""
+    return len(text) // 4 + 1
+
+
+def pack_batches(
+    items: Iterable[T],
+    max_inputs: int,
+    max_tokens: int,
+    text_of: Callable[[T], str] = lambda item: item,
+) -> Iterator[List[T]]:
+    """Group items into batches bounded by input count and estimated token count.
+
+    An item larger than `max_tokens` on its own is emitted as a single-item batch
+    so it still gets a chance to be embedded (or to fail in isolation).
+    """
+    batch: List[T] = []
+    batch_tokens = 0
+    for item in items:
+        tokens = estimate_tokens(text_of(item))
+        if batch and (len(batch) >= max_inputs or batch_tokens + tokens > max_tokens):
+            yield batch
+            batch, batch_tokens = [], 0
+        batch.append(item)
+        batch_tokens += tokens
+    if batch:
+        yield batch
@@ -0,0 +1,86 @@
+"""Compare throughput and latency of the embedding providers.
+
+Usage:
+    python -m vectorizer.app.embeddings.benchmark --providers hashing,sentence-transformers,openai
+"""
+import argparse
+import random
+import statistics
+import time
+from vectorizer.app.core.logger import logger
+from vectorizer.app.embeddings.providers import get_embedding_provider
+
+CITIES = ["Basel", "Zurich", "Geneva", "Lucerne", "Bern", "Lugano", "Interlaken"]
+TIERS = ["Economy", "Midscale", "Upper Midscale", "Upscale", "Luxury"]
+
+
+def sample_texts(count, seed=0):
+    """Synthetic documents shaped like the formatted travel rows."""
+    rng = random.Random(seed)
+    texts = []
+    for i in range(count):
+        city = rng.choice(CITIES)
+        texts.append(
+            f"Hotel {rng.choice(['Hilton', 'Marriott', 'Hyatt', 'Radisson'])} {city} {i} located in {city} "
+            f"is categorized as {rng.choice(TIERS)} tier. The check-in date is 2024-04-{rng.randint(1, 28):02d} "
+            f"and the check-out date is 2024-05-{rng.randint(1, 28):02d}. Currently, the booked status is: not booked."
+        )
+    return texts
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def benchmark_provider(name, texts, batch_size):
+    provider = get_embedding_provider(name)
+    provider.embed(texts[:1])  # Warm up (model load, connection setup)
+
+    latencies = []
+    start = time.perf_counter()
+    for i in range(0, len(texts), batch_size):
+        batch_start = time.perf_counter()
+        provider.embed(texts[i:i + batch_size])
+        latencies.append(time.perf_counter() - batch_start)
+    elapsed = time.perf_counter() - start
+
+    single = []
+    for text in texts[:20]:
+        single_start = time.perf_counter()
+        provider.embed([text])
+        single.append(time.perf_counter() - single_start)
+
+    return {
+        "provider": name,
+        "dimensions": provider.dimensions,
+        "texts_per_second": len(texts) / elapsed,
+        "batch_p50_ms": statistics.median(latencies) * 1000,
+        "batch_p95_ms": percentile(latencies, 0.95) * 1000,
+        "single_p50_ms": statistics.median(single) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--providers", default="hashing", help="Comma-separated provider names")
+    parser.add_argument("--texts", type=int, default=1000, help="Number of documents to embed")
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    texts = sample_texts(args.texts)
+    print(f"{'provider':<24}{'dims':>6}{'texts/s':>12}{'batch p50':>12}{'batch p95':>12}{'single p50':>12}")
+    for name in args.providers.split(","):
+        try:
+            result = benchmark_provider(name.strip(), texts, args.batch_size)
+        except Exception as e:
+            logger.error(f"Skipping provider {name}: {str(e)}")
+            continue
+        print(
+            f"{result['provider']:<24}{result['dimensions']:>6}{result['texts_per_second']:>12.1f}"
+            f"{result['batch_p50_ms']:>10.1f}ms{result['batch_p95_ms']:>10.1f}ms{result['single_p50_ms']:>10.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import atexit
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+from vectorizer.app.core.settings import get_settings
+from vectorizer.app.core.logger import logger
+
+settings = get_settings()
+
+# Hits update last_used in batches of this many entries rather than with a write per lookup
+TOUCH_BATCH_SIZE = 256
+
+
+class EmbeddingCache:
+    """Content-addressed on-disk cache of embeddings, keyed by (model, sha256 of the text).
+
+    Vectors are stored as float32 blobs in SQLite. When the total stored size grows
+    beyond `max_bytes`, the least recently used entries are evicted. Lookups only read:
+    the last_used times of hits are buffered and written with the next write or once
+    `TOUCH_BATCH_SIZE` of them are pending, so search queries served from the cache
+    do not write to disk. `close()` writes the ones still pending; the process-wide
+    cache is closed at exit.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._touched = {}
+
+        cache_dir = os.path.dirname(path)
+        if cache_dir and not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)")
+        self._conn.commit()
+        self._size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()[0]
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get_many(self, model: str, texts: Iterable[str]) -> Dict[str, List[float]]:
+        """Return the cached embeddings for `texts`, keyed by text. Missing texts are left out."""
+        hashes = {self.text_hash(text): text for text in texts}
+        found = {}
+        with self._lock:
+            keys = list(hashes)
+            for i in range(0, len(keys), 500):  # Stay under SQLite's bound-parameter limit
+                part = keys[i:i + 500]
+                placeholders = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    (model, *part),
+                ).fetchall()
+                for text_hash, blob in rows:
+                    vector = array("f")
+                    vector.frombytes(blob)
+                    found[hashes[text_hash]] = vector.tolist()
+
+            now = time.time()
+            for text in found:
+                self._touched[(model, self.text_hash(text))] = now
+            if len(self._touched) >= TOUCH_BATCH_SIZE:
+                self._flush_touched()
+                self._conn.commit()
+            self.hits += len(found)
+            self.misses += len(hashes) - len(found)
+        return found
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        return self.get_many(model, [text]).get(text)
+
+    def put_many(self, model: str, items: Iterable[Tuple[str, List[float]]]):
+        now = time.time()
+        rows = []
+        for text, embedding in items:
+            blob = array("f", embedding).tobytes()
+            rows.append((model, self.text_hash(text), blob, len(blob), now))
+        if not rows:
+            return
+
+        with self._lock:
+            self._flush_touched()
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, size, last_used) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+            self._size += sum(row[3] for row in rows)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def put(self, model: str, text: str, embedding: List[float]):
+        self.put_many(model, [(text, embedding)])
+
+    def _flush_touched(self):
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                [(last_used, model, text_hash) for (model, text_hash), last_used in self._touched.items()],
+            )
+            self._touched = {}
+
+    def _evict(self):
+        # Recompute first: replaced entries were counted twice by put_many
+        self._size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()[0]
+        target = int(self.max_bytes * 0.9)
+        evicted = 0
+        while self._size > target:
+            rows = self._conn.execute(
+                "SELECT rowid, size FROM embeddings ORDER BY last_used LIMIT 1000"
+            ).fetchall()
+            if not rows:
+                break
+            to_delete = []
+            for rowid, size in rows:
+                if self._size <= target:
+                    break
+                to_delete.append((rowid,))
+                self._size -= size
+            self._conn.executemany("DELETE FROM embeddings WHERE rowid = ?", to_delete)
+            evicted += len(to_delete)
+        self._conn.commit()
+        if evicted:
+            logger.info(f"Evicted {evicted} entries from the embedding cache ({self._size} bytes kept)")
+
+    def close(self):
+        """Write the pending last_used times and close the database."""
+        with self._lock:
+            if self._conn is None:
+                return
+            self._flush_touched()
+            self._conn.commit()
+            self._conn.close()
+            self._conn = None
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size_bytes": self._size,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Return the process-wide embedding cache, or None when it is disabled."""
+    global _cache
+    if not settings.EMBEDDING_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = EmbeddingCache(settings.EMBEDDING_CACHE_PATH, settings.EMBEDDING_CACHE_MAX_BYTES)
+            # Short runs rarely fill a touch batch; without this their hits would never reach last_used
+            atexit.register(_cache.close)
+    return _cache
@@ -1,22 +1,79 @@
-from openai import OpenAI
-from vectorizer.app.core.settings import get_settings
-from typing import Union, List
+from vectorizer.app.embeddings.embedding_cache import get_embedding_cache
+from vectorizer.app.embeddings.query_cache import get_query_embedding_cache, normalize_query
+from vectorizer.app.embeddings.providers import EmbeddingProvider, get_embedding_provider
+from typing import Optional, Union, List
 
-settings = get_settings()
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
+def generate_embeddings(contents: List[str], provider: Optional[EmbeddingProvider] = None) -> List[List[float]]:
+    provider = provider or get_embedding_provider()
+    cache = get_embedding_cache()
+    cached = cache.get_many(provider.cache_key, contents) if cache else {}
+    missing = list(dict.fromkeys(content for content in contents if content not in cached))
+    if missing:
+        fresh = dict(zip(missing, provider.embed(missing)))
+        if cache:
+            cache.put_many(provider.cache_key, fresh.items())
+        cached.update(fresh)
+    return [cached[content] for content in contents]
 
-def generate_embedding(content: Union[str, List[str]]) -> Union[List[float], List[List[float]]]:
+def generate_embedding(
+    content: Union[str, List[str]],
+    provider: Optional[EmbeddingProvider] = None,
+) -> Union[List[float], List[List[float]]]:
     if isinstance(content, str):
-        response = client.embeddings.create(
-            model="text-embedding-ada-002",
-            input=[content]
-        )
-        return response.data[0].embedding
+        return generate_embeddings([content], provider)[0]
     elif isinstance(content, list):
-        response = client.embeddings.create(
-            model="text-embedding-ada-002",
-            input=content
-        )
-        return [item.embedding for item in response.data]
+        return generate_embeddings(content, provider)
     else:
         raise ValueError("Content must be either a string or a list of strings")
+
+def generate_query_embeddings(queries: List[str], provider: Optional[EmbeddingProvider] = None) -> List[List[float]]:
+    """Embed search queries, reusing cached ones and embedding the rest in a single request."""
+    provider = provider or get_embedding_provider()
+    normalized = [normalize_query(query) or query for query in queries]
+    # The normalized text is only the cache key: the model embeds the first original phrasing of each key
+    originals = {}
+    for key, query in zip(normalized, queries):
+        originals.setdefault(key, query)
+    cache = get_query_embedding_cache()
+    vectors = {}
+    for key in originals:
+        vector = cache.get(provider.cache_key, key) if cache else None
+        if vector is not None:
+            vectors[key] = vector
+    missing = [key for key in originals if key not in vectors]
+    if missing:
+        for key, vector in zip(missing, provider.embed([originals[key] for key in missing])):
+            vectors[key] = vector
+            if cache:
+                cache.put(provider.cache_key, key, vector)
+    return [vectors[key] for key in normalized]
+
+async def generate_query_embeddings_async(queries: List[str], provider: Optional[EmbeddingProvider] = None) -> List[List[float]]:
+    """Async counterpart of `generate_query_embeddings`, for use on an event loop."""
+    provider = provider or get_embedding_provider()
+    normalized = [normalize_query(query) or query for query in queries]
+    # The normalized text is only the cache key: the model embeds the first original phrasing of each key
+    originals = {}
+    for key, query in zip(normalized, queries):
+        originals.setdefault(key, query)
+    cache = get_query_embedding_cache()
+    vectors = {}
+    for key in originals:
+        vector = cache.get(provider.cache_key, key) if cache else None
+        if vector is not None:
+            vectors[key] = vector
+    missing = [key for key in originals if key not in vectors]
+    if missing:
+        for key, vector in zip(missing, await provider.embed_async([originals[key] for key in missing])):
+            vectors[key] = vector
+            if cache:
+                cache.put(provider.cache_key, key, vector)
+    return [vectors[key] for key in normalized]
+
+def generate_query_embedding(query: str, provider: Optional[EmbeddingProvider] = None) -> List[float]:
+    """Embed a search query, reusing the embedding of any earlier query with the same normalized text."""
+    return generate_query_embeddings([query], provider)[0]
+
+async def generate_query_embedding_async(query: str, provider: Optional[EmbeddingProvider] = None) -> List[float]:
+    """Async counterpart of `generate_query_embedding`, for use on an event loop."""
+    return (await generate_query_embeddings_async([query], provider))[0]
@@ -0,0 +1,244 @@
+import asyncio
+import hashlib
+import math
+import random
+import re
+import threading
+from typing import Dict, List, Optional
+from vectorizer.app.core.settings import get_settings
+from vectorizer.app.core.logger import logger
+from vectorizer.app.core.clients import get_openai_client, get_async_openai_client
+from vectorizer.app.embeddings.batching import estimate_tokens
+from vectorizer.app.embeddings.rate_limiter import retry_after_seconds
+
+settings = get_settings()
+
+OPENAI_EMBEDDINGS_URL = "https://api.openai.com/v1/embeddings"
+
+OPENAI_MODEL_DIMENSIONS = {
+    "text-embedding-ada-002": 1536,
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+}
+
+
+class NonRetryableEmbeddingError(ValueError):
+    """The embeddings endpoint rejected the request itself (e.g. an invalid input)."""
+
+
+class RateLimitedError(RuntimeError):
+    """The embeddings endpoint answered 429 Too Many Requests."""
+
+    def __init__(self, retry_after=None):
+        super().__init__(f"Rate limited (retry after {retry_after}s)")
+        self.retry_after = retry_after
+
+
+class EmbeddingProvider:
+    """Interface for turning texts into fixed-size vectors.
+
+    `cache_key` identifies the model in the embedding cache, and `dimensions` sets
+    the vector size of the collections built with the provider.
+    """
+
+    name: str = ""
+    cache_key: str = ""
+    dimensions: int = 0
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        raise NotImplementedError
+
+    async def embed_async(self, texts: List[str], session=None, rate_limiter=None, report=None) -> List[List[float]]:
+        # Local models are CPU bound, so keep them off the event loop
+        return await asyncio.to_thread(self.embed, texts)
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    name = "openai"
+
+    def __init__(self, model: str, dimensions: Optional[int] = None):
+        self.model = model
+        self.dimensions = dimensions or OPENAI_MODEL_DIMENSIONS.get(model, 1536)
+        # The text-embedding-3 models can return shortened vectors, so the size is part of the key
+        self.cache_key = f"{model}:{self.dimensions}"
+
+    @property
+    def client(self):
+        return get_openai_client()
+
+    @property
+    def async_client(self):
+        return get_async_openai_client()
+
+    def request_body(self, texts):
+        body = {"model": self.model, "input": texts}
+        # Only the text-embedding-3 models can shorten their vectors
+        if self.model.startswith("text-embedding-3") and self.dimensions != OPENAI_MODEL_DIMENSIONS.get(self.model):
+            body["dimensions"] = self.dimensions
+        return body
+
+    def embed(self, texts):
+        response = self.client.embeddings.create(**self.request_body(texts))
+        return self.ordered_embeddings(response, len(texts))
+
+    @staticmethod
+    def ordered_embeddings(response, count):
+        embeddings = [None] * count
+        for item in response.data:
+            embeddings[item.index] = item.embedding
+        return embeddings
+
+    async def request_embeddings(self, texts, session, rate_limiter):
+        tokens = sum(estimate_tokens(text) for text in texts)
+        async with rate_limiter.limit(tokens):
+            async with session.post(
+                OPENAI_EMBEDDINGS_URL,
+                headers={"Authorization": f"Bearer {settings.OPENAI_API_KEY}"},
+                json=self.request_body(texts)
+            ) as response:
+                rate_limiter.update_from_headers(response.headers)
+                if response.status == 429:
+                    retry_after = retry_after_seconds(response.headers)
+                    rate_limiter.on_rate_limited(retry_after)
+                    raise RateLimitedError(retry_after)
+                result = await response.json()
+                if 400 <= response.status < 500:
+                    raise NonRetryableEmbeddingError(f"Embedding request rejected ({response.status}): {result}")
+
+        if "data" not in result or len(result["data"]) != len(texts):
+            raise ValueError(f"Unexpected API response: {result}")
+        await rate_limiter.on_success()
+
+        # The endpoint tags every vector with the position of its input
+        embeddings = [None] * len(texts)
+        for item in result["data"]:
+            embeddings[item["index"]] = item["embedding"]
+        return embeddings
+
+    async def embed_async(self, texts, session=None, rate_limiter=None, report=None):
+        if session is None or rate_limiter is None:
+            # Runtime queries go through the async SDK client, which has its own retries
+            response = await self.async_client.embeddings.create(**self.request_body(texts))
+            return self.ordered_embeddings(response, len(texts))
+
+        max_retries = 5
+        base_delay = 1
+        for attempt in range(max_retries):
+            try:
+                return await self.request_embeddings(texts, session, rate_limiter)
+            except NonRetryableEmbeddingError:
+                raise
+            except RateLimitedError:
+                # The limiter already paused all requests for the advertised Retry-After
+                if report:
+                    report.count("embedding_rate_limited")
+                if attempt == max_retries - 1:
+                    logger.error(f"Embedding requests still throttled after {max_retries} attempts")
+                    raise
+            except Exception as e:
+                if attempt == max_retries - 1:
+                    logger.error(f"Failed to generate embeddings after {max_retries} attempts: {str(e)}")
+                    raise
+                delay = base_delay * (2 ** attempt) * random.uniform(0.5, 1.5)
+                if report:
+                    report.count("embedding_retries")
+                logger.warning(f"Embedding generation failed. Retrying in {delay:.1f} seconds...")
+                await asyncio.sleep(delay)
+
+
+class HashingEmbeddingProvider(EmbeddingProvider):
+    """Deterministic CPU-only embeddings using the hashing trick.
+
+    Word unigrams and bigrams are hashed into `dimensions` signed buckets and the
+    result is L2-normalized. There is no model to download, so it works fully offline,
+    and identical texts always map to identical vectors across machines.
+    """
+
+    name = "hashing"
+    _token = re.compile(r"\w+", re.UNICODE)
+
+    def __init__(self, dimensions: int = 384):
+        self.dimensions = dimensions
+        self.cache_key = f"hashing-{dimensions}"
+
+    def _features(self, text):
+        tokens = self._token.findall(text.lower())
+        yield from tokens
+        for left, right in zip(tokens, tokens[1:]):
+            yield f"{left} {right}"
+
+    def embed_one(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        for feature in self._features(text):
+            digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+            sign = 1.0 if digest >> 63 else -1.0
+            vector[digest % self.dimensions] += sign
+        norm = math.sqrt(sum(value * value for value in vector))
+        if norm:
+            vector = [value / norm for value in vector]
+        return vector
+
+    def embed(self, texts):
+        return [self.embed_one(text) for text in texts]
+
+
+class SentenceTransformerEmbeddingProvider(EmbeddingProvider):
+    """Local CPU embeddings from a sentence-transformers model, optionally on the ONNX backend.
+
+    Requires the optional `sentence-transformers` package (and `onnxruntime` for the ONNX backend).
+    """
+
+    name = "sentence-transformers"
+
+    def __init__(self, model: str, backend: str = "torch"):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError(
+                "The sentence-transformers embedding provider requires the `sentence-transformers` package"
+            ) from e
+
+        self.model_name = model
+        self.cache_key = f"sentence-transformers:{model}"
+        kwargs = {"backend": backend} if backend != "torch" else {}
+        self._model = SentenceTransformer(model, device="cpu", **kwargs)
+        self.dimensions = self._model.get_sentence_embedding_dimension()
+        self._lock = threading.Lock()
+
+    def embed(self, texts):
+        with self._lock:
+            embeddings = self._model.encode(
+                texts,
+                batch_size=settings.LOCAL_EMBEDDING_BATCH_SIZE,
+                normalize_embeddings=True,
+                convert_to_numpy=True
+            )
+        return embeddings.tolist()
+
+
+def create_embedding_provider(name: str) -> EmbeddingProvider:
+    if name == "openai":
+        return OpenAIEmbeddingProvider(settings.EMBEDDING_MODEL, settings.EMBEDDING_DIMENSIONS)
+    elif name == "hashing":
+        return HashingEmbeddingProvider(settings.EMBEDDING_DIMENSIONS or 384)
+    elif name == "sentence-transformers":
+        return SentenceTransformerEmbeddingProvider(
+            settings.LOCAL_EMBEDDING_MODEL,
+            backend=settings.LOCAL_EMBEDDING_BACKEND
+        )
+    else:
+        raise ValueError(f"Unknown embedding provider: {name}")
+
+
+_providers: Dict[str, EmbeddingProvider] = {}
+_providers_lock = threading.Lock()
+
+
+def get_embedding_provider(name: Optional[str] = None) -> EmbeddingProvider:
+    """Return the shared provider instance for `name` (defaults to `EMBEDDING_PROVIDER`)."""
+    name = name or settings.EMBEDDING_PROVIDER
+    with _providers_lock:
+        if name not in _providers:
+            _providers[name] = create_embedding_provider(name)
+            logger.info(f"Using {name} embedding provider ({_providers[name].dimensions} dimensions)")
+        return _providers[name]
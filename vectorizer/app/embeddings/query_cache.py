@@ -0,0 +1,90 @@
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from vectorizer.app.core.settings import get_settings
+from vectorizer.app.embeddings.embedding_cache import get_embedding_cache
+
+settings = get_settings()
+
+
+def normalize_query(query: str) -> str:
+    """Canonical form of a search query: NFKC, lowercase, single spaces, no trailing punctuation."""
+    query = unicodedata.normalize("NFKC", query).lower()
+    query = re.sub(r"\s+", " ", query).strip()
+    return query.rstrip("?!.;, ")
+
+
+class QueryEmbeddingCache:
+    """Bounded in-process LRU of query embeddings, keyed by (model, normalized query).
+
+    Misses fall through to the shared on-disk `EmbeddingCache` when one is given, so
+    queries embedded by one process (or before a restart) are reused by the others.
+    """
+
+    def __init__(self, max_entries: int, disk_cache=None):
+        self.max_entries = max_entries
+        self.disk_cache = disk_cache
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, model: str, query: str) -> Optional[List[float]]:
+        key = (model, query)
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return vector
+
+        vector = self.disk_cache.get(model, query) if self.disk_cache else None
+        with self._lock:
+            if vector is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        self._remember(key, vector)
+        return vector
+
+    def put(self, model: str, query: str, vector: List[float]):
+        self._remember((model, query), vector)
+        if self.disk_cache:
+            self.disk_cache.put(model, query, vector)
+
+    def _remember(self, key, vector):
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_query_embedding_cache() -> Optional[QueryEmbeddingCache]:
+    """Return the process-wide query embedding cache, or None when it is disabled."""
+    global _cache
+    if settings.QUERY_EMBEDDING_CACHE_SIZE <= 0:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            disk_cache = get_embedding_cache() if settings.QUERY_EMBEDDING_DISK_CACHE else None
+            _cache = QueryEmbeddingCache(settings.QUERY_EMBEDDING_CACHE_SIZE, disk_cache)
+    return _cache
@@ -0,0 +1,179 @@
+import asyncio
+import re
+import time
+from contextlib import asynccontextmanager
+from typing import Mapping, Optional
+from vectorizer.app.core.settings import get_settings
+from vectorizer.app.core.logger import logger
+
+settings = get_settings()
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"h": 3600, "m": 60, "s": 1, "ms": 0.001}
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Parse rate-limit durations such as "20ms", "1s" or "6m0s" into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def retry_after_seconds(headers: Mapping[str, str]) -> Optional[float]:
+    """Read how long the server asked us to wait from the Retry-After style headers."""
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+    return parse_duration(headers.get("retry-after"))
+
+
+class TokenBucket:
+    """Continuously refilling budget of `capacity` units per minute."""
+
+    def __init__(self, capacity: float):
+        self.capacity = capacity
+        self.available = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self.updated_at) * self.capacity / 60)
+        self.updated_at = now
+
+    def delay_for(self, amount: float) -> float:
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) * 60 / self.capacity
+
+    def consume(self, amount: float):
+        self._refill()
+        self.available -= min(amount, self.capacity)
+
+    def sync(self, limit: Optional[float], remaining: Optional[float]):
+        """Align the bucket with the limit and remaining budget reported by the server."""
+        self._refill()
+        if limit:
+            self.capacity = limit
+        if remaining is not None:
+            self.available = min(self.available, remaining)
+
+
+def _header_number(headers: Mapping[str, str], name: str) -> Optional[float]:
+    value = headers.get(name)
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class AdaptiveRateLimiter:
+    """Shared requests-per-minute and tokens-per-minute limiter for the embeddings API.
+
+    Callers wrap each request in `limit(tokens)`. The limiter keeps both token buckets
+    in sync with the `x-ratelimit-*` response headers, pauses everyone on a 429 for the
+    advertised Retry-After, halves concurrency on throttling and ramps it back up by one
+    slot per window of successful requests while there is headroom (AIMD).
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        max_concurrency: int,
+        initial_concurrency: int = 1,
+    ):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.concurrency = max(1, min(initial_concurrency, max_concurrency))
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.successes_since_change = 0
+        self.total_requests = 0
+        self.rate_limited = 0
+        self._slots = asyncio.Condition()
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            requests_per_minute=settings.EMBEDDING_RPM_LIMIT,
+            tokens_per_minute=settings.EMBEDDING_TPM_LIMIT,
+            max_concurrency=settings.EMBEDDING_MAX_CONCURRENCY,
+            initial_concurrency=settings.EMBEDDING_INITIAL_CONCURRENCY,
+        )
+
+    @asynccontextmanager
+    async def limit(self, tokens: int):
+        async with self._slots:
+            await self._slots.wait_for(lambda: self.in_flight < self.concurrency)
+            self.in_flight += 1
+        try:
+            await self._wait_for_budget(tokens)
+            self.total_requests += 1
+            yield
+        finally:
+            async with self._slots:
+                self.in_flight -= 1
+                self._slots.notify_all()
+
+    async def _wait_for_budget(self, tokens: int):
+        while True:
+            wait = max(
+                self.paused_until - time.monotonic(),
+                self.requests.delay_for(1),
+                self.tokens.delay_for(tokens),
+            )
+            if wait <= 0:
+                self.requests.consume(1)
+                self.tokens.consume(tokens)
+                return
+            await asyncio.sleep(wait)
+
+    def update_from_headers(self, headers: Mapping[str, str]):
+        self.requests.sync(
+            _header_number(headers, "x-ratelimit-limit-requests"),
+            _header_number(headers, "x-ratelimit-remaining-requests"),
+        )
+        self.tokens.sync(
+            _header_number(headers, "x-ratelimit-limit-tokens"),
+            _header_number(headers, "x-ratelimit-remaining-tokens"),
+        )
+
+    def has_headroom(self) -> bool:
+        return (
+            self.requests.available > self.requests.capacity * 0.2
+            and self.tokens.available > self.tokens.capacity * 0.2
+        )
+
+    async def on_success(self):
+        self.successes_since_change += 1
+        if (
+            self.concurrency < self.max_concurrency
+            and self.successes_since_change >= self.concurrency
+            and self.has_headroom()
+        ):
+            async with self._slots:
+                self.concurrency += 1
+                self.successes_since_change = 0
+                self._slots.notify_all()
+
+    def on_rate_limited(self, retry_after: Optional[float]):
+        self.rate_limited += 1
+        self.successes_since_change = 0
+        self.concurrency = max(1, self.concurrency // 2)
+        pause = retry_after if retry_after is not None else 1.0
+        self.paused_until = max(self.paused_until, time.monotonic() + pause)
+        logger.warning(f"Embedding requests throttled. Pausing {pause:.2f}s, concurrency lowered to {self.concurrency}")
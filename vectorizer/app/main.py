@@ -1,27 +1,137 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+import aiohttp
 from vectorizer.app.core.logger import logger
+from vectorizer.app.core import clients
 from vectorizer.app.vectordb.vectordb import VectorDB
+from vectorizer.app.vectordb.snapshot import has_snapshot, import_collection_async
+from vectorizer.app.embeddings.rate_limiter import AdaptiveRateLimiter
 from vectorizer.app.core.settings import get_settings
 
 settings = get_settings()
 
-def create_collections():
-    collections = [
-        ("car_rentals", "car_rentals_collection"),
-        ("trip_recommendations", "excursions_collection"),
-        ("flights", "flights_collection"),
-        ("hotels", "hotels_collection"),
-        ("faq", "faq_collection")
-    ]
-
-    for table_name, collection_name in collections:
-        try:
-            logger.info(f"Starting the vector database service for {table_name}")
-            vectordb = VectorDB(table_name=table_name, collection_name=collection_name, create_collection=True)
-            vectordb.create_embeddings()
-            logger.info(f"Embedding generation and storage completed for {collection_name}")
-        except Exception as e:
-            logger.error(f"An error occurred while processing {table_name}: {str(e)}")
-            logger.exception("Detailed error information:")
+COLLECTIONS = [
+    ("car_rentals", "car_rentals_collection"),
+    ("trip_recommendations", "excursions_collection"),
+    ("flights", "flights_collection"),
+    ("hotels", "hotels_collection"),
+    ("faq", "faq_collection")
+]
+
+async def build_collection(table_name, collection_name, session, rate_limiter, position):
+    start = time.perf_counter()
+    try:
+        logger.info(f"Starting the vector database service for {table_name}")
+        vectordb = VectorDB(
+            table_name=table_name,
+            collection_name=collection_name,
+            create_collection=True,
+            # FAQ points are keyed by section heading, so the FAQ is always updated in place and
+            # only new or edited sections are embedded
+            incremental=settings.INCREMENTAL_INDEXING or table_name == "faq",
+            rate_limiter=rate_limiter,
+            progress_position=position,
+        )
+        await vectordb.create_embeddings_async(session)
+        elapsed = time.perf_counter() - start
+        logger.info(f"Embedding generation and storage completed for {collection_name} in {elapsed:.1f}s")
+        return {
+            "collection": collection_name,
+            "ok": True,
+            "seconds": elapsed,
+            **vectordb.index_stats,
+            "report": vectordb.report.to_dict(),
+        }
+    except Exception as e:
+        logger.error(f"An error occurred while processing {table_name}: {str(e)}")
+        logger.exception("Detailed error information:")
+        return {"collection": collection_name, "ok": False, "seconds": time.perf_counter() - start}
+
+async def load_collection(collection_name):
+    start = time.perf_counter()
+    try:
+        result = await import_collection_async(collection_name)
+        return {**result, "seconds": time.perf_counter() - start}
+    except Exception as e:
+        logger.error(f"An error occurred while importing the snapshot of {collection_name}: {str(e)}")
+        return {"collection": collection_name, "ok": False, "seconds": time.perf_counter() - start}
+
+async def create_collections_async(from_snapshots=False):
+    # One session and one rate budget shared by every collection, so small collections
+    # are built alongside the large ones instead of queueing behind them
+    rate_limiter = AdaptiveRateLimiter.from_settings()
+    start = time.perf_counter()
+    async with aiohttp.ClientSession() as session:
+        results = await asyncio.gather(*(
+            load_collection(collection_name)
+            if from_snapshots and has_snapshot(collection_name)
+            else build_collection(table_name, collection_name, session, rate_limiter, position)
+            for position, (table_name, collection_name) in enumerate(COLLECTIONS)
+        ))
+
+    for result in results:
+        status = "done" if result["ok"] else "FAILED"
+        logger.info(
+            f"{result['collection']}: {status} in {result['seconds']:.1f}s "
+            f"({result.get('indexed', 0)} indexed, {result.get('unchanged', 0)} unchanged)"
+        )
+    logger.info(
+        f"Built {len(results)} collections in {time.perf_counter() - start:.1f}s. "
+        f"Embedding requests: {rate_limiter.total_requests} sent, {rate_limiter.rate_limited} throttled"
+    )
+    return results
+
+def create_collections(from_snapshots=False):
+    return clients.run(create_collections_async(from_snapshots))
+
+def benchmark(args):
+    from vectorizer.app.benchmark import run_benchmark
+
+    report = run_benchmark(
+        rows=args.rows,
+        embedding_latency=args.embedding_latency_ms / 1000,
+        upsert_latency=args.upsert_latency_ms / 1000,
+    )
+    print(json.dumps(report, indent=2))
+    if args.min_chunks_per_second and (report["chunks_per_second"] or 0) < args.min_chunks_per_second:
+        logger.error(
+            f"Ingestion throughput {report['chunks_per_second']} chunks/s is below "
+            f"the required {args.min_chunks_per_second} chunks/s"
+        )
+        return 1
+    return 0
 
 if __name__ == "__main__":
-    create_collections()
+    parser = argparse.ArgumentParser(description="Build the vector collections from the travel database")
+    parser.add_argument(
+        "--from-snapshots",
+        action="store_true",
+        help="Load collections that have a snapshot in SNAPSHOT_PATH instead of re-embedding them"
+    )
+    parser.add_argument("--report", help="Write the per-collection ingestion reports to this JSON file")
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="Index synthetic rows with stubbed embedding and vector-store backends and print the report"
+    )
+    parser.add_argument("--rows", type=int, default=5000, help="Synthetic rows to index in --benchmark mode")
+    parser.add_argument("--embedding-latency-ms", type=float, default=0, help="Simulated latency per embedding request")
+    parser.add_argument("--upsert-latency-ms", type=float, default=0, help="Simulated latency per upsert")
+    parser.add_argument(
+        "--min-chunks-per-second",
+        type=float,
+        default=0,
+        help="Exit with status 1 when the benchmark throughput falls below this"
+    )
+    args = parser.parse_args()
+
+    if args.benchmark:
+        sys.exit(benchmark(args))
+
+    results = create_collections(from_snapshots=args.from_snapshots)
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump([result.get("report", result) for result in results], f, indent=2)
@@ -0,0 +1,165 @@
+"""Measure search latency, recall and vector memory of a collection under different tunings.
+
+Query vectors are sampled from the collection itself, so no embedding API calls are made.
+Only collections on the Qdrant backend can be benchmarked.
+Recall is measured against an exact (brute-force) search of the source collection.
+
+Usage:
+    python -m vectorizer.app.vectordb.benchmark --collection flights_collection
+    python -m vectorizer.app.vectordb.benchmark --collection flights_collection --variants none,scalar,binary
+"""
+import argparse
+import dataclasses
+import random
+import statistics
+import time
+from qdrant_client.models import SearchParams, CollectionStatus, PointStruct
+from vectorizer.app.core.settings import get_collection_tuning
+from vectorizer.app.core.logger import logger
+from vectorizer.app.vectordb.vectordb import VectorDB
+from vectorizer.app.vectordb.stores import QdrantVectorStore
+
+BYTES_PER_DIMENSION = {"none": 4, "scalar": 1, "binary": 1 / 8}
+
+
+def sample_query_vectors(vectordb, count, seed=0):
+    records, _ = vectordb.store.client.scroll(
+        collection_name=vectordb.collection_name,
+        limit=max(count * 5, 100),
+        with_payload=False,
+        with_vectors=True
+    )
+    rng = random.Random(seed)
+    rng.shuffle(records)
+    # Perturb the stored vectors slightly so queries do not trivially match themselves
+    return [[value + rng.gauss(0, 0.01) for value in record.vector] for record in records[:count]]
+
+
+def exact_neighbours(vectordb, vectors, limit):
+    return [
+        {point.id for point in vectordb.store.client.search(
+            collection_name=vectordb.collection_name,
+            query_vector=vector,
+            limit=limit,
+            search_params=SearchParams(exact=True)
+        )}
+        for vector in vectors
+    ]
+
+
+def copy_collection(source, tuning, suffix):
+    collection_name = f"{source.collection_name}__bench_{suffix}"
+    # The copy's name matches no per-collection backend override, so its Qdrant store is built here
+    target = VectorDB(
+        table_name=source.table_name,
+        collection_name=collection_name,
+        embedding_provider=source.embedding_provider,
+        tuning=tuning,
+        store=QdrantVectorStore(collection_name, source.embedding_provider.dimensions, tuning)
+    )
+    target.create_or_clear_collection()
+    offset = None
+    while True:
+        records, offset = source.store.client.scroll(
+            collection_name=source.collection_name,
+            limit=256,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True
+        )
+        if records:
+            target.store.client.upsert(
+                collection_name=target.collection_name,
+                points=[PointStruct(id=record.id, vector=record.vector, payload=record.payload) for record in records],
+                wait=True
+            )
+        if offset is None:
+            break
+    while target.store.client.get_collection(target.collection_name).status != CollectionStatus.GREEN:
+        time.sleep(0.5)  # Let the optimizer finish building the index and quantized vectors
+    return target
+
+
+def benchmark_search(vectordb, vectors, truth, limit):
+    latencies = []
+    recalls = []
+    for vector, expected in zip(vectors, truth):
+        start = time.perf_counter()
+        results = vectordb.store.client.search(
+            collection_name=vectordb.collection_name,
+            query_vector=vector,
+            limit=limit,
+            search_params=vectordb.store.search_params()
+        )
+        latencies.append(time.perf_counter() - start)
+        recalls.append(len({point.id for point in results} & expected) / max(1, len(expected)))
+
+    info = vectordb.store.client.get_collection(vectordb.collection_name)
+    points = info.points_count or 0
+    dims = vectordb.embedding_provider.dimensions
+    ram_bytes = 0 if vectordb.tuning.on_disk_vectors else points * dims * 4
+    if vectordb.tuning.quantization != "none":
+        ram_bytes += points * dims * BYTES_PER_DIMENSION[vectordb.tuning.quantization]
+
+    ordered = sorted(latencies)
+    return {
+        "collection": vectordb.collection_name,
+        "quantization": vectordb.tuning.quantization,
+        "on_disk": vectordb.tuning.on_disk_vectors,
+        "points": points,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))] * 1000,
+        "recall": statistics.mean(recalls),
+        "vector_ram_mb": ram_bytes / 1024 ** 2,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--collection", default="flights_collection")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument(
+        "--variants",
+        default="",
+        help="Comma-separated quantization modes to compare on temporary copies (none, scalar, binary)"
+    )
+    parser.add_argument("--on-disk", action="store_true", help="Store the copied vectors on disk")
+    parser.add_argument("--keep", action="store_true", help="Keep the temporary copies after the run")
+    args = parser.parse_args()
+
+    source = VectorDB(table_name=None, collection_name=args.collection)
+    if not isinstance(getattr(source.store, "dense", source.store), QdrantVectorStore):
+        logger.error(f"Collection {args.collection} is not stored in Qdrant")
+        return
+    vectors = sample_query_vectors(source, args.queries)
+    if not vectors:
+        logger.error(f"Collection {args.collection} is empty")
+        return
+    truth = exact_neighbours(source, vectors, args.limit)
+
+    targets = [source]
+    for variant in filter(None, (v.strip() for v in args.variants.split(","))):
+        tuning = dataclasses.replace(
+            get_collection_tuning(args.collection),
+            quantization=variant,
+            on_disk_vectors=args.on_disk
+        )
+        targets.append(copy_collection(source, tuning, variant))
+
+    print(f"{'collection':<44}{'quant':>8}{'on disk':>9}{'points':>9}{'p50':>10}{'p95':>10}{'recall':>8}{'RAM':>10}")
+    try:
+        for target in targets:
+            r = benchmark_search(target, vectors, truth, args.limit)
+            print(
+                f"{r['collection']:<44}{r['quantization']:>8}{str(r['on_disk']):>9}{r['points']:>9}"
+                f"{r['p50_ms']:>8.2f}ms{r['p95_ms']:>8.2f}ms{r['recall']:>8.3f}{r['vector_ram_mb']:>8.1f}MB"
+            )
+    finally:
+        if not args.keep:
+            for target in targets[1:]:
+                target.store.delete_collection()
+
+
+if __name__ == "__main__":
+    main()
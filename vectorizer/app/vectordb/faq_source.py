@@ -0,0 +1,95 @@
+import json
+import os
+import re
+from collections import Counter
+from typing import List, Tuple
+from vectorizer.app.core.settings import get_settings
+from vectorizer.app.core.logger import logger
+
+settings = get_settings()
+
+
+def is_url(source: str) -> bool:
+    return source.startswith(("http://", "https://"))
+
+
+def read_cached(cache_dir):
+    body_path = os.path.join(cache_dir, "faq.md")
+    meta_path = os.path.join(cache_dir, "faq.json")
+    if not (os.path.exists(body_path) and os.path.exists(meta_path)):
+        return None, {}
+    with open(body_path, encoding="utf-8") as f:
+        body = f.read()
+    with open(meta_path) as f:
+        meta = json.load(f)
+    return body, meta
+
+
+def write_cached(cache_dir, body, meta):
+    os.makedirs(cache_dir, exist_ok=True)
+    for name, content in (("faq.md", body), ("faq.json", json.dumps(meta))):
+        tmp_path = os.path.join(cache_dir, name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, os.path.join(cache_dir, name))
+
+
+async def fetch_faq(session, source=None, cache_dir=None) -> str:
+    """Return the FAQ markdown from a local file or a URL.
+
+    URLs are cached in `FAQ_CACHE_PATH` and revalidated with ETag/Last-Modified, so an
+    unchanged FAQ costs a 304 instead of a download. The cached copy is used when the
+    source cannot be reached.
+    """
+    source = source or settings.FAQ_SOURCE
+    cache_dir = cache_dir or settings.FAQ_CACHE_PATH
+    if source.startswith("file://"):
+        source = source[len("file://"):]
+    if not is_url(source):
+        with open(source, encoding="utf-8") as f:
+            return f.read()
+
+    cached_body, meta = read_cached(cache_dir)
+    headers = {}
+    if cached_body is not None and meta.get("source") == source:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    try:
+        async with session.get(source, headers=headers) as response:
+            if response.status == 304:
+                logger.info("FAQ source not modified since the last run, using the cached copy")
+                return cached_body
+            response.raise_for_status()
+            body = await response.text()
+            write_cached(cache_dir, body, {
+                "source": source,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            })
+            return body
+    except Exception as e:
+        if cached_body is None:
+            raise
+        logger.warning(f"Could not fetch the FAQ from {source} ({str(e)}), using the cached copy")
+        return cached_body
+
+
+def split_sections(faq_text: str) -> List[Tuple[str, str]]:
+    """Split the FAQ into (key, section) pairs, one per `##` heading.
+
+    The key is the section heading (numbered when a heading repeats), so editing a
+    section only changes that section's point, and adding or removing one does not
+    shift the others.
+    """
+    sections = [section.strip() for section in re.split(r"(?=\n##)", faq_text) if section.strip()]
+    seen = Counter()
+    keyed = []
+    for section in sections:
+        heading = section.splitlines()[0].lstrip("#").strip()
+        seen[heading] += 1
+        key = heading if seen[heading] == 1 else f"{heading} ({seen[heading]})"
+        keyed.append((key, section))
+    return keyed
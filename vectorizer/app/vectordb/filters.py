@@ -0,0 +1,143 @@
+import re
+from datetime import date, datetime, time, timezone
+from typing import Optional
+from qdrant_client.models import (
+    Filter,
+    FieldCondition,
+    MatchValue,
+    MatchText,
+    MatchAny,
+    MatchExcept,
+    Range,
+    DatetimeRange,
+    PayloadSchemaType,
+    TextIndexParams,
+    TokenizerType,
+)
+
+# Locations are matched word by word and case-insensitively, so "zurich" finds "Zurich"
+LOCATION_INDEX = TextIndexParams(type="text", tokenizer=TokenizerType.WORD, lowercase=True)
+
+# Payload fields the search tools filter on (and the row ID writes update by), indexed when a collection is created
+PAYLOAD_INDEXES = {
+    "hotels_collection": {
+        "id": PayloadSchemaType.INTEGER,
+        "location": LOCATION_INDEX,
+        "price_tier": PayloadSchemaType.KEYWORD,
+        "booked": PayloadSchemaType.INTEGER,
+        "checkin_date": PayloadSchemaType.DATETIME,
+        "checkout_date": PayloadSchemaType.DATETIME,
+    },
+    "car_rentals_collection": {
+        "id": PayloadSchemaType.INTEGER,
+        "location": LOCATION_INDEX,
+        "price_tier": PayloadSchemaType.KEYWORD,
+        "booked": PayloadSchemaType.INTEGER,
+        "start_date": PayloadSchemaType.DATETIME,
+        "end_date": PayloadSchemaType.DATETIME,
+    },
+    "excursions_collection": {
+        "id": PayloadSchemaType.INTEGER,
+        "location": LOCATION_INDEX,
+        "booked": PayloadSchemaType.INTEGER,
+    },
+}
+
+
+def match_text(key, text):
+    return FieldCondition(key=key, match=MatchText(text=text)) if text else None
+
+
+def match_value(key, value):
+    return FieldCondition(key=key, match=MatchValue(value=value)) if value is not None else None
+
+
+def datetime_range(key, gte=None, lte=None):
+    if gte is None and lte is None:
+        return None
+    return FieldCondition(key=key, range=DatetimeRange(gte=gte, lte=lte))
+
+
+def build_filter(*conditions) -> Optional[Filter]:
+    """AND together the given conditions, skipping the ones that are None."""
+    must = [condition for condition in conditions if condition is not None]
+    return Filter(must=must) if must else None
+
+
+def overlaps(start_key, end_key, start=None, end=None):
+    """Conditions selecting payloads whose [start_key, end_key] period overlaps [start, end]."""
+    return [datetime_range(start_key, lte=end), datetime_range(end_key, gte=start)]
+
+
+# Evaluating filters in process, for vector stores without a query engine
+
+def as_datetime(value):
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, date):
+        parsed = datetime.combine(value, time.min)
+    else:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def words(text):
+    return re.findall(r"\w+", str(text or "").lower())
+
+
+def in_range(value, bounds, parse):
+    if value is None:
+        return False
+    try:
+        value = parse(value)
+        return (
+            (bounds.gt is None or value > parse(bounds.gt))
+            and (bounds.gte is None or value >= parse(bounds.gte))
+            and (bounds.lt is None or value < parse(bounds.lt))
+            and (bounds.lte is None or value <= parse(bounds.lte))
+        )
+    except (TypeError, ValueError):
+        return False
+
+
+def condition_matches(payload, condition):
+    if isinstance(condition, Filter):
+        return payload_matches(payload, condition)
+    if not isinstance(condition, FieldCondition):
+        raise ValueError(f"Unsupported filter condition: {type(condition).__name__}")
+
+    value = payload.get(condition.key)
+    match = condition.match
+    if isinstance(match, MatchValue) and value != match.value:
+        return False
+    if isinstance(match, MatchText) and not set(words(match.text)) <= set(words(value)):
+        return False
+    if isinstance(match, MatchAny) and value not in match.any:
+        return False
+    if isinstance(match, MatchExcept) and value in match.except_:
+        return False
+    if isinstance(condition.range, DatetimeRange) and not in_range(value, condition.range, as_datetime):
+        return False
+    if isinstance(condition.range, Range) and not in_range(value, condition.range, float):
+        return False
+    return True
+
+
+def payload_matches(payload, query_filter: Optional[Filter]) -> bool:
+    """Evaluate a Qdrant `Filter` against a payload dict (must, should and must_not clauses)."""
+    if query_filter is None:
+        return True
+
+    def as_list(conditions):
+        if conditions is None:
+            return []
+        return conditions if isinstance(conditions, list) else [conditions]
+
+    must = as_list(query_filter.must)
+    should = as_list(query_filter.should)
+    must_not = as_list(query_filter.must_not)
+    return (
+        all(condition_matches(payload, condition) for condition in must)
+        and (not should or any(condition_matches(payload, condition) for condition in should))
+        and not any(condition_matches(payload, condition) for condition in must_not)
+    )
@@ -0,0 +1,23 @@
+from typing import List
+from qdrant_client.models import ScoredPoint
+
+# Rank offset of reciprocal rank fusion; larger values flatten the weight of the top ranks
+RRF_K = 60
+
+
+def fuse_results(result_lists: List[List[ScoredPoint]], limit: int, k: int = RRF_K) -> List[ScoredPoint]:
+    """Merge ranked result lists with reciprocal rank fusion, one entry per point.
+
+    A point's fused rank is the sum of 1 / (k + rank) over the lists it appears in, so
+    points found by several query variants rise to the top. Each returned point keeps
+    its best score from any single list, so callers still see a similarity.
+    """
+    fused = {}
+    best = {}
+    for results in result_lists:
+        for rank, point in enumerate(results, start=1):
+            fused[point.id] = fused.get(point.id, 0.0) + 1 / (k + rank)
+            if point.id not in best or point.score > best[point.id].score:
+                best[point.id] = point
+    ranked = sorted(fused, key=lambda point_id: fused[point_id], reverse=True)
+    return [best[point_id] for point_id in ranked[:limit]]
@@ -0,0 +1,124 @@
+import os
+import re
+import sqlite3
+import threading
+from typing import Dict, List, Tuple
+from qdrant_client.models import PointStruct
+from vectorizer.app.core.settings import get_settings
+
+settings = get_settings()
+
+
+def match_expression(text: str) -> str:
+    """FTS5 query matching any token of `text`, with every token quoted so user input is never parsed as syntax."""
+    return " OR ".join(f'"{token}"' for token in re.findall(r"\w+", text.lower()))
+
+
+class LexicalIndex:
+    """BM25 keyword index over the chunk text of one collection, in a SQLite FTS5 table.
+
+    Dense embeddings blur exact tokens such as flight numbers (LX0112) and airport codes
+    (BSL); this index ranks them by term frequency instead. `points` maps point IDs to
+    the FTS rowids so chunks can be replaced and deleted by point ID.
+    """
+
+    def __init__(self, collection_name: str, path=None):
+        self.collection_name = collection_name
+        self.path = os.path.join(path or settings.LEXICAL_INDEX_PATH, f"{collection_name}.sqlite")
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connection(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS points (rowid INTEGER PRIMARY KEY, id TEXT NOT NULL UNIQUE);
+                CREATE VIRTUAL TABLE IF NOT EXISTS chunks USING fts5(content, tokenize = 'unicode61');
+                """
+            )
+        return self._conn
+
+    def clear(self):
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM points")
+            conn.execute("DELETE FROM chunks")
+            conn.commit()
+
+    def drop(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(self.path + suffix):
+                    os.remove(self.path + suffix)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def upsert(self, points: List[PointStruct]):
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                for point in points:
+                    content = (point.payload or {}).get("content")
+                    if not content:
+                        continue
+                    row = conn.execute("SELECT rowid FROM points WHERE id = ?", (str(point.id),)).fetchone()
+                    if row:
+                        rowid = row[0]
+                        conn.execute("DELETE FROM chunks WHERE rowid = ?", (rowid,))
+                    else:
+                        rowid = conn.execute("INSERT INTO points (id) VALUES (?)", (str(point.id),)).lastrowid
+                    conn.execute("INSERT INTO chunks (rowid, content) VALUES (?, ?)", (rowid, content))
+
+    def update_content(self, contents: Dict[str, str]):
+        """Replace the text of the indexed points among `contents` (point ID to text); other IDs are skipped."""
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                for point_id, content in contents.items():
+                    row = conn.execute("SELECT rowid FROM points WHERE id = ?", (str(point_id),)).fetchone()
+                    if row:
+                        conn.execute("DELETE FROM chunks WHERE rowid = ?", (row[0],))
+                        conn.execute("INSERT INTO chunks (rowid, content) VALUES (?, ?)", (row[0], content))
+
+    def delete(self, point_ids: List[str]):
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                for point_id in point_ids:
+                    row = conn.execute("SELECT rowid FROM points WHERE id = ?", (str(point_id),)).fetchone()
+                    if row:
+                        conn.execute("DELETE FROM chunks WHERE rowid = ?", row)
+                        conn.execute("DELETE FROM points WHERE rowid = ?", row)
+
+    def count(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM points").fetchone()[0]
+
+    def search(self, text: str, limit: int) -> List[Tuple[str, float]]:
+        """Return up to `limit` (point ID, BM25 score) pairs, best match first."""
+        expression = match_expression(text)
+        if not expression:
+            return []
+        with self._lock:
+            rows = self._connection().execute(
+                """
+                SELECT points.id, bm25(chunks) FROM chunks
+                JOIN points ON points.rowid = chunks.rowid
+                WHERE chunks MATCH ?
+                ORDER BY bm25(chunks)
+                LIMIT ?
+                """,
+                (expression, limit)
+            ).fetchall()
+        # SQLite's bm25() is negative, lower is better
+        return [(point_id, -score) for point_id, score in rows]
@@ -0,0 +1,118 @@
+import re
+from typing import List, Optional
+from vectorizer.app.core.settings import get_settings
+
+settings = get_settings()
+
+# Airports that appear in the travel database, by IATA code
+AIRPORT_CITIES = {
+    "BSL": "Basel",
+    "ZRH": "Zurich",
+    "GVA": "Geneva",
+    "BRN": "Bern",
+    "LUG": "Lugano",
+    "CDG": "Paris",
+    "ORY": "Paris",
+    "LHR": "London",
+    "LGW": "London",
+    "FRA": "Frankfurt",
+    "MUC": "Munich",
+    "AMS": "Amsterdam",
+    "BRU": "Brussels",
+    "VIE": "Vienna",
+    "FCO": "Rome",
+    "MXP": "Milan",
+    "BCN": "Barcelona",
+    "MAD": "Madrid",
+    "LIS": "Lisbon",
+    "CPH": "Copenhagen",
+    "OSL": "Oslo",
+    "ARN": "Stockholm",
+    "HEL": "Helsinki",
+    "DUB": "Dublin",
+    "IST": "Istanbul",
+    "DXB": "Dubai",
+    "DOH": "Doha",
+    "JFK": "New York",
+    "EWR": "Newark",
+    "ORD": "Chicago",
+    "LAX": "Los Angeles",
+    "SFO": "San Francisco",
+    "BOS": "Boston",
+    "MIA": "Miami",
+    "YYZ": "Toronto",
+    "HKG": "Hong Kong",
+    "SIN": "Singapore",
+    "NRT": "Tokyo",
+    "HND": "Tokyo",
+    "PEK": "Beijing",
+    "PVG": "Shanghai",
+    "ICN": "Seoul",
+    "BKK": "Bangkok",
+    "DEL": "Delhi",
+    "BOM": "Mumbai",
+    "SYD": "Sydney",
+}
+
+# Main airport of each city, for turning a city name into a code
+CITY_AIRPORTS = {}
+for code, city in AIRPORT_CITIES.items():
+    CITY_AIRPORTS.setdefault(city.lower(), code)
+
+# Interchangeable phrasings of the travel vocabulary the assistants search with
+SYNONYMS = [
+    ["hotel", "accommodation", "lodging"],
+    ["car rental", "rental car", "rent a car"],
+    ["trip", "excursion", "tour", "activity"],
+    ["cheap", "budget", "economy"],
+    ["luxury", "upscale", "premium"],
+    ["flight", "plane"],
+    ["cancel", "cancellation"],
+    ["refund", "reimbursement"],
+]
+
+
+def _replace_word(text, word, replacement):
+    return re.sub(rf"\b{re.escape(word)}\b", replacement, text, flags=re.IGNORECASE)
+
+
+def expand_query(query: str) -> List[str]:
+    """Local rewrites of `query`: airport codes and cities swapped, and synonyms substituted."""
+    variants = []
+
+    codes = [code for code in re.findall(r"\b[A-Z]{3}\b", query) if code in AIRPORT_CITIES]
+    if codes:
+        variant = query
+        for code in codes:
+            variant = re.sub(rf"\b{code}\b", AIRPORT_CITIES[code], variant)
+        variants.append(variant)
+
+    cities = [city for city in CITY_AIRPORTS if re.search(rf"\b{re.escape(city)}\b", query, re.IGNORECASE)]
+    if cities:
+        variant = query
+        for city in cities:
+            variant = _replace_word(variant, city, CITY_AIRPORTS[city])
+        variants.append(variant)
+
+    for group in SYNONYMS:
+        for word in group:
+            if re.search(rf"\b{re.escape(word)}\b", query, re.IGNORECASE):
+                replacement = next(other for other in group if other != word)
+                variants.append(_replace_word(query, word, replacement))
+                break
+
+    return variants
+
+
+def query_variants(query: str, alternatives: Optional[List[str]] = None, max_variants: Optional[int] = None) -> List[str]:
+    """The query, the caller's alternative phrasings and the local expansions, deduplicated and capped."""
+    max_variants = max_variants or settings.MULTI_QUERY_MAX_VARIANTS
+    candidates = [query, *(alternatives or []), *expand_query(query)]
+    variants = []
+    seen = set()
+    for candidate in candidates:
+        key = " ".join(candidate.lower().split())
+        if key and key not in seen:
+            seen.add(key)
+            variants.append(candidate)
+    return variants[:max_variants]
@@ -0,0 +1,21 @@
+"""Process-wide `VectorDB` instances, created on first use.
+
+Importing this module is cheap: `VectorDB` (and with it Qdrant, numpy and the embedding
+providers) is only imported when a collection is first asked for, so modules that
+search collections can be imported without paying for them.
+"""
+import threading
+
+_lock = threading.Lock()
+_vectordbs = {}
+
+
+def get_vectordb(table_name: str, collection_name: str):
+    vectordb = _vectordbs.get(collection_name)
+    if vectordb is None:
+        with _lock:
+            vectordb = _vectordbs.get(collection_name)
+            if vectordb is None:
+                from vectorizer.app.vectordb.vectordb import VectorDB
+                vectordb = _vectordbs[collection_name] = VectorDB(table_name=table_name, collection_name=collection_name)
+    return vectordb
@@ -0,0 +1,87 @@
+import bisect
+import json
+import statistics
+import time
+from contextlib import contextmanager
+from vectorizer.app.core.logger import logger
+
+# Upper bounds (ms) of the embedding request latency histogram buckets
+LATENCY_BUCKETS_MS = [50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+class IngestionReport:
+    """Timings and counts for each stage of indexing one collection.
+
+    Stage seconds are busy time summed over all calls, so stages that run concurrently
+    (embedding requests, upserts) can add up to more than the wall-clock time.
+    """
+
+    STAGES = ["sqlite_read", "format_content", "splitting", "embedding", "upsert"]
+
+    def __init__(self, collection_name):
+        self.collection_name = collection_name
+        self.stages = {stage: {"seconds": 0.0, "calls": 0, "items": 0} for stage in self.STAGES}
+        self.embedding_latencies = []
+        self.counters = {"embedding_retries": 0, "embedding_rate_limited": 0, "embedding_failures": 0, "upsert_failures": 0}
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def record(self, stage, seconds, items=1):
+        stats = self.stages.setdefault(stage, {"seconds": 0.0, "calls": 0, "items": 0})
+        stats["seconds"] += seconds
+        stats["calls"] += 1
+        stats["items"] += items
+
+    @contextmanager
+    def timed(self, stage, items=1):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start, items)
+
+    def record_embedding_request(self, seconds, inputs):
+        self.record("embedding", seconds, inputs)
+        self.embedding_latencies.append(seconds * 1000)
+
+    def count(self, counter, amount=1):
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def finish(self):
+        self.finished = time.perf_counter()
+
+    def latency_summary(self):
+        latencies = sorted(self.embedding_latencies)
+        if not latencies:
+            return {}
+        histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        for latency in latencies:
+            histogram[bisect.bisect_left(LATENCY_BUCKETS_MS, latency)] += 1
+        labels = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        return {
+            "p50_ms": round(statistics.median(latencies), 2),
+            "p95_ms": round(latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))], 2),
+            "max_ms": round(latencies[-1], 2),
+            "histogram": {label: n for label, n in zip(labels, histogram) if n},
+        }
+
+    def to_dict(self):
+        wall_seconds = (self.finished or time.perf_counter()) - self.started
+        stages = {}
+        for stage, stats in self.stages.items():
+            stages[stage] = {
+                "seconds": round(stats["seconds"], 4),
+                "calls": stats["calls"],
+                "items": stats["items"],
+                "items_per_second": round(stats["items"] / stats["seconds"], 1) if stats["seconds"] else None,
+            }
+        return {
+            "collection": self.collection_name,
+            "wall_seconds": round(wall_seconds, 3),
+            "stages": stages,
+            "embedding_latency": self.latency_summary(),
+            "counters": dict(self.counters),
+        }
+
+    def log(self):
+        logger.info(f"Ingestion report: {json.dumps(self.to_dict())}")
@@ -0,0 +1,120 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+from vectorizer.app.core.settings import get_settings
+from vectorizer.app.embeddings.query_cache import normalize_query
+
+settings = get_settings()
+
+
+class SearchResultCache:
+    """TTL-bounded LRU of search results, invalidated per collection.
+
+    Entries are keyed by (collection, normalized query, filter, limit). A write to any
+    row of a collection drops every cached search of that collection: the write can
+    change the row's payload in results that contain it and move it in or out of
+    results that do not, filtered or not.
+
+    Each invalidation also bumps the collection's generation. A search reads the
+    generation before it queries the store and passes it to `put`, which drops the
+    results when a write landed in between, so a search that raced a write cannot
+    cache what it read before the write.
+
+    The cache lives in one process: a write in another worker does not reach it, and
+    its entries there only expire with the TTL. Keep `SEARCH_CACHE_TTL` short when
+    several processes write to the same database.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._by_collection = {}
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(collection_name, query, query_filter=None, limit=None) -> Hashable:
+        filter_key = query_filter.model_dump_json(exclude_none=True) if query_filter is not None else None
+        return (collection_name, normalize_query(query), filter_key, limit)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def generation(self, collection_name) -> int:
+        """The number of invalidations of `collection_name` so far; read it before searching."""
+        with self._lock:
+            return self._generations.get(collection_name, 0)
+
+    def put(self, key, results, generation=None):
+        with self._lock:
+            if generation is not None and generation != self._generations.get(key[0], 0):
+                # The collection was written to while these results were being read
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl, results)
+            self._by_collection.setdefault(key[0], set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, collection_name):
+        """Drop every cached search of `collection_name`."""
+        with self._lock:
+            self._generations[collection_name] = self._generations.get(collection_name, 0) + 1
+            keys = self._by_collection.pop(collection_name, set())
+            for key in keys:
+                self._entries.pop(key, None)
+            self.invalidations += len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_collection.clear()
+
+    def _drop(self, key):
+        self._entries.pop(key)
+        keys = self._by_collection.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_collection[key[0]]
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_search_result_cache() -> Optional[SearchResultCache]:
+    """Return the process-wide search result cache, or None when it is disabled."""
+    global _cache
+    if settings.SEARCH_CACHE_TTL <= 0:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = SearchResultCache(settings.SEARCH_CACHE_TTL, settings.SEARCH_CACHE_MAX_ENTRIES)
+    return _cache
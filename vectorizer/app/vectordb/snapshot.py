@@ -0,0 +1,177 @@
+"""Export built collections to portable snapshots and bulk-load them elsewhere.
+
+A snapshot is a directory per collection holding:
+    manifest.json      format version, collection/table names, point count, embedding model
+    vectors.npy        float32 matrix, one row per point
+    points.jsonl.gz    one {"id", "payload"} line per point, in the same order as the rows
+
+Loading a snapshot only writes points, so a fresh deployment is searchable without
+calling the embeddings API. Point IDs and content hashes are kept, so incremental
+indexing can pick up from an imported collection.
+
+Usage:
+    python -m vectorizer.app.vectordb.snapshot export --collections flights_collection,faq_collection
+    python -m vectorizer.app.vectordb.snapshot import
+"""
+import argparse
+import gzip
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+import numpy as np
+from qdrant_client.models import PointStruct
+from vectorizer.app.core.settings import get_settings
+from vectorizer.app.core.logger import logger
+from vectorizer.app.core import clients
+from vectorizer.app.vectordb.vectordb import VectorDB
+from vectorizer.app.vectordb.writer import PointWriter
+
+settings = get_settings()
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+
+def snapshot_dir(collection_name, path=None):
+    return os.path.join(path or settings.SNAPSHOT_PATH, collection_name)
+
+
+def has_snapshot(collection_name, path=None):
+    return os.path.exists(os.path.join(snapshot_dir(collection_name, path), "manifest.json"))
+
+
+def read_manifest(directory):
+    with open(os.path.join(directory, "manifest.json")) as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported snapshot format {manifest.get('format_version')} in {directory} "
+            f"(expected {SNAPSHOT_FORMAT_VERSION})"
+        )
+    return manifest
+
+
+def export_collection(vectordb, path=None, batch_size=1000):
+    """Write the points of `vectordb`'s collection to a snapshot directory and return its manifest."""
+    directory = snapshot_dir(vectordb.collection_name, path)
+    tmp_directory = directory + ".tmp"
+    shutil.rmtree(tmp_directory, ignore_errors=True)
+    os.makedirs(tmp_directory)
+
+    count = vectordb.store.count()
+    dimensions = vectordb.embedding_provider.dimensions
+    vectors = np.lib.format.open_memmap(
+        os.path.join(tmp_directory, "vectors.npy"), mode="w+", dtype=np.float32, shape=(count, dimensions)
+    )
+    written = 0
+    with gzip.open(os.path.join(tmp_directory, "points.jsonl.gz"), "wt", encoding="utf-8") as points_file:
+        for batch in vectordb.store.scroll(batch_size):
+            if written + len(batch) > count:
+                raise RuntimeError(f"{vectordb.collection_name} changed while it was being exported")
+            vectors[written:written + len(batch)] = np.asarray([point.vector for point in batch], dtype=np.float32)
+            for point in batch:
+                points_file.write(json.dumps({"id": str(point.id), "payload": point.payload}, default=str) + "\n")
+            written += len(batch)
+    vectors.flush()
+    del vectors
+    if written != count:
+        raise RuntimeError(f"{vectordb.collection_name} changed while it was being exported")
+
+    manifest = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "collection": vectordb.collection_name,
+        "table": vectordb.table_name,
+        "count": count,
+        "dimensions": dimensions,
+        "dtype": "float32",
+        "embedding_provider": vectordb.embedding_provider.name,
+        "embedding_model": vectordb.embedding_provider.cache_key,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+    with open(os.path.join(tmp_directory, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(tmp_directory, directory)
+    logger.info(f"Exported {count} points of {vectordb.collection_name} to {directory}")
+    return manifest
+
+
+def iter_snapshot_points(directory, batch_size=1000):
+    vectors = np.load(os.path.join(directory, "vectors.npy"), mmap_mode="r")
+    with gzip.open(os.path.join(directory, "points.jsonl.gz"), "rt", encoding="utf-8") as points_file:
+        batch = []
+        for row, line in enumerate(points_file):
+            record = json.loads(line)
+            batch.append(PointStruct(id=record["id"], vector=vectors[row].tolist(), payload=record["payload"]))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+async def import_collection_async(collection_name, path=None, force=False, embedding_provider=None):
+    """Recreate `collection_name` from its snapshot and bulk-load the points into the configured store."""
+    directory = snapshot_dir(collection_name, path)
+    manifest = read_manifest(directory)
+    vectordb = VectorDB(
+        table_name=manifest["table"],
+        collection_name=collection_name,
+        embedding_provider=embedding_provider
+    )
+    provider = vectordb.embedding_provider
+    if provider.dimensions != manifest["dimensions"]:
+        raise ValueError(
+            f"Snapshot of {collection_name} has {manifest['dimensions']} dimensions, "
+            f"but the {provider.name} embedding provider produces {provider.dimensions}"
+        )
+    if provider.cache_key != manifest["embedding_model"] and not force:
+        # Queries would be embedded with a different model than the stored vectors
+        raise ValueError(
+            f"Snapshot of {collection_name} was built with {manifest['embedding_model']}, "
+            f"but the configured model is {provider.cache_key}. Use --force to load it anyway."
+        )
+
+    vectordb.create_or_clear_collection()
+    try:
+        async with PointWriter(vectordb.store) as writer:
+            for batch in iter_snapshot_points(directory):
+                await writer.write(batch)
+    finally:
+        await vectordb.store.aclose()
+
+    if writer.failed:
+        raise RuntimeError(f"{writer.failed} of {manifest['count']} points could not be loaded into {collection_name}")
+    logger.info(f"Imported {writer.written} points into {collection_name} from {directory}")
+    return {"collection": collection_name, "ok": True, "indexed": writer.written, "unchanged": 0}
+
+
+def import_collection(collection_name, path=None, force=False):
+    return clients.run(import_collection_async(collection_name, path, force))
+
+
+def main():
+    from vectorizer.app.main import COLLECTIONS
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("--collections", default="", help="Comma-separated collection names (default: all)")
+    parser.add_argument("--path", default=None, help=f"Snapshot directory (default: {settings.SNAPSHOT_PATH})")
+    parser.add_argument("--force", action="store_true", help="Import even if the embedding model differs")
+    args = parser.parse_args()
+
+    tables = {collection_name: table_name for table_name, collection_name in COLLECTIONS}
+    names = [name.strip() for name in args.collections.split(",") if name.strip()] or list(tables)
+    for collection_name in names:
+        try:
+            if args.command == "export":
+                export_collection(VectorDB(table_name=tables.get(collection_name), collection_name=collection_name), args.path)
+            else:
+                import_collection(collection_name, args.path, args.force)
+        except Exception as e:
+            logger.error(f"Failed to {args.command} {collection_name}: {str(e)}")
+
+
+if __name__ == "__main__":
+    main()
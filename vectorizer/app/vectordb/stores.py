@@ -0,0 +1,825 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+from qdrant_client.models import (
+    Distance,
+    VectorParams,
+    VectorParamsDiff,
+    PointStruct,
+    PointIdsList,
+    ScoredPoint,
+    Filter,
+    FieldCondition,
+    MatchValue,
+    HasIdCondition,
+    HnswConfigDiff,
+    CollectionParamsDiff,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    Disabled,
+    SearchParams,
+    QueryRequest,
+    QuantizationSearchParams,
+)
+from more_itertools import chunked
+from vectorizer.app.vectordb.filters import payload_matches
+from vectorizer.app.vectordb.lexical import LexicalIndex
+from vectorizer.app.core.clients import get_qdrant_client, get_async_qdrant_client
+from vectorizer.app.core.logger import logger
+from vectorizer.app.core.settings import get_settings, get_vector_store_backend, get_hybrid_search, CollectionTuning
+
+settings = get_settings()
+
+
+class VectorStore:
+    """Storage backend for the points of one collection.
+
+    `VectorDB` only talks to this interface. The async methods default to running the
+    sync ones in a worker thread; backends with a native async client override them.
+    """
+
+    def __init__(self, collection_name: str, dimensions: int, tuning: CollectionTuning):
+        self.collection_name = collection_name
+        self.dimensions = dimensions
+        self.tuning = tuning
+
+    def exists(self) -> bool:
+        raise NotImplementedError
+
+    def create(self):
+        raise NotImplementedError
+
+    def delete_collection(self):
+        raise NotImplementedError
+
+    def apply_tuning(self):
+        """Apply tuning changes to an existing collection. A no-op for backends without tuning knobs."""
+
+    def create_payload_index(self, field_name: str, field_schema):
+        """Index a payload field for filtering. A no-op for backends that filter without indexes."""
+
+    def upsert(self, points: List[PointStruct]):
+        raise NotImplementedError
+
+    def delete(self, point_ids: List[str]):
+        raise NotImplementedError
+
+    def set_payload(self, key_field: str, key, fields: dict):
+        """Merge `fields` into the payload of every point whose `key_field` equals `key`."""
+        raise NotImplementedError
+
+    def set_point_payloads(self, payloads: Dict[str, dict]):
+        """Merge each payload into the stored point with that ID. IDs that are not stored are skipped."""
+        raise NotImplementedError
+
+    def content_hashes(self) -> Dict[str, Optional[str]]:
+        """Map every stored point ID to the `content_hash` in its payload."""
+        raise NotImplementedError
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def scroll(self, batch_size: int = 1000, query_filter: Optional[Filter] = None) -> Iterable[List[PointStruct]]:
+        """Yield every stored point (matching `query_filter`, if given), with its vector and payload, in batches."""
+        raise NotImplementedError
+
+    def retrieve(self, point_ids: List[str]) -> List[PointStruct]:
+        """Return the stored points among `point_ids`, with their vectors and payloads."""
+        raise NotImplementedError
+
+    def search(
+        self,
+        vector: List[float],
+        limit: int,
+        with_payload: bool = True,
+        query_filter: Optional[Filter] = None
+    ) -> List[ScoredPoint]:
+        raise NotImplementedError
+
+    def search_batch(
+        self,
+        vectors: List[List[float]],
+        limit: int,
+        with_payload: bool = True,
+        query_filter: Optional[Filter] = None
+    ) -> List[List[ScoredPoint]]:
+        """Run one search per vector with the same limit and filter. Backends with a batch API override this."""
+        return [self.search(vector, limit, with_payload, query_filter) for vector in vectors]
+
+    def score_points(
+        self,
+        point_ids: List[str],
+        vector: List[float],
+        with_payload: bool = True,
+        query_filter: Optional[Filter] = None
+    ) -> Dict[str, ScoredPoint]:
+        """Score the stored points among `point_ids` that match `query_filter` by cosine similarity to `vector`.
+
+        Retrieves the points and scores them in process; remote backends override this to
+        score on the server rather than download the vectors.
+        """
+        query = np.asarray(vector, dtype=np.float32)
+        query_norm = np.linalg.norm(query) or 1.0
+        scored = {}
+        for point in self.retrieve(point_ids):
+            if query_filter is not None and not payload_matches(point.payload or {}, query_filter):
+                continue
+            stored = np.asarray(point.vector, dtype=np.float32)
+            score = float(stored @ query / ((np.linalg.norm(stored) or 1.0) * query_norm))
+            scored[str(point.id)] = ScoredPoint(id=point.id, version=0, score=score, payload=point.payload if with_payload else None)
+        return scored
+
+    def keyword_search(
+        self,
+        text: str,
+        vector: List[float],
+        limit: int,
+        with_payload: bool = True,
+        query_filter: Optional[Filter] = None
+    ) -> List[ScoredPoint]:
+        """Rank points by keyword match with `text`. Empty for stores without a keyword index."""
+        return []
+
+    async def aupsert(self, points: List[PointStruct]):
+        await asyncio.to_thread(self.upsert, points)
+
+    async def asearch(
+        self,
+        vector: List[float],
+        limit: int,
+        with_payload: bool = True,
+        query_filter: Optional[Filter] = None
+    ) -> List[ScoredPoint]:
+        return await asyncio.to_thread(self.search, vector, limit, with_payload, query_filter)
+
+    async def asearch_batch(
+        self,
+        vectors: List[List[float]],
+        limit: int,
+        with_payload: bool = True,
+        query_filter: Optional[Filter] = None
+    ) -> List[List[ScoredPoint]]:
+        return await asyncio.to_thread(self.search_batch, vectors, limit, with_payload, query_filter)
+
+    async def akeyword_search(
+        self,
+        text: str,
+        vector: List[float],
+        limit: int,
+        with_payload: bool = True,
+        query_filter: Optional[Filter] = None
+    ) -> List[ScoredPoint]:
+        return await asyncio.to_thread(self.keyword_search, text, vector, limit, with_payload, query_filter)
+
+    async def adelete(self, point_ids: List[str]):
+        await asyncio.to_thread(self.delete, point_ids)
+
+    async def acontent_hashes(self) -> Dict[str, Optional[str]]:
+        return await asyncio.to_thread(self.content_hashes)
+
+    async def aclose(self):
+        """Release resources bound to the running event loop."""
+
+
+class QdrantVectorStore(VectorStore):
+    """A Qdrant collection, accessed through the process-wide clients of `core.clients`."""
+
+    @property
+    def client(self):
+        return get_qdrant_client()
+
+    @property
+    def async_client(self):
+        return get_async_qdrant_client()
+
+    def exists(self):
+        return self.client.collection_exists(self.collection_name)
+
+    def create(self):
+        self.client.create_collection(
+            collection_name=self.collection_name,
+            vectors_config=VectorParams(
+                size=self.dimensions,
+                distance=Distance.COSINE,
+                on_disk=self.tuning.on_disk_vectors
+            ),
+            hnsw_config=self.hnsw_config(),
+            quantization_config=self.quantization_config(),
+            on_disk_payload=self.tuning.on_disk_payload
+        )
+
+    def delete_collection(self):
+        self.client.delete_collection(collection_name=self.collection_name)
+
+    def apply_tuning(self):
+        self.client.update_collection(
+            collection_name=self.collection_name,
+            vectors_config={"": VectorParamsDiff(on_disk=self.tuning.on_disk_vectors)},
+            hnsw_config=self.hnsw_config(),
+            quantization_config=self.quantization_config() or Disabled.DISABLED,
+            collection_params=CollectionParamsDiff(on_disk_payload=self.tuning.on_disk_payload)
+        )
+
+    def create_payload_index(self, field_name, field_schema):
+        self.client.create_payload_index(
+            collection_name=self.collection_name,
+            field_name=field_name,
+            field_schema=field_schema
+        )
+
+    def quantization_config(self):
+        if self.tuning.quantization == "scalar":
+            return ScalarQuantization(
+                scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+            )
+        elif self.tuning.quantization == "binary":
+            return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+        elif self.tuning.quantization == "none":
+            return None
+        else:
+            raise ValueError(f"Unknown quantization for {self.collection_name}: {self.tuning.quantization}")
+
+    def hnsw_config(self):
+        if self.tuning.hnsw_m is None and self.tuning.hnsw_ef_construct is None:
+            return None
+        return HnswConfigDiff(m=self.tuning.hnsw_m, ef_construct=self.tuning.hnsw_ef_construct)
+
+    def search_params(self):
+        quantization = None
+        if self.tuning.quantization != "none":
+            # Search the quantized vectors, then rescore the oversampled candidates with the originals
+            quantization = QuantizationSearchParams(
+                rescore=self.tuning.quantization_rescore,
+                oversampling=self.tuning.quantization_oversampling
+            )
+        if quantization is None and self.tuning.hnsw_ef is None:
+            return None
+        return SearchParams(hnsw_ef=self.tuning.hnsw_ef, quantization=quantization)
+
+    def upsert(self, points):
+        self.client.upsert(collection_name=self.collection_name, points=points)
+
+    async def aupsert(self, points):
+        await self.async_client.upsert(collection_name=self.collection_name, points=points, wait=False)
+
+    def delete(self, point_ids):
+        for batch in chunked(point_ids, 1000):
+            self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=PointIdsList(points=list(batch))
+            )
+
+    def set_payload(self, key_field, key, fields):
+        self.client.set_payload(
+            collection_name=self.collection_name,
+            payload=fields,
+            points=Filter(must=[FieldCondition(key=key_field, match=MatchValue(value=key))])
+        )
+
+    def set_point_payloads(self, payloads):
+        stored = self.client.retrieve(
+            collection_name=self.collection_name,
+            ids=list(payloads),
+            with_payload=False,
+            with_vectors=False
+        )
+        for record in stored:
+            self.client.set_payload(
+                collection_name=self.collection_name,
+                payload=payloads[str(record.id)],
+                points=[record.id]
+            )
+
+    async def adelete(self, point_ids):
+        for batch in chunked(point_ids, 1000):
+            await self.async_client.delete(
+                collection_name=self.collection_name,
+                points_selector=PointIdsList(points=list(batch))
+            )
+
+    def content_hashes(self):
+        hashes = {}
+        offset = None
+        while True:
+            records, offset = self.client.scroll(
+                collection_name=self.collection_name,
+                limit=1000,
+                offset=offset,
+                with_payload=["content_hash"],
+                with_vectors=False
+            )
+            for record in records:
+                hashes[str(record.id)] = (record.payload or {}).get("content_hash")
+            if offset is None:
+                return hashes
+
+    async def acontent_hashes(self):
+        hashes = {}
+        offset = None
+        while True:
+            records, offset = await self.async_client.scroll(
+                collection_name=self.collection_name,
+                limit=1000,
+                offset=offset,
+                with_payload=["content_hash"],
+                with_vectors=False
+            )
+            for record in records:
+                hashes[str(record.id)] = (record.payload or {}).get("content_hash")
+            if offset is None:
+                return hashes
+
+    def count(self):
+        return self.client.count(collection_name=self.collection_name, exact=True).count
+
+    def scroll(self, batch_size=1000, query_filter=None):
+        offset = None
+        while True:
+            records, offset = self.client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=query_filter,
+                limit=batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True
+            )
+            if records:
+                yield [PointStruct(id=record.id, vector=record.vector, payload=record.payload) for record in records]
+            if offset is None:
+                return
+
+    def retrieve(self, point_ids):
+        records = self.client.retrieve(
+            collection_name=self.collection_name,
+            ids=point_ids,
+            with_payload=True,
+            with_vectors=True
+        )
+        return [PointStruct(id=record.id, vector=record.vector, payload=record.payload) for record in records]
+
+    def score_points(self, point_ids, vector, with_payload=True, query_filter=None):
+        # A search restricted to the IDs: Qdrant scores and filters them, and no vectors are transferred
+        conditions = [HasIdCondition(has_id=list(point_ids))]
+        if query_filter is not None:
+            conditions.append(query_filter)
+        results = self.search(vector, limit=len(point_ids), with_payload=with_payload, query_filter=Filter(must=conditions))
+        return {str(point.id): point for point in results}
+
+    def search(self, vector, limit, with_payload=True, query_filter=None):
+        return self.client.search(
+            collection_name=self.collection_name,
+            query_vector=vector,
+            query_filter=query_filter,
+            limit=limit,
+            with_payload=with_payload,
+            search_params=self.search_params()
+        )
+
+    async def asearch(self, vector, limit, with_payload=True, query_filter=None):
+        return await self.async_client.search(
+            collection_name=self.collection_name,
+            query_vector=vector,
+            query_filter=query_filter,
+            limit=limit,
+            with_payload=with_payload,
+            search_params=self.search_params()
+        )
+
+    def search_requests(self, vectors, limit, with_payload, query_filter):
+        return [
+            QueryRequest(
+                query=vector,
+                filter=query_filter,
+                limit=limit,
+                with_payload=with_payload,
+                params=self.search_params()
+            )
+            for vector in vectors
+        ]
+
+    def search_batch(self, vectors, limit, with_payload=True, query_filter=None):
+        responses = self.client.query_batch_points(
+            collection_name=self.collection_name,
+            requests=self.search_requests(vectors, limit, with_payload, query_filter)
+        )
+        return [response.points for response in responses]
+
+    async def asearch_batch(self, vectors, limit, with_payload=True, query_filter=None):
+        responses = await self.async_client.query_batch_points(
+            collection_name=self.collection_name,
+            requests=self.search_requests(vectors, limit, with_payload, query_filter)
+        )
+        return [response.points for response in responses]
+
+
+class NumpyVectorStore(VectorStore):
+    """In-process store for small collections: no server, no network hop.
+
+    Vectors live L2-normalized in a memory-mapped float32 `vectors.npy`, one row per
+    slot, and payloads live in a SQLite file that maps point IDs to slots. A query is
+    a single vectorized dot product over all slots followed by a top-k selection.
+    Other processes' writes are picked up through SQLite's `data_version`.
+    """
+
+    def __init__(self, collection_name, dimensions, tuning, path=None):
+        super().__init__(collection_name, dimensions, tuning)
+        self.path = os.path.join(path or settings.LOCAL_VECTOR_STORE_PATH, collection_name)
+        self.vectors_path = os.path.join(self.path, "vectors.npy")
+        self.payloads_path = os.path.join(self.path, "payloads.sqlite")
+        self._lock = threading.RLock()
+        self._conn = None
+        self._vectors = None
+        self._active = None
+        self._data_version = None
+        # Parsed payloads by slot for filtered searches, built on first use and dropped on every change
+        self._payloads = None
+
+    # Storage
+
+    def exists(self):
+        return os.path.exists(self.payloads_path) and os.path.exists(self.vectors_path)
+
+    def create(self):
+        with self._lock:
+            os.makedirs(self.path, exist_ok=True)
+            conn = self._connection()
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS points (
+                    slot INTEGER PRIMARY KEY,
+                    id TEXT NOT NULL UNIQUE,
+                    content_hash TEXT,
+                    payload TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+                """
+            )
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('dimensions', ?)", (str(self.dimensions),))
+            conn.commit()
+            self._resize(0)
+
+    def delete_collection(self):
+        with self._lock:
+            self.close()
+            for file_path in (self.vectors_path, self.payloads_path):
+                for suffix in ("", "-wal", "-shm"):
+                    if os.path.exists(file_path + suffix):
+                        os.remove(file_path + suffix)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = None
+            self._vectors = None
+            self._active = None
+            self._data_version = None
+            self._payloads = None
+
+    def _connection(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.payloads_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        return self._conn
+
+    def _resize(self, capacity):
+        """Grow (or create) the vector file to `capacity` rows, keeping existing rows."""
+        old = self._vectors
+        tmp_path = self.vectors_path + ".tmp"
+        vectors = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(capacity, self.dimensions))
+        if old is not None and len(old):
+            vectors[:len(old)] = old
+        vectors.flush()
+        del vectors
+        os.replace(tmp_path, self.vectors_path)
+        self._vectors = np.load(self.vectors_path, mmap_mode="r+")
+
+    def _refresh(self):
+        """(Re)load the vector map and slot mask if this or another process changed the store."""
+        conn = self._connection()
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if self._vectors is not None and data_version == self._data_version:
+            return
+        self._vectors = np.load(self.vectors_path, mmap_mode="r+")
+        self._active = np.zeros(len(self._vectors), dtype=bool)
+        slots = [slot for (slot,) in conn.execute("SELECT slot FROM points")]
+        self._active[slots] = True
+        self._data_version = data_version
+        self._payloads = None
+
+    # Writes
+
+    def upsert(self, points):
+        if not points:
+            return
+        with self._lock:
+            self._refresh()
+            conn = self._connection()
+            ids = [str(point.id) for point in points]
+            existing = {}
+            for batch in chunked(ids, 500):
+                placeholders = ",".join("?" * len(batch))
+                existing.update(conn.execute(
+                    f"SELECT id, slot FROM points WHERE id IN ({placeholders})", batch
+                ).fetchall())
+
+            free = np.flatnonzero(~self._active).tolist()
+            new_ids = [point_id for point_id in dict.fromkeys(ids) if point_id not in existing]
+            if len(new_ids) > len(free):
+                capacity = max(len(self._vectors) * 2, len(self._vectors) + len(new_ids) - len(free), 64)
+                self._resize(capacity)
+                self._active = np.concatenate([self._active, np.zeros(capacity - len(self._active), dtype=bool)])
+                free = np.flatnonzero(~self._active).tolist()
+            for point_id, slot in zip(new_ids, free):
+                existing[point_id] = slot
+
+            matrix = np.asarray([point.vector for point in points], dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix /= np.where(norms == 0, 1, norms)
+            slots = [existing[point_id] for point_id in ids]
+            self._vectors[slots] = matrix
+            self._vectors.flush()
+            self._active[slots] = True
+
+            conn.executemany(
+                "INSERT OR REPLACE INTO points (slot, id, content_hash, payload) VALUES (?, ?, ?, ?)",
+                [
+                    (existing[str(point.id)], str(point.id), (point.payload or {}).get("content_hash"), json.dumps(point.payload or {}))
+                    for point in points
+                ]
+            )
+            conn.commit()
+            self._data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+            self._payloads = None
+
+    def delete(self, point_ids):
+        with self._lock:
+            self._refresh()
+            conn = self._connection()
+            for batch in chunked([str(point_id) for point_id in point_ids], 500):
+                placeholders = ",".join("?" * len(batch))
+                slots = [slot for (slot,) in conn.execute(
+                    f"SELECT slot FROM points WHERE id IN ({placeholders})", batch
+                )]
+                conn.execute(f"DELETE FROM points WHERE id IN ({placeholders})", batch)
+                self._active[slots] = False
+            conn.commit()
+            self._data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+            self._payloads = None
+
+    def set_payload(self, key_field, key, fields):
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "UPDATE points SET payload = json_patch(payload, ?) WHERE json_extract(payload, ?) = ?",
+                (json.dumps(fields, default=str), f"$.{key_field}", key)
+            )
+            conn.commit()
+            self._data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+            self._payloads = None
+
+    def set_point_payloads(self, payloads):
+        with self._lock:
+            conn = self._connection()
+            conn.executemany(
+                "UPDATE points SET payload = json_patch(payload, ?) WHERE id = ?",
+                [(json.dumps(payload, default=str), str(point_id)) for point_id, payload in payloads.items()]
+            )
+            conn.commit()
+            self._data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+            self._payloads = None
+
+    # Reads
+
+    def content_hashes(self):
+        with self._lock:
+            return dict(self._connection().execute("SELECT id, content_hash FROM points").fetchall())
+
+    def count(self):
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM points").fetchone()[0]
+
+    def scroll(self, batch_size=1000, query_filter=None):
+        last_slot = -1
+        while True:
+            with self._lock:
+                self._refresh()
+                rows = self._connection().execute(
+                    "SELECT slot, id, payload FROM points WHERE slot > ? ORDER BY slot LIMIT ?",
+                    (last_slot, batch_size)
+                ).fetchall()
+                if not rows:
+                    return
+                vectors = self._vectors[[slot for slot, _, _ in rows]]
+            points = [
+                PointStruct(id=point_id, vector=vector.tolist(), payload=json.loads(payload))
+                for (_, point_id, payload), vector in zip(rows, vectors)
+            ]
+            if query_filter is not None:
+                points = [point for point in points if payload_matches(point.payload, query_filter)]
+            if points:
+                yield points
+            last_slot = rows[-1][0]
+
+    def retrieve(self, point_ids):
+        with self._lock:
+            self._refresh()
+            points = []
+            for batch in chunked([str(point_id) for point_id in point_ids], 500):
+                placeholders = ",".join("?" * len(batch))
+                for slot, point_id, payload in self._connection().execute(
+                    f"SELECT slot, id, payload FROM points WHERE id IN ({placeholders})", batch
+                ):
+                    points.append(PointStruct(id=point_id, vector=self._vectors[slot].tolist(), payload=json.loads(payload)))
+        return points
+
+    def filter_mask(self, query_filter):
+        """Boolean mask of the slots whose payload matches `query_filter`, evaluated in process."""
+        if self._payloads is None:
+            self._payloads = {
+                slot: json.loads(payload)
+                for slot, payload in self._connection().execute("SELECT slot, payload FROM points")
+            }
+        mask = np.zeros(len(self._vectors), dtype=bool)
+        for slot, payload in self._payloads.items():
+            mask[slot] = payload_matches(payload, query_filter)
+        return mask
+
+    def search(self, vector, limit, with_payload=True, query_filter=None):
+        with self._lock:
+            self._refresh()
+            candidates = self._active if query_filter is None else self._active & self.filter_mask(query_filter)
+            query = np.asarray(vector, dtype=np.float32)
+            norm = np.linalg.norm(query)
+            if norm:
+                query /= norm
+            scores = self._vectors @ query
+            scores[~candidates] = -np.inf
+
+            k = min(limit, int(candidates.sum()))
+            if k <= 0:
+                return []
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+
+            slots = top.tolist()
+            placeholders = ",".join("?" * len(slots))
+            rows = {
+                slot: (point_id, payload)
+                for slot, point_id, payload in self._connection().execute(
+                    f"SELECT slot, id, payload FROM points WHERE slot IN ({placeholders})", slots
+                )
+            }
+        return [
+            ScoredPoint(
+                id=rows[slot][0],
+                version=0,
+                score=float(scores[slot]),
+                payload=json.loads(rows[slot][1]) if with_payload else None
+            )
+            for slot in slots
+        ]
+
+    async def aclose(self):
+        self.close()
+
+
+class HybridVectorStore(VectorStore):
+    """A vector store plus a `LexicalIndex` of its chunk text, kept in step on every write.
+
+    All vector operations go to `dense`; `keyword_search` ranks points by BM25 and
+    scores them by cosine similarity to the query vector, so fused results keep a
+    comparable similarity. Backend-specific attributes (e.g. `client`) are forwarded.
+    """
+
+    # Keyword hits fetched per requested result when a filter may discard some of them
+    FILTER_OVERSAMPLING = 10
+
+    def __init__(self, dense: VectorStore, lexical: LexicalIndex):
+        super().__init__(dense.collection_name, dense.dimensions, dense.tuning)
+        self.dense = dense
+        self.lexical = lexical
+        self._lexical_checked = False
+
+    def __getattr__(self, name):
+        if name == "dense":
+            raise AttributeError(name)
+        return getattr(self.dense, name)
+
+    def exists(self):
+        return self.dense.exists()
+
+    def create(self):
+        self.dense.create()
+        self.lexical.clear()
+
+    def delete_collection(self):
+        self.dense.delete_collection()
+        self.lexical.drop()
+
+    def apply_tuning(self):
+        """Apply the dense store's tuning, and build the keyword index of a collection indexed without one."""
+        self.dense.apply_tuning()
+        if self.lexical.count() == 0 and self.dense.count() > 0:
+            for points in self.dense.scroll():
+                self.lexical.upsert(points)
+
+    def create_payload_index(self, field_name, field_schema):
+        self.dense.create_payload_index(field_name, field_schema)
+
+    def upsert(self, points):
+        self.dense.upsert(points)
+        self.lexical.upsert(points)
+
+    async def aupsert(self, points):
+        await self.dense.aupsert(points)
+        await asyncio.to_thread(self.lexical.upsert, points)
+
+    def delete(self, point_ids):
+        self.dense.delete(point_ids)
+        self.lexical.delete(point_ids)
+
+    async def adelete(self, point_ids):
+        await self.dense.adelete(point_ids)
+        await asyncio.to_thread(self.lexical.delete, point_ids)
+
+    def set_payload(self, key_field, key, fields):
+        self.dense.set_payload(key_field, key, fields)
+        if "content" in fields:
+            # The keyword index is keyed by point ID, so find the points the update touched
+            key_filter = Filter(must=[FieldCondition(key=key_field, match=MatchValue(value=key))])
+            for points in self.dense.scroll(query_filter=key_filter):
+                self.lexical.update_content({str(point.id): fields["content"] for point in points})
+
+    def set_point_payloads(self, payloads):
+        self.dense.set_point_payloads(payloads)
+        self.lexical.update_content({
+            point_id: payload["content"] for point_id, payload in payloads.items() if payload.get("content")
+        })
+
+    def content_hashes(self):
+        return self.dense.content_hashes()
+
+    async def acontent_hashes(self):
+        return await self.dense.acontent_hashes()
+
+    def count(self):
+        return self.dense.count()
+
+    def scroll(self, batch_size=1000, query_filter=None):
+        return self.dense.scroll(batch_size, query_filter)
+
+    def retrieve(self, point_ids):
+        return self.dense.retrieve(point_ids)
+
+    def search(self, vector, limit, with_payload=True, query_filter=None):
+        return self.dense.search(vector, limit, with_payload, query_filter)
+
+    async def asearch(self, vector, limit, with_payload=True, query_filter=None):
+        return await self.dense.asearch(vector, limit, with_payload, query_filter)
+
+    def search_batch(self, vectors, limit, with_payload=True, query_filter=None):
+        return self.dense.search_batch(vectors, limit, with_payload, query_filter)
+
+    async def asearch_batch(self, vectors, limit, with_payload=True, query_filter=None):
+        return await self.dense.asearch_batch(vectors, limit, with_payload, query_filter)
+
+    def keyword_search(self, text, vector, limit, with_payload=True, query_filter=None):
+        if not self._lexical_checked:
+            self._lexical_checked = True
+            if self.lexical.count() == 0 and self.dense.count() > 0:
+                logger.warning(
+                    f"The keyword index of {self.collection_name} at {self.lexical.path} is empty but the collection "
+                    f"holds points, so its searches are vector-only. Build it with an incremental vectorizer run "
+                    f"on this host, or set {self.collection_name.upper()}_HYBRID_SEARCH=False."
+                )
+        candidates = limit * self.FILTER_OVERSAMPLING if query_filter is not None else limit
+        hits = self.lexical.search(text, candidates)
+        if not hits:
+            return []
+        scored = self.dense.score_points([point_id for point_id, _ in hits], vector, with_payload, query_filter)
+        return [scored[point_id] for point_id, _ in hits if point_id in scored][:limit]
+
+    async def aclose(self):
+        await self.dense.aclose()
+        self.lexical.close()
+
+
+def create_vector_store(collection_name: str, dimensions: int, tuning: CollectionTuning) -> VectorStore:
+    backend = get_vector_store_backend(collection_name)
+    if backend == "qdrant":
+        store = QdrantVectorStore(collection_name, dimensions, tuning)
+    elif backend == "numpy":
+        store = NumpyVectorStore(collection_name, dimensions, tuning)
+    else:
+        raise ValueError(f"Unknown vector store backend for {collection_name}: {backend}")
+    if get_hybrid_search(collection_name):
+        return HybridVectorStore(store, LexicalIndex(collection_name))
+    return store
@@ -1,44 +1,108 @@
 import os
 import sqlite3
 import uuid
-import re
+import json
+import hashlib
 import requests
 from tqdm import tqdm
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
-from vectorizer.app.core.settings import get_settings
+from qdrant_client.models import PointStruct
+from vectorizer.app.core.settings import get_settings, get_collection_tuning, get_index_where
 from vectorizer.app.core.logger import logger
+from vectorizer.app.core import clients
 from .chunkenizer import recursive_character_splitting
-from vectorizer.app.embeddings.embedding_generator import generate_embedding
+from .writer import PointWriter
+from .stores import create_vector_store
+from .filters import PAYLOAD_INDEXES
+from .report import IngestionReport
+from .faq_source import fetch_faq, split_sections
+from .result_cache import get_search_result_cache
+from .fusion import fuse_results
+from vectorizer.app.embeddings.embedding_generator import (
+    generate_query_embedding,
+    generate_query_embedding_async,
+    generate_query_embeddings,
+    generate_query_embeddings_async,
+)
+from vectorizer.app.embeddings.batching import pack_batches
+from vectorizer.app.embeddings.rate_limiter import AdaptiveRateLimiter
+from vectorizer.app.embeddings.providers import get_embedding_provider, RateLimitedError
+from vectorizer.app.embeddings.embedding_cache import get_embedding_cache
 import asyncio
 import aiohttp
-from tqdm.asyncio import tqdm_asyncio
-from more_itertools import chunked
 import time
 
 settings = get_settings()
 
+# Point IDs are derived from (table, primary key, chunk index) so reindexing a row overwrites its points
+POINT_ID_NAMESPACE = uuid.UUID("6f1c2a8e-3d4b-5a69-9e7f-0b1c2d3e4f50")
+
+# The pandas rewrite in update_dates drops the declared primary keys, so they are listed here
+TABLE_PRIMARY_KEYS = {
+    "car_rentals": "id",
+    "trip_recommendations": "id",
+    "hotels": "id",
+    "flights": "flight_id",
+}
+
+
 class VectorDB:
-    def __init__(self, table_name, collection_name, create_collection=False):
+    def __init__(
+        self,
+        table_name,
+        collection_name,
+        create_collection=False,
+        incremental=False,
+        rate_limiter=None,
+        progress_position=None,
+        embedding_provider=None,
+        tuning=None,
+        store=None,
+        db_path=None,
+        use_embedding_cache=True,
+    ):
         self.table_name = table_name
         self.collection_name = collection_name
-        self.connect_to_qdrant()
+        self.incremental = incremental
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter.from_settings()
+        self.embedding_provider = embedding_provider or get_embedding_provider()
+        self.tuning = tuning or get_collection_tuning(collection_name)
+        self.progress_position = progress_position
+        self.db_path = db_path or settings.SQLITE_DB_PATH
+        self.embedding_cache = get_embedding_cache() if use_embedding_cache else None
+        self.result_cache = get_search_result_cache()
+        self.index_stats = {}
+        self.report = IngestionReport(collection_name)
+        self.store = store or create_vector_store(collection_name, self.embedding_provider.dimensions, self.tuning)
         if create_collection:
-            self.create_or_clear_collection()
-
-    def connect_to_qdrant(self):
-        self.client = QdrantClient(url=settings.QDRANT_URL)
-        logger.info("Connected to Qdrant")
+            if incremental:
+                self.ensure_collection()
+            else:
+                self.create_or_clear_collection()
 
     def create_or_clear_collection(self):
-        if self.client.collection_exists(self.collection_name):
+        if self.store.exists():
             logger.info(f"Collection {self.collection_name} already exists. Recreating it.")
-            self.client.delete_collection(collection_name=self.collection_name)
-        self.client.create_collection(
-            collection_name=self.collection_name,
-            vectors_config=VectorParams(size=1536, distance=Distance.COSINE)
-        )
-        logger.info(f"Created collection: {self.collection_name}")
+            self.store.delete_collection()
+        self.create_collection()
+
+    def ensure_collection(self):
+        if self.store.exists():
+            logger.info(f"Collection {self.collection_name} already exists. Updating it incrementally.")
+            # Bring the collection in line with the configured tuning without reindexing it
+            self.store.apply_tuning()
+            self.create_payload_indexes()
+        else:
+            self.create_collection()
+
+    def create_collection(self):
+        self.store.create()
+        self.create_payload_indexes()
+        logger.info(f"Created collection: {self.collection_name} ({type(self.store).__name__}, {self.tuning})")
+
+    def create_payload_indexes(self):
+        """Index the payload fields the search tools filter on (see `PAYLOAD_INDEXES`)."""
+        for field_name, field_schema in PAYLOAD_INDEXES.get(self.collection_name, {}).items():
+            self.store.create_payload_index(field_name, field_schema)
 
     def format_content(self, data, collection_name):
         # Implement formatting logic for different collections
@@ -73,131 +137,365 @@ class VectorDB:
         else:
             return str(data)
 
+    async def generate_embeddings_async(self, contents, session):
+        provider = self.embedding_provider
+        cache = self.embedding_cache
+        cached = cache.get_many(provider.cache_key, contents) if cache else {}
+        missing = list(dict.fromkeys(content for content in contents if content not in cached))
+        if missing:
+            start = time.perf_counter()
+            embeddings = await provider.embed_async(
+                missing, session=session, rate_limiter=self.rate_limiter, report=self.report
+            )
+            self.report.record_embedding_request(time.perf_counter() - start, len(missing))
+            fresh = dict(zip(missing, embeddings))
+            if cache:
+                cache.put_many(provider.cache_key, fresh.items())
+            cached.update(fresh)
+        return [cached[content] for content in contents]
+
     async def generate_embedding_async(self, content, session):
-        max_retries = 5
-        base_delay = 1
-        for attempt in range(max_retries):
-            try:
-                async with session.post(
-                    "https://api.openai.com/v1/embeddings",
-                    headers={"Authorization": f"Bearer {settings.OPENAI_API_KEY}"},
-                    json={"model": "text-embedding-ada-002", "input": content}
-                ) as response:
-                    result = await response.json()
-                    if "data" in result and len(result["data"]) > 0:
-                        return result["data"][0]["embedding"]
-                    else:
-                        raise ValueError(f"Unexpected API response: {result}")
-            except Exception as e:
-                if attempt == max_retries - 1:
-                    logger.error(f"Failed to generate embedding after {max_retries} attempts: {str(e)}")
-                    raise
-                delay = base_delay * (2 ** attempt)
-                logger.warning(f"Embedding generation failed. Retrying in {delay} seconds...")
-                await asyncio.sleep(delay)
-
-    async def process_chunk(self, chunk, metadata, session):
-        embedding = await self.generate_embedding_async(chunk, session)
-        return PointStruct(
-            id=str(uuid.uuid4()),
-            vector=embedding,
-            payload={
+        embeddings = await self.generate_embeddings_async([content], session)
+        return embeddings[0]
+
+    async def embed_batch(self, contents, session):
+        """Embed a batch in one request, falling back to per-chunk requests on failure.
+
+        Returns one embedding per input, or None for inputs that could not be embedded.
+        """
+        try:
+            return await self.generate_embeddings_async(contents, session)
+        except RateLimitedError as e:
+            # Splitting the batch would only multiply the throttled requests
+            logger.error(f"Error processing batch of {len(contents)} chunks: {str(e)}")
+            self.report.count("embedding_failures", len(contents))
+            return [None] * len(contents)
+        except Exception as e:
+            if len(contents) == 1:
+                logger.error(f"Error processing chunk: {str(e)}")
+                self.report.count("embedding_failures")
+                return [None]
+            logger.warning(f"Batch of {len(contents)} chunks failed ({str(e)}). Retrying chunks individually.")
+
+        results = await asyncio.gather(
+            *(self.generate_embedding_async(content, session) for content in contents),
+            return_exceptions=True
+        )
+        embeddings = []
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Error processing chunk: {str(result)}")
+                self.report.count("embedding_failures")
+                embeddings.append(None)
+            else:
+                embeddings.append(result)
+        return embeddings
+
+    async def process_batch(self, batch, session):
+        embeddings = await self.embed_batch([chunk for _, chunk, _ in batch], session)
+        return [
+            PointStruct(
+                id=point_id,
+                vector=embedding,
+                payload=payload
+            )
+            for (point_id, _, payload), embedding in zip(batch, embeddings)
+            if embedding is not None
+        ]
+
+    def pack_batches(self, entries):
+        return pack_batches(
+            entries,
+            max_inputs=settings.EMBEDDING_BATCH_MAX_INPUTS,
+            max_tokens=settings.EMBEDDING_BATCH_MAX_TOKENS,
+            text_of=lambda entry: entry[1]
+        )
+
+    def point_id(self, key, chunk_index):
+        return str(uuid.uuid5(POINT_ID_NAMESPACE, f"{self.table_name}:{key}:{chunk_index}"))
+
+    @staticmethod
+    def content_hash(chunk, metadata):
+        serialized = json.dumps({"content": chunk, **metadata}, sort_keys=True, default=str)
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+    def build_entries(self, key, chunks, metadata):
+        """Build (point_id, chunk, payload) entries for the chunks of one source row."""
+        entries = []
+        for chunk_index, chunk in enumerate(chunks):
+            payload = {
                 "content": chunk,
-                **metadata
+                **metadata,
+                "content_hash": self.content_hash(chunk, metadata)
             }
-        )
+            entries.append((self.point_id(key, chunk_index), chunk, payload))
+        return entries
 
-    async def create_embeddings_async(self):
-        if self.table_name == "faq":
-            await self.index_faq_docs()
-        else:
-            await self.index_regular_docs()
+    async def create_embeddings_async(self, session=None):
+        if session is None:
+            async with aiohttp.ClientSession() as session:
+                return await self.create_embeddings_async(session)
+
+        self.report = IngestionReport(self.collection_name)
+        try:
+            if self.table_name == "faq":
+                await self.index_faq_docs(session)
+            else:
+                await self.index_regular_docs(session)
+        finally:
+            await self.store.aclose()
+            self.report.finish()
+        self.report.log()
+
+    def iter_rows(self):
+        """Stream the rows of the source table as dicts, `SQLITE_FETCH_SIZE` rows at a time."""
+        db_connection = sqlite3.connect(self.db_path)
+        try:
+            cursor = db_connection.cursor()
+            with self.report.timed("sqlite_read", items=0):
+                where = get_index_where(self.collection_name)
+                cursor.execute(f"SELECT * FROM {self.table_name}" + (f" WHERE {where}" if where else ""))
+            column_names = [column[0] for column in cursor.description]
+            while True:
+                start = time.perf_counter()
+                rows = cursor.fetchmany(settings.SQLITE_FETCH_SIZE)
+                self.report.record("sqlite_read", time.perf_counter() - start, len(rows))
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(zip(column_names, row))
+        finally:
+            db_connection.close()
+
+    def iter_entries(self, rows):
+        key_column = TABLE_PRIMARY_KEYS.get(self.table_name, "id")
+        for item in rows:
+            with self.report.timed("format_content"):
+                content = self.format_content(item, self.collection_name)
+            start = time.perf_counter()
+            chunks = [chunk for chunk in recursive_character_splitting(content) if chunk]
+            self.report.record("splitting", time.perf_counter() - start, len(chunks))
+            yield from self.build_entries(item[key_column], chunks, item)
+
+    async def index_regular_docs(self, session):
+        await self.index_entries(self.iter_entries(self.iter_rows()), session)
 
-    async def index_regular_docs(self):
-        db_connection = sqlite3.connect(settings.SQLITE_DB_PATH)
-        cursor = db_connection.cursor()
-        cursor.execute(f"SELECT * FROM {self.table_name}")
-        rows = cursor.fetchall()
-        column_names = [column[0] for column in cursor.description]
-        db_connection.close()
+    async def index_faq_docs(self, session):
+        faq_text = await fetch_faq(session)
+        entries = [
+            entry
+            for key, section in split_sections(faq_text)
+            for entry in self.build_entries(key, [section], {"type": "faq", "section": key})
+        ]
 
-        if not rows:
-            logger.warning(f"No data found in table {self.table_name}")
-            return
+        await self.index_entries(entries, session)
 
-        data = [dict(zip(column_names, row)) for row in rows]
-        chunks = [self.format_content(item, self.collection_name) for item in data]
-        chunks = [chunk for item in chunks for chunk in recursive_character_splitting(item) if chunk]
+    async def index_entries(self, entries, session):
+        """Embed and upsert a stream of (point_id, chunk, payload) entries.
 
-        if not chunks:
+        Batches are embedded as soon as they are packed, with at most
+        `EMBEDDING_CONCURRENT_BATCHES` batches in flight, and handed to a `PointWriter`
+        whose background upserts overlap with the next embedding requests. Memory stays
+        flat and the first points land in the store before the source is fully read.
+        """
+        existing = await self.store.acontent_hashes() if self.incremental else {}
+        seen = set()
+        counts = {"chunks": 0, "unchanged": 0, "indexed": 0}
+
+        def changed_entries():
+            for entry in entries:
+                counts["chunks"] += 1
+                if self.incremental:
+                    seen.add(entry[0])
+                if existing.get(entry[0]) == entry[2]["content_hash"]:
+                    counts["unchanged"] += 1
+                    continue
+                yield entry
+
+        async def embed_and_write(batch, session, writer):
+            points = await self.process_batch(batch, session)
+            if points:
+                await writer.write(points)
+            return len(points)
+
+        pending = set()
+        progress = tqdm(desc=f"Indexing {self.collection_name}", unit="chunks", position=self.progress_position)
+        async with PointWriter(self.store, report=self.report) as writer:
+            for batch in self.pack_batches(changed_entries()):
+                if len(pending) >= settings.EMBEDDING_CONCURRENT_BATCHES:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        progress.update(task.result())
+                pending.add(asyncio.create_task(embed_and_write(batch, session, writer)))
+
+            for embedded in await asyncio.gather(*pending):
+                progress.update(embedded)
+        progress.close()
+        counts["indexed"] = writer.written
+        counts["failed_upserts"] = writer.failed
+
+        if counts["chunks"] == 0:
             logger.warning(f"No valid chunks generated for {self.collection_name}")
-            return
-
-        batch_size = 100  # Adjust this value based on rate limit
-        delay = 1  # Delay in seconds between batches
-
-        async with aiohttp.ClientSession() as session:
-            for i in range(0, len(chunks), batch_size):
-                batch = chunks[i:i+batch_size]
-                tasks = [self.process_chunk(chunk, data[i // batch_size], session) for i, chunk in enumerate(batch)]
-                
-                points = []
-                for task in tqdm_asyncio.as_completed(tasks, desc=f"Generating embeddings for {self.collection_name} (batch {i//batch_size + 1})", total=len(tasks)):
-                    try:
-                        point = await task
-                        if point is not None:
-                            points.append(point)
-                    except Exception as e:
-                        logger.error(f"Error processing chunk: {str(e)}")
-
-                if points:
-                    self.client.upsert(
-                        collection_name=self.collection_name,
-                        points=points
-                    )
-                    logger.info(f"Indexed {len(points)} documents into {self.collection_name} (batch {i//batch_size + 1})")
-
-                if i + batch_size < len(chunks):
-                    logger.info(f"Waiting for {delay} seconds before processing the next batch...")
-                    await asyncio.sleep(delay)
-
-        total_indexed = sum(1 for chunk in chunks if chunk is not None)
-        logger.info(f"Finished indexing. Total documents indexed into {self.collection_name}: {total_indexed}")
-
-    async def index_faq_docs(self):
-        faq_url = "https://storage.googleapis.com/benchmarks-artifacts/travel-db/swiss_faq.md"
-        async with aiohttp.ClientSession() as session:
-            async with session.get(faq_url) as response:
-                faq_text = await response.text()
-
-        docs = [{"page_content": txt.strip()} for txt in re.split(r"(?=\n##)", faq_text) if txt.strip()]
-
-        async with aiohttp.ClientSession() as session:
-            tasks = [self.process_chunk(doc['page_content'], {"type": "faq"}, session) for doc in docs]
-            points = await tqdm_asyncio.gather(*tasks, desc="Generating embeddings for FAQ documents")
-
-        if points:
-            for batch in chunked(points, 100):  # Adjust batch size as needed
-                self.client.upsert(
-                    collection_name=self.collection_name,
-                    points=batch
-                )
-            logger.info(f"Indexed {len(points)} FAQ documents into {self.collection_name}.")
-        else:
-            logger.warning("No FAQ documents were successfully embedded and indexed.")
 
-    def create_embeddings(self):
-        asyncio.run(self.create_embeddings_async())
-
-    def search(self, query, limit=2, with_payload=True):
-        query_vector = generate_embedding(query)
-        search_result = self.client.search(
-            collection_name=self.collection_name,
-            query_vector=query_vector,
-            limit=limit,
-            with_payload=with_payload
+        if self.incremental:
+            stale = [point_id for point_id in existing if point_id not in seen]
+            if stale:
+                await self.store.adelete(stale)
+            logger.info(
+                f"Incremental indexing of {self.collection_name}: {counts['chunks'] - counts['unchanged']} new or changed, "
+                f"{counts['unchanged']} unchanged, {len(stale)} removed"
+            )
+
+        self.index_stats = counts
+        logger.info(f"Finished indexing. Total documents indexed into {self.collection_name}: {counts['indexed']}")
+        if writer.failed:
+            logger.error(f"{writer.failed} documents could not be upserted into {self.collection_name}")
+        self.log_cache_stats()
+
+    def log_cache_stats(self):
+        cache = self.embedding_cache
+        if cache:
+            stats = cache.stats()
+            logger.info(
+                f"Embedding cache: {stats['hits']} hits, {stats['misses']} misses "
+                f"(hit rate {stats['hit_rate']:.1%}, {stats['size_bytes']} bytes)"
+            )
+
+    def log_rate_limiter_stats(self):
+        logger.info(
+            f"Embedding requests: {self.rate_limiter.total_requests} sent, {self.rate_limiter.rate_limited} throttled, "
+            f"final concurrency {self.rate_limiter.concurrency}"
         )
-        return search_result
+
+    def create_embeddings(self):
+        clients.run(self.create_embeddings_async())
+        self.log_rate_limiter_stats()
+
+    def upsert(self, points):
+        self.store.upsert(points)
+
+    def search(self, query, limit=2, with_payload=True, query_filter=None):
+        """Vector search fused (reciprocal rank fusion) with the store's keyword search, when it has one."""
+        cache = self.result_cache if with_payload else None
+        if cache:
+            key = cache.key(self.collection_name, query, query_filter, limit)
+            generation = cache.generation(self.collection_name)
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+
+        query_vector = generate_query_embedding(query, provider=self.embedding_provider)
+        results = fuse_results([
+            self.store.search(query_vector, limit=limit, with_payload=with_payload, query_filter=query_filter),
+            self.store.keyword_search(query, query_vector, limit=limit, with_payload=with_payload, query_filter=query_filter),
+        ], limit)
+        if cache:
+            cache.put(key, results, generation)
+        return results
+
+    async def asearch(self, query, limit=2, with_payload=True, query_filter=None):
+        """Async counterpart of `search`, on the async embedding and Qdrant clients."""
+        cache = self.result_cache if with_payload else None
+        if cache:
+            key = cache.key(self.collection_name, query, query_filter, limit)
+            generation = cache.generation(self.collection_name)
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+
+        query_vector = await generate_query_embedding_async(query, provider=self.embedding_provider)
+        results = fuse_results([
+            await self.store.asearch(query_vector, limit=limit, with_payload=with_payload, query_filter=query_filter),
+            await self.store.akeyword_search(query, query_vector, limit=limit, with_payload=with_payload, query_filter=query_filter),
+        ], limit)
+        if cache:
+            cache.put(key, results, generation)
+        return results
+
+    def search_many(self, queries, limit=2, with_payload=True, query_filter=None):
+        """Search with several phrasings of one question and fuse the results.
+
+        All variants are embedded in one request and searched in one batch call, and the
+        result lists (plus each variant's keyword search) are merged with reciprocal rank
+        fusion, one entry per point.
+        """
+        if len(queries) == 1:
+            return self.search(queries[0], limit=limit, with_payload=with_payload, query_filter=query_filter)
+        cache = self.result_cache if with_payload else None
+        if cache:
+            key = cache.key(self.collection_name, " | ".join(queries), query_filter, limit)
+            generation = cache.generation(self.collection_name)
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+
+        query_vectors = generate_query_embeddings(queries, provider=self.embedding_provider)
+        result_lists = self.store.search_batch(query_vectors, limit=limit, with_payload=with_payload, query_filter=query_filter)
+        for query, query_vector in zip(queries, query_vectors):
+            result_lists.append(self.store.keyword_search(query, query_vector, limit=limit, with_payload=with_payload, query_filter=query_filter))
+        results = fuse_results(result_lists, limit)
+        if cache:
+            cache.put(key, results, generation)
+        return results
+
+    async def asearch_many(self, queries, limit=2, with_payload=True, query_filter=None):
+        """Async counterpart of `search_many`."""
+        if len(queries) == 1:
+            return await self.asearch(queries[0], limit=limit, with_payload=with_payload, query_filter=query_filter)
+        cache = self.result_cache if with_payload else None
+        if cache:
+            key = cache.key(self.collection_name, " | ".join(queries), query_filter, limit)
+            generation = cache.generation(self.collection_name)
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+
+        query_vectors = await generate_query_embeddings_async(queries, provider=self.embedding_provider)
+        result_lists = await self.store.asearch_batch(query_vectors, limit=limit, with_payload=with_payload, query_filter=query_filter)
+        for query, query_vector in zip(queries, query_vectors):
+            result_lists.append(await self.store.akeyword_search(query, query_vector, limit=limit, with_payload=with_payload, query_filter=query_filter))
+        results = fuse_results(result_lists, limit)
+        if cache:
+            cache.put(key, results, generation)
+        return results
+
+    def invalidate_row(self, key):
+        """Drop the cached searches of the collection after a write to the source row `key`."""
+        if self.result_cache:
+            self.result_cache.invalidate(self.collection_name)
+
+    def read_row(self, key):
+        """The source row `key` as a dict, or None when it does not exist."""
+        key_column = TABLE_PRIMARY_KEYS.get(self.table_name, "id")
+        db_connection = sqlite3.connect(self.db_path)
+        try:
+            cursor = db_connection.execute(f"SELECT * FROM {self.table_name} WHERE {key_column} = ?", (key,))
+            row = cursor.fetchone()
+            return dict(zip([column[0] for column in cursor.description], row)) if row else None
+        finally:
+            db_connection.close()
+
+    def update_row(self, key, fields):
+        """Mirror a write to the source row `key` into the payloads of its points.
+
+        The row is read back and its chunks rebuilt, so the stored `content` (and the
+        keyword index) match the new values. The vectors still embed the old text, so the
+        old `content_hash` is kept and the next incremental reindex re-embeds the row.
+        If the row cannot be read, only `fields` are merged into the payloads. SQLite
+        stays the source of truth, so a failure here is logged rather than raised.
+        """
+        self.invalidate_row(key)
+        try:
+            row = self.read_row(key)
+            if row is None:
+                self.store.set_payload(TABLE_PRIMARY_KEYS.get(self.table_name, "id"), key, fields)
+                return
+            self.store.set_point_payloads({
+                point_id: {name: value for name, value in payload.items() if name != "content_hash"}
+                for point_id, _, payload in self.iter_entries([row])
+            })
+        except Exception as e:
+            logger.error(f"Failed to update the payload of {self.table_name} row {key} in {self.collection_name}: {str(e)}")
 
 if __name__ == "__main__":
     vectordb = VectorDB("example_table", "example_collection")
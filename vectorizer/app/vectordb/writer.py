@@ -0,0 +1,80 @@
+import asyncio
+import json
+import time
+from vectorizer.app.core.settings import get_settings
+from vectorizer.app.core.logger import logger
+
+settings = get_settings()
+
+
+def estimate_point_bytes(point):
+    """Approximate size of a point in the upsert request body."""
+    vector_bytes = len(point.vector) * 12  # A float serialized as JSON text
+    payload_bytes = len(json.dumps(point.payload, default=str))
+    return vector_bytes + payload_bytes + 64
+
+
+def split_by_size(points, max_points, max_bytes):
+    """Split points into upsert batches bounded by point count and request size."""
+    batch, batch_bytes = [], 0
+    for point in points:
+        size = estimate_point_bytes(point)
+        if batch and (len(batch) >= max_points or batch_bytes + size > max_bytes):
+            yield batch
+            batch, batch_bytes = [], 0
+        batch.append(point)
+        batch_bytes += size
+    if batch:
+        yield batch
+
+
+class PointWriter:
+    """Upserts points into a vector store from background tasks.
+
+    Embedding tasks hand their points to `write` and go back to embedding while
+    `workers` writer tasks send size-bounded batches through `store.aupsert`
+    (`wait=False` on Qdrant). The queue is bounded, so writers that fall behind
+    apply backpressure instead of letting points pile up in memory.
+    """
+
+    def __init__(self, store, workers=None, max_points=None, max_bytes=None, report=None):
+        self.store = store
+        self.report = report
+        self.collection_name = store.collection_name
+        self.workers = workers or settings.QDRANT_UPSERT_WORKERS
+        self.max_points = max_points or settings.QDRANT_UPSERT_MAX_POINTS
+        self.max_bytes = max_bytes or settings.QDRANT_UPSERT_MAX_BYTES
+        self.queue = asyncio.Queue(maxsize=self.workers * 2)
+        self.written = 0
+        self.failed = 0
+        self._tasks = []
+
+    async def __aenter__(self):
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        for _ in self._tasks:
+            await self.queue.put(None)
+        await asyncio.gather(*self._tasks)
+
+    async def write(self, points):
+        for batch in split_by_size(points, self.max_points, self.max_bytes):
+            await self.queue.put(batch)
+
+    async def _work(self):
+        while True:
+            batch = await self.queue.get()
+            if batch is None:
+                return
+            start = time.perf_counter()
+            try:
+                await self.store.aupsert(batch)
+                self.written += len(batch)
+                if self.report:
+                    self.report.record("upsert", time.perf_counter() - start, len(batch))
+            except Exception as e:
+                self.failed += len(batch)
+                if self.report:
+                    self.report.count("upsert_failures", len(batch))
+                logger.error(f"Failed to upsert {len(batch)} points into {self.collection_name}: {str(e)}")